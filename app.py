@@ -4,11 +4,23 @@ Financial Analysis Workflow Web Interface
 
 A Flask-based web application that provides a user interface for running
 the financial analysis workflow and viewing real-time logs.
+
+Set FA_WEB_ASYNC_MODE=eventlet (or gevent) to serve with an async worker
+instead of the threaded debug server.
 """
 
 import os
+
+# Async workers need the standard library patched before anything else is imported
+ASYNC_MODE = os.environ.get('FA_WEB_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 import asyncio
-import threading
 import datetime
 import json
 from flask import Flask, render_template, request, jsonify, send_file
@@ -19,7 +31,10 @@ from pathlib import Path
 import time
 import logging
 from logging.handlers import RotatingFileHandler
-import markdown
+
+from web_events import DEFAULT_QUEUE_SIZE, JobEventHub
+from workflow.events import AGENT_STARTED, MESSAGE_FINAL, RUN_STATUS, STAGE_DONE, TOOL_CALL, read_events
+from workflow.run_log import DEFAULT_READ_LIMIT, RunLog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,8 +42,27 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['DEBUG'] = True
-socketio = SocketIO(app, cors_allowed_origins="*")
+app.config['DEBUG'] = ASYNC_MODE == 'threading'
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE)
+
+# Job events only go to the clients subscribed to the job, through bounded per-client queues
+event_hub = JobEventHub(socketio, queue_size=int(os.environ.get('FA_WEB_CLIENT_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)))
+
+def render_markdown(markdown_content):
+    """Convert report markdown to HTML"""
+    import markdown  # imported on first use to keep server start-up fast
+
+    return markdown.markdown(
+        markdown_content,
+        extensions=[
+            'markdown.extensions.tables',
+            'markdown.extensions.fenced_code',
+            'markdown.extensions.codehilite',
+            'markdown.extensions.toc',
+            'markdown.extensions.attr_list',
+            'markdown.extensions.def_list'
+        ]
+    )
 
 # Add error handler for better debugging
 @app.errorhandler(500)
@@ -45,25 +79,50 @@ workflow_status = {
     'error': None,
     'start_time': None,
     'end_time': None,
-    'logs': []
+    'budget': None,
+    'output_dir': None,
+    'job_id': None,
+    'current_agent': None,
+    'sections': [],
+    'log_count': 0
 }
 
+# Optional per-run budgets accepted by /api/workflow/start, mapped to workflow CLI options
+BUDGET_OPTIONS = {
+    'max_rounds': '--max-rounds',
+    'max_tokens': '--max-tokens',
+    'deadline_seconds': '--deadline',
+}
+
+# Largest page of log lines returned by /api/workflow/logs
+MAX_LOG_READ_LIMIT = 5000
+
+# Open run logs by job id
+run_logs = {}
+
+def get_run_log(job_id):
+    """The append-only log of a run, kept in its run directory"""
+    if job_id not in run_logs:
+        run_logs[job_id] = RunLog(Path('outputs') / job_id)
+    return run_logs[job_id]
+
 class LogCapture:
-    """Capture and broadcast logs to web interface"""
+    """Capture logs to the run log and send them to the web interface"""
     
     def __init__(self, socketio_instance):
         self.socketio = socketio_instance
-        self.logs = []
     
-    def write(self, message):
+    def write(self, message, job_id=None):
+        job_id = job_id or workflow_status['job_id']
         if message.strip():
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             log_entry = f"[{timestamp}] {message.strip()}"
-            self.logs.append(log_entry)
-            workflow_status['logs'].append(log_entry)
+            seq = get_run_log(job_id).append(log_entry)
+            workflow_status['log_count'] = seq + 1
             
-            # Broadcast to connected clients
-            self.socketio.emit('log_update', {
+            # Send to the clients watching this run
+            event_hub.publish(job_id, 'log_update', {
+                'seq': seq,
                 'message': log_entry,
                 'timestamp': timestamp
             })
@@ -74,6 +133,49 @@ class LogCapture:
 # Initialize log capture
 log_capture = LogCapture(socketio)
 
+def read_pipe_lines(fd, poll_interval=0.05):
+    """Read the lines of a pipe without blocking, yielding to the other tasks of any async mode while it is empty"""
+    os.set_blocking(fd, False)
+    pending = b''
+    try:
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except BlockingIOError:
+                socketio.sleep(poll_interval)
+                continue
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b'\n')
+            for line in lines:
+                yield line.decode('utf-8', errors='replace')
+        if pending:
+            yield pending.decode('utf-8', errors='replace')
+    finally:
+        os.close(fd)
+
+def handle_workflow_events(job_id, event_fd):
+    """Apply the typed events of a run (see workflow.events) to its status and send them to its subscribers"""
+    for event in read_events(read_pipe_lines(event_fd)):
+        data = event.data
+        if event.type == STAGE_DONE:
+            # Let clients refresh the live report when a new section is written
+            workflow_status['sections'].append(data['title'])
+            event_hub.publish(job_id, 'report_update', {'section': data['title']})
+        elif event.type == RUN_STATUS:
+            workflow_status['budget'] = data['budget']
+        elif event.type == AGENT_STARTED:
+            workflow_status['current_agent'] = data['agent']
+            event_hub.publish(job_id, 'agent_started', {'agent': data['agent']})
+        elif event.type == MESSAGE_FINAL:
+            event_hub.publish(job_id, 'agent_finished', {
+                'agent': data['agent'],
+                'prompt_tokens': data['prompt_tokens'],
+                'completion_tokens': data['completion_tokens']
+            })
+        elif event.type == TOOL_CALL:
+            event_hub.publish(job_id, 'tool_call', data)
+
 @app.route('/')
 def index():
     """Main page with workflow interface"""
@@ -91,38 +193,119 @@ def start_workflow():
         # Get company name from request
         data = request.get_json()
         company_name = data.get('company', 'Tesco')
+        budget_args = []
+        for key, option in BUDGET_OPTIONS.items():
+            if data.get(key) is not None:
+                budget_args += [option, str(float(data[key]) if key == 'deadline_seconds' else int(data[key]))]
         
         # Reset workflow status
+        job_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         workflow_status = {
             'running': True,
             'completed': False,
             'error': None,
             'start_time': datetime.datetime.now().isoformat(),
             'end_time': None,
-            'logs': []
+            'budget': None,
+            'output_dir': os.path.join('outputs', job_id),
+            'job_id': job_id,
+            'current_agent': None,
+            'sections': [],
+            'log_count': 0
         }
         
-        # Start workflow in background thread
-        thread = threading.Thread(target=run_workflow_async, args=(company_name,))
-        thread.daemon = True
-        thread.start()
+        # Start workflow in a background task
+        socketio.start_background_task(
+            run_workflow_async, company_name, budget_args + ['--output-dir', workflow_status['output_dir']]
+        )
         
-        return jsonify({'message': 'Workflow started successfully', 'status': 'started'})
+        return jsonify({'message': 'Workflow started successfully', 'status': 'started', 'job_id': job_id})
         
     except Exception as e:
         workflow_status['error'] = str(e)
         workflow_status['running'] = False
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/workflow/resume', methods=['POST'])
+def resume_workflow():
+    """Resume an earlier run from its last completed stage"""
+    global workflow_status
+    
+    if workflow_status['running']:
+        return jsonify({'error': 'Workflow is already running'}), 400
+    
+    data = request.get_json() or {}
+    run_name = Path(str(data.get('run', ''))).name
+    run_dir = Path('outputs') / run_name
+    if not run_name or not (run_dir / 'checkpoint.json').exists():
+        return jsonify({'error': 'No checkpoint found for this run'}), 404
+    
+    workflow_status = {
+        'running': True,
+        'completed': False,
+        'error': None,
+        'start_time': datetime.datetime.now().isoformat(),
+        'end_time': None,
+        'budget': None,
+        'output_dir': str(run_dir),
+        'job_id': run_name,
+        'current_agent': None,
+        'sections': [],
+        'log_count': 0
+    }
+    
+    # Without a company in the request the run keeps the one in its checkpoint
+    socketio.start_background_task(run_workflow_async, data.get('company'), ['--resume', str(run_dir)])
+    
+    return jsonify({'message': f'Resuming run {run_name}', 'status': 'started', 'job_id': run_name})
+
 @app.route('/api/workflow/status')
 def get_workflow_status():
     """Get current workflow status"""
-    return jsonify(workflow_status)
+    return jsonify({**workflow_status, 'delivery': event_hub.stats()})
 
 @app.route('/api/workflow/logs')
 def get_workflow_logs():
-    """Get workflow logs"""
-    return jsonify({'logs': workflow_status['logs']})
+    """Get a run's log lines from a cursor on (query: job, since, limit)"""
+    job_id = Path(request.args.get('job') or workflow_status['job_id'] or '').name
+    if not job_id:
+        return jsonify({'error': 'No workflow has been started'}), 404
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', DEFAULT_READ_LIMIT)), MAX_LOG_READ_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    
+    run_log = get_run_log(job_id) if job_id == workflow_status['job_id'] else RunLog(Path('outputs') / job_id)
+    if not run_log.path.exists():
+        return jsonify({'error': 'No logs found for this run'}), 404
+    entries, cursor = run_log.read(since, max(1, limit))
+    return jsonify({
+        'job_id': job_id,
+        'logs': [entry['message'] for entry in entries],
+        'since': since,
+        'cursor': cursor,
+        'more': len(entries) == limit
+    })
+
+@app.route('/api/workflow/report')
+def get_live_report():
+    """Get the report of the current run as far as it has been written"""
+    if not workflow_status['output_dir']:
+        return jsonify({'error': 'No workflow has been started'}), 404
+    
+    report_path = Path(workflow_status['output_dir']) / 'financial_analysis_report.md'
+    if not report_path.exists():
+        return jsonify({'content': '', 'html': '', 'sections': []})
+    
+    with open(report_path, 'r') as f:
+        content = f.read()
+    return jsonify({
+        'content': content,
+        'html': render_markdown(content),
+        'sections': workflow_status['sections'],
+        'completed': workflow_status['completed']
+    })
 
 @app.route('/api/workflow/stop', methods=['POST'])
 def stop_workflow():
@@ -149,11 +332,22 @@ def list_reports():
         for report_dir in reports_dir.iterdir():
             if report_dir.is_dir():
                 report_file = report_dir / 'financial_analysis_report.md'
-                if report_file.exists():
+                checkpoint_file = report_dir / 'checkpoint.json'
+                if report_file.exists() or checkpoint_file.exists():
+                    status_file = report_dir / 'run_status.json'
+                    status = None
+                    if status_file.exists():
+                        with open(status_file, 'r') as f:
+                            status = json.load(f).get('status')
+                    is_current = workflow_status['running'] and workflow_status['output_dir'] == str(report_dir)
+                    modified_file = report_file if report_file.exists() else checkpoint_file
                     reports.append({
                         'name': report_dir.name,
                         'path': str(report_file),
-                        'created': datetime.datetime.fromtimestamp(report_file.stat().st_mtime).isoformat()
+                        'status': status,
+                        'has_report': report_file.exists(),
+                        'resumable': checkpoint_file.exists() and status != 'completed' and not is_current,
+                        'created': datetime.datetime.fromtimestamp(modified_file.stat().st_mtime).isoformat()
                     })
     
     # Sort by creation time (newest first)
@@ -188,17 +382,7 @@ def view_report(report_name):
             markdown_content = f.read()
         
         # Convert markdown to HTML
-        html_content = markdown.markdown(
-            markdown_content,
-            extensions=[
-                'markdown.extensions.tables',
-                'markdown.extensions.fenced_code',
-                'markdown.extensions.codehilite',
-                'markdown.extensions.toc',
-                'markdown.extensions.attr_list',
-                'markdown.extensions.def_list'
-            ]
-        )
+        html_content = render_markdown(markdown_content)
         
         # Get current time for display
         current_time = datetime.datetime.now().strftime('%B %d, %Y at %I:%M %p')
@@ -225,69 +409,111 @@ def infrastructure():
     """Infrastructure visualization page"""
     return render_template('infrastructure.html')
 
-def run_workflow_async(company_name):
+def run_workflow_async(company_name, budget_args=None):
     """Run the financial workflow asynchronously"""
     global workflow_status
+    job_id = workflow_status['job_id']
     
     try:
-        # Set SSL certificate environment variable
+        # Set SSL certificate environment variable; the run inherits the rest of the
+        # environment (e.g. FA_FAKE_SERVICE_URL for load testing)
         env = os.environ.copy()
-        env['SSL_CERT_FILE'] = '/Users/crazykevin/Desktop/hackathon_fa_agents/.venv/lib/python3.11/site-packages/certifi/cacert.pem'
+        if 'SSL_CERT_FILE' not in env:
+            try:
+                import certifi
+                env['SSL_CERT_FILE'] = certifi.where()
+            except ImportError:
+                pass
         
         # Emit start message
-        socketio.emit('workflow_started', {'company': company_name})
+        event_hub.publish(job_id, 'workflow_started', {'company': company_name, 'job_id': job_id})
+        
+        # The workflow publishes its typed events to this pipe
+        event_read_fd, event_write_fd = os.pipe()
+        env['FA_EVENT_FD'] = str(event_write_fd)
         
         # Run the workflow script
-        process = subprocess.Popen(
-            [sys.executable, 'financial_analysis_workflow.py'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-            env=env,
-            cwd='/Users/crazykevin/Desktop/hackathon_fa_agents'
-        )
+        try:
+            process = subprocess.Popen(
+                [sys.executable, 'financial_analysis_workflow.py'] + (budget_args or [])
+                + (['--company', company_name] if company_name else []),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                universal_newlines=True,
+                env=env,
+                pass_fds=(event_write_fd,),
+                cwd=os.environ.get('FA_WORKFLOW_DIR', os.path.dirname(os.path.abspath(__file__)))
+            )
+        except Exception:
+            os.close(event_read_fd)
+            raise
+        finally:
+            os.close(event_write_fd)
         
-        # Stream output in real-time
+        # A background task of the server's async mode, so the reader never blocks an eventlet/gevent hub
+        event_reader = socketio.start_background_task(handle_workflow_events, job_id, event_read_fd)
+        
+        # Stream output in real-time; slow clients are handled by their send queues
         for line in iter(process.stdout.readline, ''):
             if line:
-                log_capture.write(line)
-                time.sleep(0.1)  # Small delay to prevent overwhelming the client
+                log_capture.write(line, job_id)
         
         process.wait()
+        # The last events (e.g. the final budget usage) arrive before the pipe closes
+        event_reader.join()
+        finished_log = run_logs.pop(job_id, None)
+        if finished_log is not None:
+            finished_log.close()
         
         # Check if process completed successfully
         if process.returncode == 0:
             workflow_status['completed'] = True
             workflow_status['running'] = False
             workflow_status['end_time'] = datetime.datetime.now().isoformat()
-            socketio.emit('workflow_completed', {'status': 'success'})
+            event_hub.publish(job_id, 'workflow_completed', {'status': 'success', 'budget': workflow_status['budget']})
         else:
             workflow_status['error'] = f'Process exited with code {process.returncode}'
             workflow_status['running'] = False
             workflow_status['end_time'] = datetime.datetime.now().isoformat()
-            socketio.emit('workflow_error', {'error': workflow_status['error']})
+            event_hub.publish(job_id, 'workflow_error', {'error': workflow_status['error']})
             
     except Exception as e:
         workflow_status['error'] = str(e)
         workflow_status['running'] = False
         workflow_status['end_time'] = datetime.datetime.now().isoformat()
-        socketio.emit('workflow_error', {'error': str(e)})
+        event_hub.publish(job_id, 'workflow_error', {'error': str(e)})
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     emit('connected', {'message': 'Connected to Financial Analysis Workflow'})
 
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """Join the room of a job and return its current state"""
+    job_id = Path(str((data or {}).get('job_id') or workflow_status['job_id'] or '')).name
+    if not job_id:
+        return {'error': 'No job to subscribe to'}
+    event_hub.subscribe(request.sid, job_id)
+    is_current = job_id == workflow_status['job_id']
+    return {
+        'job_id': job_id,
+        'running': is_current and workflow_status['running'],
+        'completed': is_current and workflow_status['completed'],
+        'error': workflow_status['error'] if is_current else None,
+    }
+
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    event_hub.unsubscribe(request.sid)
     print('Client disconnected')
 
 if __name__ == '__main__':
     # Create outputs directory if it doesn't exist
     Path('outputs').mkdir(exist_ok=True)
     
-    # Run the Flask app with SocketIO
-    socketio.run(app, debug=True, host='0.0.0.0', port=8080)
+    # Run the Flask app with SocketIO (the debug server unless an async worker is configured)
+    socketio.run(app, debug=ASYNC_MODE == 'threading', host='0.0.0.0', port=int(os.environ.get('FA_WEB_PORT', 8080)))
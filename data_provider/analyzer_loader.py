@@ -0,0 +1,173 @@
+"""Fast, schema-validated loading of analyzer outputs.
+
+Analyzer outputs (e.g. financial_data.json) are parsed with orjson when it
+is installed, and every record is then validated and converted in bulk:
+- the metric names are checked against the fields of the analyzer schema
+  (financial_metrics.json) for unknown, duplicate and missing metrics
+- JSON numbers are copied as they are; every text cell of every company is
+  parsed in one vectorized pass with the cleansing rules
+  (tools.data_cleansing.parse_numeric_cells), so numeric strings such as
+  "£68,187m" or "(1,234)" become numbers, and text (or any other value) that
+  is not a number is reported with its company, metric and year
+
+The result is a typed metric table (a MetricStore, NaN where a value is
+missing or invalid) and a validation report, instead of raw strings that
+only fail later in the analysis tools.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from data_provider.metric_store import MetricStore, load_metric_schema
+from tools.data_cleansing import parse_numeric_cells, year_columns
+
+try:
+    import orjson
+except ImportError:  # the standard library parser is used without orjson
+    orjson = None
+
+
+def parse_json(data: bytes) -> Any:
+    """
+    Parse JSON bytes, with orjson when it is installed.
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON (orjson's error is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_metric_tables(path: str | Path) -> dict[str, list[dict[str, Any]]]:
+    """
+    Read an analyzer output as metric tables per company.
+
+    Files holding a list of metric records (e.g. tesco.json) are keyed by the
+    file name; files holding a dict of company to records are used as is.
+    """
+    path = Path(path)
+    data = parse_json(path.read_bytes())
+    if isinstance(data, list):
+        return {path.stem: data}
+    if isinstance(data, dict):
+        return data
+    raise ValueError(f"Unsupported analyzer output format in {path}")
+
+
+def validate_metric_tables(
+    tables: dict[str, list[dict[str, Any]]], fields: list[str] | None = None
+) -> tuple[MetricStore, dict[str, Any]]:
+    """
+    Validate metric tables against the schema and convert them to a typed table.
+
+    Args:
+        tables: Metric records per company, e.g. {"tesco": [{"Metric": ..., "2024": "£68,187m"}]}
+        fields: The schema's metric fields (default: financial_metrics.json); empty to skip the field checks
+
+    Returns:
+        The metric store [company, metric, year] and the validation report:
+        counts, malformed records, unknown and duplicate metrics, schema
+        fields missing per company, and the cells that are not numbers
+    """
+    # One pass over the records: malformed ones are reported, a metric
+    # repeated within a company keeps its first record
+    companies = list(tables)
+    company_codes = {company: code for code, company in enumerate(companies)}
+    metric_codes: dict[str, int] = {}
+    seen: set[tuple[str, str]] = set()
+    kept, malformed, duplicates = [], [], []
+    for company, records in tables.items():
+        if not isinstance(records, list):
+            malformed.append({"company": company, "index": None, "reason": "metric records are not a list"})
+            continue
+        for index, record in enumerate(records):
+            metric = record.get("Metric") if isinstance(record, dict) else None
+            if not isinstance(metric, str) or not metric.strip():
+                malformed.append({"company": company, "index": index, "reason": "record without a metric name"})
+            elif (company, metric) in seen:
+                duplicates.append({"company": company, "metric": metric})
+            else:
+                seen.add((company, metric))
+                metric_codes.setdefault(metric, len(metric_codes))
+                kept.append((company, record))
+    metrics = list(metric_codes)
+    years = year_columns([record for _, record in kept])
+
+    # All cells in one array, parsed in one vectorized pass
+    raw = np.array([list(map(record.get, years)) for _, record in kept], dtype=object)
+    raw = raw.reshape(len(kept), len(years))
+    present = raw != None  # noqa: E711 - element-wise comparison
+    cells = raw.ravel()
+    numbers = np.fromiter((isinstance(cell, (int, float)) and not isinstance(cell, bool) for cell in cells),
+                          dtype=bool, count=cells.size).reshape(raw.shape)
+    texts = np.fromiter((isinstance(cell, str) for cell in cells), dtype=bool, count=cells.size).reshape(raw.shape)
+    values = np.full(raw.shape, np.nan)
+    valid = np.zeros(raw.shape, dtype=bool)
+    coerced = np.zeros(raw.shape, dtype=bool)
+    # Numbers need no parsing; only the text cells go through the cleansing rules
+    values[numbers] = raw[numbers].astype(float)
+    valid[numbers] = np.isfinite(values[numbers])
+    values[~valid] = np.nan
+    parsed = parse_numeric_cells(raw[texts].astype(str))
+    values[texts] = parsed["values"]
+    valid[texts] = parsed["valid"]
+    coerced[texts] = parsed["symbols_removed"] | parsed["negative"] | parsed["billions"]
+
+    cube = np.full((len(companies), len(metrics), len(years)), np.nan)
+    row_companies = np.array([company_codes[company] for company, _ in kept], dtype=np.intp)
+    row_metrics = np.array([metric_codes[record["Metric"]] for _, record in kept], dtype=np.intp)
+    cube[row_companies, row_metrics] = values
+    store = MetricStore(cube, np.array(companies, dtype=str), np.array(metrics, dtype=str), np.array(years, dtype=str))
+
+    invalid_mask = present & ~valid
+    report: dict[str, Any] = {
+        "companies": len(companies),
+        "records": len(kept) + len(duplicates) + len(malformed),
+        "metrics": len(metrics),
+        "years": years,
+        "cells": int(raw.size),
+        "null_cells": int((~present).sum()),
+        "coerced_cells": int((present & valid & coerced).sum()),
+        "invalid_cells": [
+            {"company": kept[i][0], "metric": kept[i][1]["Metric"], "year": years[j], "raw": raw[i, j]}
+            for i, j in zip(*np.nonzero(invalid_mask))
+        ],
+        "malformed_records": malformed,
+        "duplicate_metrics": duplicates,
+        "unknown_metrics": [],
+        "missing_fields": {},
+    }
+    if fields is None:
+        fields = list(load_metric_schema())
+    if fields:
+        known = np.isin(np.array(metrics, dtype=str), np.array(fields, dtype=str)) if metrics else np.zeros(0, dtype=bool)
+        report["unknown_metrics"] = [metric for metric, ok in zip(metrics, known) if not ok]
+        # Schema fields a company has no record for, as a [company, field] matrix
+        has_record = np.zeros((len(companies), len(metrics) + 1), dtype=bool)
+        has_record[row_companies, row_metrics] = True
+        # Fields no company has point at the always-False last column
+        field_codes = np.array([metric_codes.get(field, len(metrics)) for field in fields], dtype=np.intp)
+        missing = ~has_record[:, field_codes]
+        for c in np.nonzero(missing.any(axis=1))[0]:
+            report["missing_fields"][companies[c]] = [fields[f] for f in np.nonzero(missing[c])[0]]
+    report["valid"] = not (report["invalid_cells"] or malformed or duplicates or report["unknown_metrics"])
+    return store, report
+
+
+def load_analyzer_output(
+    path: str | Path, fields: list[str] | None = None
+) -> tuple[dict[str, list[dict[str, Any]]], MetricStore, dict[str, Any]]:
+    """
+    Load and validate an analyzer output file.
+
+    Returns:
+        The raw metric tables, the typed metric store and the validation report
+    """
+    tables = read_metric_tables(path)
+    store, report = validate_metric_tables(tables, fields)
+    report["source"] = str(path)
+    return tables, store, report
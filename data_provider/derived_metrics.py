@@ -0,0 +1,221 @@
+"""Derived metrics: sector ratios materialized at ingest time.
+
+Every formula in the sector formula set (sector_formulas.txt, or the file
+named by FA_SECTOR_FORMULAS) is evaluated for every company and year of a
+metric store in one vectorized pass, and the results are saved as a derived
+metric store next to the raw one (`<name>.derived/`, the same format as
+`<name>.metrics/` with one "metric" per ratio). Its manifest records the
+source fingerprint, the formulas it was built from and the formulas that
+could not be evaluated.
+
+The table is rebuilt when the analyzer data or the formula set changes, so
+the formula analysis can look ratios up instead of calculating them. The
+formulas form a dependency graph over the base metric fields of the analyzer
+schema (financial_metrics.json), see tools.formulas.FormulaGraph. A rebuild
+compares the fingerprints of every base metric and the signature of every
+formula with the ones in the manifest and only recomputes the formulas
+downstream of a change; the other ratios are copied from the previous table.
+Formulas with missing inputs are reported before anything is evaluated.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from data_provider.metric_store import (
+    MetricStore, file_sha256, load_metric_schema, load_metric_store, read_manifest, store_path_for,
+)
+from tools.formulas import FormulaGraph, parse_formulas
+
+DERIVED_SUFFIX = ".derived"
+SECTOR_FORMULAS_PATH = Path(__file__).parent / "sector_formulas.txt"
+
+
+def sector_formulas_path() -> Path:
+    """The sector formula set: FA_SECTOR_FORMULAS, or the bundled sector_formulas.txt."""
+    return Path(os.environ.get("FA_SECTOR_FORMULAS", "").strip() or SECTOR_FORMULAS_PATH)
+
+
+def load_sector_formulas(path: str | Path | None = None) -> dict[str, str]:
+    """Parse a formula file ("Name = expression" lines, # comments allowed) into a formula dict."""
+    with open(path or sector_formulas_path(), "r", encoding="utf-8") as f:
+        text = "\n".join(line for line in f.read().splitlines() if not line.lstrip().startswith("#"))
+    return parse_formulas(text)
+
+
+def formulas_sha256(formulas: dict[str, str]) -> str:
+    """Fingerprint of a formula set, used to detect when a derived store is stale."""
+    payload = json.dumps(formulas, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def derived_path_for(json_path: str | Path, output_dir: str | Path | None = None) -> Path:
+    """Derived store directory for an analyzer JSON file, next to its metric store."""
+    store_path = store_path_for(json_path, output_dir)
+    return store_path.with_name(Path(json_path).stem + DERIVED_SUFFIX)
+
+
+def _fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def input_fingerprints(store: MetricStore) -> dict[str, str]:
+    """Fingerprint of every base metric's values across all companies and years."""
+    values = np.asarray(store.values, dtype=np.float64)
+    return {str(metric): _fingerprint(np.ascontiguousarray(values[:, m, :]).tobytes())
+            for m, metric in enumerate(store.metrics)}
+
+
+def formula_graph(formulas: dict[str, str], store: MetricStore) -> FormulaGraph:
+    """Dependency graph of formulas over the schema's base fields (and any other metric of the store)."""
+    fields = list(load_metric_schema())
+    fields += [str(metric) for metric in store.metrics if str(metric) not in fields]
+    return FormulaGraph(formulas, fields)
+
+
+def formula_signatures(graph: FormulaGraph) -> dict[str, str]:
+    """
+    Dependency signature of every evaluable formula.
+
+    A signature covers the formula's expression, the signatures of the
+    formulas it uses (so every transitive dependency) and the base fields its
+    variables resolved to. It does not depend on the formula's name, so the
+    same formula under another name or abbreviation has the same signature.
+    """
+    signatures: dict[str, str] = {}
+    for name in graph.order:
+        # Dependencies come first in evaluation order
+        inputs = sorted((placeholder, kind, target if kind == "field" else signatures[target])
+                        for placeholder, (kind, target) in graph.inputs[name].items())
+        payload = [ast.dump(graph.trees[name]), inputs, sorted(graph.base_fields(name))]
+        signatures[name] = _fingerprint(json.dumps(payload).encode("utf-8"))
+    return signatures
+
+
+def derive_metrics(
+    store: MetricStore,
+    formulas: dict[str, str],
+    previous: tuple[MetricStore, dict[str, Any]] | None = None,
+) -> tuple[MetricStore, dict[str, list[str]], list[str]]:
+    """
+    Evaluate formulas for every company and year of a store.
+
+    Args:
+        store: The base metrics
+        formulas: Formula name to expression
+        previous: An earlier derived store and its manifest; only the formulas
+            affected by changed metrics or formulas are recomputed, provided it
+            has the same companies and years
+
+    Returns:
+        The derived store [company, formula, year] with the evaluated
+        formulas, the missing inputs of the formulas that could not be
+        evaluated, and the formulas that were (re)computed
+    """
+    values = np.asarray(store.values, dtype=float)
+    metric_values = {str(metric): values[:, m, :] for m, metric in enumerate(store.metrics)}
+    graph = formula_graph(formulas, store)
+    missing = graph.missing_inputs(metric_values)
+    if missing:
+        logging.warning(f"{len(missing)} formula(s) cannot be evaluated: "
+                        + "; ".join(f"{name} (missing {', '.join(inputs)})" for name, inputs in missing.items()))
+
+    reused: dict[str, np.ndarray] = {}
+    only = None
+    if (previous is not None and np.array_equal(previous[0].companies, store.companies)
+            and np.array_equal(previous[0].years, store.years)):
+        derived, manifest = previous
+        reused = {str(name): np.asarray(derived.values[:, r, :]) for r, name in enumerate(derived.metrics)}
+        fingerprints, recorded = input_fingerprints(store), manifest.get("input_fingerprints", {})
+        changed_fields = [field for field in set(fingerprints) | set(recorded) if fingerprints.get(field) != recorded.get(field)]
+        signatures, recorded = formula_signatures(graph), manifest.get("formula_signatures", {})
+        changed_formulas = [name for name in graph.order if signatures[name] != recorded.get(name) or name not in reused]
+        only = graph.dependents(changed_fields, changed_formulas)
+
+    results, _ = graph.evaluate(metric_values, previous=reused, only=only)
+    recomputed = [name for name in (graph.order if only is None else only) if name in results]
+    names = [name for name in formulas if name in results]
+    cube = (np.stack([results[name] for name in names], axis=1) if names
+            else np.empty((len(store.companies), 0, len(store.years))))
+    derived = MetricStore(cube, store.companies, np.array(names, dtype=str), store.years)
+    return derived, missing, recomputed
+
+
+def _open_previous(path: Path) -> tuple[MetricStore, dict[str, Any]] | None:
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+    try:
+        # Read into memory: the store is about to be overwritten
+        return MetricStore.open(path, mmap=False), manifest
+    except (OSError, ValueError):
+        return None
+
+
+def materialize_derived_metrics(
+    json_path: str | Path,
+    output_dir: str | Path | None = None,
+    store: MetricStore | None = None,
+    formulas_path: str | Path | None = None,
+    incremental: bool = True,
+) -> Path:
+    """
+    Evaluate the sector formula set over an analyzer output and save the derived store.
+
+    Args:
+        json_path: The analyzer output
+        output_dir: Directory of the ingested data (default: cleansed/ next to the input)
+        store: The input's metric store, if already loaded
+        formulas_path: Formula file (default: the sector formula set)
+        incremental: Only recompute the formulas affected by changes since the existing derived store
+
+    Returns:
+        The derived store directory
+    """
+    formulas = load_sector_formulas(formulas_path)
+    if store is None:
+        store = load_metric_store(json_path, store_path_for(json_path, output_dir))
+    path = derived_path_for(json_path, output_dir)
+    derived, missing, recomputed = derive_metrics(store, formulas, _open_previous(path) if incremental else None)
+    return derived.save(path, source=json_path, manifest={
+        "formulas": formulas,
+        "formulas_sha256": formulas_sha256(formulas),
+        "input_fingerprints": input_fingerprints(store),
+        "formula_signatures": formula_signatures(formula_graph(formulas, store)),
+        "unresolved": missing,
+        "recomputed": recomputed,
+    })
+
+
+def load_derived_metrics(
+    json_path: str | Path,
+    output_dir: str | Path | None = None,
+    formulas_path: str | Path | None = None,
+) -> tuple[MetricStore, dict[str, Any]]:
+    """
+    Open the derived store of an analyzer output, rebuilding it first if it is
+    missing or was built from other data, another formula set or formulas
+    whose variables now resolve to other fields.
+
+    Returns:
+        The derived store and its manifest
+    """
+    path = derived_path_for(json_path, output_dir)
+    manifest = read_manifest(path)
+    formulas = load_sector_formulas(formulas_path)
+    stale = (manifest is None
+             or manifest.get("source_sha256") != file_sha256(json_path)
+             or manifest.get("formulas_sha256") != formulas_sha256(formulas))
+    if not stale:
+        store = load_metric_store(json_path, store_path_for(json_path, output_dir))
+        stale = manifest.get("formula_signatures") != formula_signatures(formula_graph(formulas, store))
+    if stale:
+        materialize_derived_metrics(json_path, output_dir, formulas_path=formulas_path)
+        manifest = read_manifest(path)
+    return MetricStore.open(path), manifest
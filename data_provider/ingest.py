@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Analyzer Output Ingestion.
+
+This script ingests Content Understanding analyzer outputs (e.g.
+analyzer_output/financial_data.json) into analysis-ready data:
+- Loads each input with the fast, schema-validated loader and writes its
+  validation report (unknown metrics, cells that are not numbers, ...)
+- Cleanses every metric table with the deterministic cleansing rules
+- Writes the cleansed data and a cleansing report next to each input
+- Converts the raw data to a memory-mappable columnar metric store
+- Materializes every sector ratio for every company and year into a derived
+  metric store next to it (see data_provider/derived_metrics.py)
+
+Run from the repository root:
+    python -m data_provider.ingest [analyzer output files...]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+from data_provider.analyzer_loader import load_analyzer_output
+from data_provider.derived_metrics import materialize_derived_metrics
+from data_provider.metric_store import read_manifest, store_path_for
+from tools.data_cleansing import cleanse_metric_tables
+
+ANALYZER_OUTPUT_DIR = Path(__file__).parent / "content_understanding" / "analyzer_output"
+CLEANSED_DIR_NAME = "cleansed"
+
+
+def ingest_file(path: Path, output_dir: Path) -> dict[str, Any]:
+    """
+    Ingest a single analyzer output file.
+
+    Returns:
+        The cleansing report for the file
+    """
+    tables, store, validation = load_analyzer_output(path)
+    cleansed, report = cleanse_metric_tables(tables)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / path.name, "w", encoding="utf-8") as f:
+        json.dump(cleansed, f, indent=2)
+    with open(output_dir / f"{path.stem}.cleansing_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(output_dir / f"{path.stem}.validation_report.json", "w", encoding="utf-8") as f:
+        json.dump(validation, f, indent=2)
+    store.save(store_path_for(path, output_dir), source=path)
+    derived = read_manifest(materialize_derived_metrics(path, output_dir, store=store))
+
+    if not validation["valid"]:
+        logging.warning(
+            f"{path.name} does not match the analyzer schema: {len(validation['invalid_cells'])} non-numeric cells, "
+            f"{len(validation['unknown_metrics'])} unknown metrics, {len(validation['duplicate_metrics'])} duplicates, "
+            f"{len(validation['malformed_records'])} malformed records (see {path.stem}.validation_report.json)"
+        )
+    logging.info(
+        f"Ingested {path.name}: {report['rows_out']}/{report['rows_in']} metrics kept, "
+        f"{len(report['coerced'])} values coerced, {len(report['dropped'])} metrics dropped, "
+        f"{derived['shape'][1]}/{len(derived['formulas'])} sector ratios materialized "
+        f"({len(derived['recomputed'])} recomputed)"
+    )
+    return report
+
+
+def main() -> None:
+    """Ingest the given analyzer outputs (default: every file in analyzer_output/)."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Ingest Content Understanding analyzer outputs.")
+    parser.add_argument("paths", nargs="*", type=Path, help="Analyzer output JSON files")
+    parser.add_argument("--output-dir", type=Path, default=ANALYZER_OUTPUT_DIR / CLEANSED_DIR_NAME,
+                        help="Directory for the ingested data")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(ANALYZER_OUTPUT_DIR.glob("*.json"))
+    try:
+        for path in paths:
+            ingest_file(path, args.output_dir)
+        print(f"✅ Ingested {len(paths)} analyzer output(s) into {args.output_dir}")
+    except (ValueError, json.JSONDecodeError, FileNotFoundError) as e:
+        logging.error(f"Ingestion failed: {e}")
+        print(f"❌ Ingestion failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
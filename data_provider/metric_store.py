@@ -0,0 +1,263 @@
+"""Compact columnar storage for financial metric datasets.
+
+A metric store is a directory of NumPy files:
+- values.npy     float64 cube [company, metric, year], NaN where a value is missing
+- companies.npy  company names (dictionary for the company axis)
+- metrics.npy    metric names (dictionary for the metric axis)
+- years.npy      fiscal years (dictionary for the year axis)
+- manifest.json  shape and the source file it was converted from
+
+Opening a store memory-maps values.npy, so reads touch only the pages they
+need and nothing is parsed. Stores are converted from the analyzer JSON
+(e.g. financial_data.json) on ingest. A store is written to a temporary
+sibling directory and swapped into place under an exclusive lock, while
+opening a store takes a shared one: processes rebuilding the same store at
+once never write into files another process has open or mapped, and readers
+never see half of one store and half of another.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no locking without fcntl (Windows); stores are still replaced whole
+    fcntl = None
+
+
+STORE_SUFFIX = ".metrics"
+MANIFEST_FILE_NAME = "manifest.json"
+METRIC_SCHEMA_PATH = Path(__file__).parent / "content_understanding" / "analyzer_templates" / "financial_metrics.json"
+
+
+def file_sha256(path: str | Path) -> str:
+    """Fingerprint of a source file, used to detect when a store is stale."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_metric_schema(path: str | Path = METRIC_SCHEMA_PATH) -> dict[str, dict[str, Any]]:
+    """The metric fields of the analyzer schema (financial_metrics.json): field name to type, method and description."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["fieldSchema"]["fields"]
+
+
+class MetricStore:
+    """
+    Columnar financial metrics for many companies, addressed by name or by code.
+
+    Args:
+        values: Cube of values [company, metric, year]
+        companies: Company names, one per company code
+        metrics: Metric names, one per metric code
+        years: Fiscal years, one per year code
+    """
+
+    def __init__(self, values: np.ndarray, companies: np.ndarray, metrics: np.ndarray, years: np.ndarray):
+        self.values = values
+        self.companies = companies
+        self.metrics = metrics
+        self.years = years
+        self._company_codes = {str(name).lower(): code for code, name in enumerate(companies)}
+        self._metric_codes = {str(name): code for code, name in enumerate(metrics)}
+        self._year_codes = {str(year): code for code, year in enumerate(years)}
+
+    @classmethod
+    def from_tables(cls, tables: dict[str, list[dict[str, Any]]]) -> "MetricStore":
+        """
+        Build a store from analyzer metric tables ({company: [{"Metric": ..., "2024": "1,234"}]}).
+
+        Raw values are parsed with the cleansing rules in one vectorized pass;
+        unlike cleansing, incomplete metrics are kept with NaN for missing years.
+        See data_provider.analyzer_loader for the validation report.
+        """
+        from data_provider.analyzer_loader import validate_metric_tables
+
+        return validate_metric_tables(tables, fields=[])[0]
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "MetricStore":
+        """Convert an analyzer JSON file (a company dict or a single company's list) to a store."""
+        from data_provider.analyzer_loader import read_metric_tables
+
+        return cls.from_tables(read_metric_tables(path))
+
+    @classmethod
+    def open(cls, path: str | Path, mmap: bool = True) -> "MetricStore":
+        """
+        Open a saved store.
+
+        Args:
+            path: Store directory
+            mmap: Memory-map the value cube instead of reading it into memory
+        """
+        path = Path(path)
+        with store_lock(path):
+            values = np.load(path / "values.npy", mmap_mode="r" if mmap else None)
+            return cls(
+                values,
+                np.load(path / "companies.npy"),
+                np.load(path / "metrics.npy"),
+                np.load(path / "years.npy"),
+            )
+
+    def save(self, path: str | Path, source: str | Path | None = None, manifest: dict[str, Any] | None = None) -> Path:
+        """
+        Write the store to a directory, replacing an existing store.
+
+        The files are written to a temporary sibling directory that then
+        replaces the store, so readers see the old store or the new one and
+        files they have mapped are never truncated.
+
+        Args:
+            path: Store directory
+            source: The file the store was converted from, fingerprinted to detect stale stores
+            manifest: Extra entries for manifest.json
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            np.save(staging / "values.npy", np.ascontiguousarray(self.values, dtype=np.float64))
+            np.save(staging / "companies.npy", self.companies)
+            np.save(staging / "metrics.npy", self.metrics)
+            np.save(staging / "years.npy", self.years)
+            manifest = {
+                "shape": list(self.values.shape),
+                "source": os.fspath(source) if source is not None else None,
+                "source_sha256": file_sha256(source) if source is not None else None,
+                **(manifest or {}),
+            }
+            with open(staging / MANIFEST_FILE_NAME, "w") as f:
+                json.dump(manifest, f, indent=2)
+            with store_lock(path, exclusive=True):
+                _replace_directory(staging, path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return path
+
+    def company_code(self, company: str) -> int:
+        try:
+            return self._company_codes[company.lower()]
+        except KeyError:
+            raise KeyError(f"Unknown company: {company}") from None
+
+    def metric_code(self, metric: str) -> int:
+        try:
+            return self._metric_codes[metric]
+        except KeyError:
+            raise KeyError(f"Unknown metric: {metric}") from None
+
+    def year_code(self, year: str | int) -> int:
+        try:
+            return self._year_codes[str(year)]
+        except KeyError:
+            raise KeyError(f"Unknown year: {year}") from None
+
+    def get(self, company: str, metric: str, year: str | int) -> float | None:
+        """Return a single value, or None when it is missing."""
+        value = self.values[self.company_code(company), self.metric_code(metric), self.year_code(year)]
+        return None if np.isnan(value) else float(value)
+
+    def metric_matrix(self, metric: str) -> np.ndarray:
+        """Values of one metric for every company and year [company, year]."""
+        return self.values[:, self.metric_code(metric), :]
+
+    def company_records(self, company: str) -> list[dict[str, Any]]:
+        """One company's metrics in the analyzer record format, with numbers instead of strings."""
+        block = np.asarray(self.values[self.company_code(company)])
+        records = []
+        for metric_code, metric in enumerate(self.metrics):
+            record: dict[str, Any] = {"Metric": str(metric)}
+            for year_code, year in enumerate(self.years):
+                value = block[metric_code, year_code]
+                record[str(year)] = None if np.isnan(value) else float(value)
+            records.append(record)
+        return records
+
+    def iter_companies(self) -> Iterator[str]:
+        return (str(company) for company in self.companies)
+
+    def to_tables(self) -> dict[str, list[dict[str, Any]]]:
+        return {company: self.company_records(company) for company in self.iter_companies()}
+
+
+@contextmanager
+def store_lock(path: str | Path, exclusive: bool = False) -> Iterator[None]:
+    """
+    Lock a store directory: shared to read it, exclusive to replace it.
+
+    The lock file sits next to the store. Without fcntl, or where the lock
+    file cannot be created (a read-only location), nothing is locked.
+    """
+    path = Path(path)
+    try:
+        lock_file = open(path.with_name(f".{path.name}.lock"), "a") if fcntl is not None else None
+    except OSError:
+        lock_file = None
+    if lock_file is None:
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _replace_directory(staging: Path, path: Path) -> None:
+    """Move a fully written directory into place, replacing (and deleting) the old one."""
+    retired = path.with_name(f".{path.name}.{uuid.uuid4().hex}.old")
+    try:
+        os.replace(path, retired)
+    except FileNotFoundError:
+        retired = None
+    try:
+        os.replace(staging, path)
+    except OSError:
+        # Another process installed its rebuild first; it was built from the same data
+        if not path.is_dir():
+            raise
+    finally:
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+
+
+def store_path_for(json_path: str | Path, output_dir: str | Path | None = None) -> Path:
+    """Store directory for an analyzer JSON file (default: next to it, under cleansed/)."""
+    json_path = Path(json_path)
+    output_dir = Path(output_dir) if output_dir is not None else json_path.parent / "cleansed"
+    return output_dir / f"{json_path.stem}{STORE_SUFFIX}"
+
+
+def read_manifest(store_path: str | Path) -> dict[str, Any] | None:
+    """The manifest of a saved store, or None if there is no store."""
+    manifest_path = Path(store_path) / MANIFEST_FILE_NAME
+    with store_lock(store_path):
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+
+def load_metric_store(json_path: str | Path, store_path: str | Path | None = None) -> MetricStore:
+    """
+    Open the store for an analyzer JSON file, converting the JSON first if the
+    store is missing or was built from a different version of the file.
+    """
+    store_path = Path(store_path) if store_path is not None else store_path_for(json_path)
+    manifest = read_manifest(store_path)
+    if manifest is not None and manifest.get("source_sha256") == file_sha256(json_path):
+        return MetricStore.open(store_path)
+    MetricStore.from_json(json_path).save(store_path, source=json_path)
+    return MetricStore.open(store_path)
@@ -1,44 +1,115 @@
+from __future__ import annotations
+
 import os
 import asyncio
+import argparse
 import datetime
+import json
+from typing import TYPE_CHECKING
 
-from azure.ai.agents.models import FilePurpose
-from azure.identity import DefaultAzureCredential
-from semantic_kernel.agents import (
-    AgentRegistry, AzureAIAgent, AzureAIAgentSettings,
-    StandardMagenticManager, Agent,
+# Semantic Kernel, the Azure SDKs and the plugins are imported where they are
+# first used, so argument parsing and restoring finished runs start quickly
+# (see `python -m workflow.diagnostics`)
+from tools.memoize import MemoizingFilter
+from tools.tool_executor import ToolExecutionFilter
+from workflow.events import (
+    EVENTS_FILE_NAME, MESSAGE_FINAL, RECORDED_EVENTS, RUN_STATUS, STAGE_DONE, TOKEN_DELTA, ConsolePrinter,
+    EventBus, EventStreamWriter, JsonlEventWriter,
 )
-from semantic_kernel.agents.orchestration.magentic import MagenticOrchestration
-from semantic_kernel.agents.runtime import InProcessRuntime
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.kernel import Kernel
-from semantic_kernel.contents import StreamingChatMessageContent, ChatMessageContent
+from workflow.report_writer import SECTION_TITLES, IncrementalReportWriter
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents import Agent, AzureAIAgentSettings
+    from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
+    from semantic_kernel.kernel import Kernel
 
-# Import and register plugins
-from tools.calculator import CalculatorPlugin
-from tools.yoy_calculator import YoYCalculatorPlugin
-from tools.ai_search import RagPlugin
+    from workflow.budget import RunBudget
+    from workflow.checkpoint import RunCheckpoint
+    from workflow.prompt_profile import PromptAccounting
 
 # load .env variables
 from dotenv import load_dotenv
 load_dotenv()
 
-is_new_message = True
+DEFAULT_COMPANY = "Tesco"
+
+TASK_TEMPLATE = """
+                Help me to generate a comprehensive Financial Report through Formula Analysis and Year-over-Year (YoY) Analysis processes.\n\n                The Company name is \"{company}\"\n\n                Your responsibilities:\n                1. Coordinate the execution of two main analytical workflows:\n                - Formula Analysis Process\n                - Year-over-Year (YoY) Analysis Process\n                2. Synthesize results from specialized agents: RAG_agent, Formula_provider, Metric_retrieval_analyst, YoY_analyst ,Calculation_agent and Report_formating_agent\n                3. Ensure all agents complete their tasks and integrate results effectively\n                4. After finishing the `Formula Analysis Process` and `ear-over-Year Analysis Process`, send all the result from the these processes to Report_formating_agent for generating final comprehensive Financial Analysis Report\n\n                Workflow coordination details:\n\n                **Formula Analysis Process:**\n                - Query RAG_agent with company name to identify the corresponding sector\n                - After retrieving the sector of this company, manager should send this sector toFormula_provider, and use this sector information to request relevant formulas and variable names from Formula_provider\n                - Ask Calculation_agent to look up the company's ratios by passing the Formula_provider formulas to its ratio_lookup tool; the sector ratios are precomputed from the ingested data\n                - Only for formulas the ratio_lookup tool reports as unresolved, retrieve the variable information from Metric_retrieval_analyst and return it to Calculation_agent for calculations\n                - Ask Calculation_agent to benchmark the company against its sector peers by passing the Formula_provider formulas to its peer_benchmark tool\n                - Generate Formula Analysis results\n\n                **Year-over-Year Analysis Process:**\n                - After completing Formula Analysis, retrieve 3-year historical company metrics from Metric_retrieval_analyst\n                - Send data to YoY_analyst to get YoY data and the top 10 metrics with changes exceeding 5% (YoY_analyst selects them with its top_movers tool)\n                - Receive metrics list with corresponding change values from YoY_analyst\n                - Query RAG_agent with the metrics list from YoY_analyst to identify root causes for these metric changes\n                - Generate YoY Analysis results by manager\n\n                **Notice**\n                Assign task to RAG agent only when you are going to identify sector of the company in the fomula process and identify root causes for these metric changes in the YoY process.\n                The report and the summarization task should be finish by the manner as the orchestrator itself.\n\n                Manager should proceed the Formula Analysis workflow and YoY process, NOT the RAG Agent.\n\n                **Final Integration:**\n                - Synthesize Formula Analysis and YoY Analysis results\n                - Generate comprehensive Financial Report with actionable insights\n                - Provide confidence levels for all assessments\n                - Handle any errors or exceptions gracefully, ensuring the workflow can recover and continue\n                """
+
+# Agents whose current message has been streamed, so its final version is not shown again
+streaming_agents: set[str] = set()
+event_bus: EventBus | None = None
+run_budget: RunBudget | None = None
+agent_responses: list[ChatMessageContent] = []
+report_writer: IncrementalReportWriter | None = None
+checkpoint: RunCheckpoint | None = None
+prompt_accounting: PromptAccounting | None = None
+function_memo = MemoizingFilter.from_env()
+tool_executor = ToolExecutionFilter.from_env()
 
 def streaming_agent_response_callback(message: StreamingChatMessageContent, is_final: bool) -> None:
-    global is_new_message
-    if is_new_message:
-        print(f"# {message.name}")
-        is_new_message = False
-    print(message.content, end="", flush=True)
-    if is_final:
-        print()
-        is_new_message = True
+    streaming_agents.add(message.name)
+    if message.content:
+        event_bus.publish(TOKEN_DELTA, agent=message.name, content=message.content)
 
 def agent_response_callback(message: ChatMessageContent) -> None:
-    print(f"**{message.name}**\n{message.content}")
+    from workflow.budget import usage_tokens
+    from workflow.rate_limit import get_rate_limiter
+
+    from workflow.prompt_profile import usage_breakdown
+
+    agent_responses.append(message)
+    run_budget.record_usage(message)
+    usage = (message.metadata or {}).get("usage")
+    prompt_tokens, completion_tokens = usage_breakdown(usage)
+    event_bus.publish(MESSAGE_FINAL, agent=message.name, content=message.content or "",
+                      streamed=message.name in streaming_agents,
+                      prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    streaming_agents.discard(message.name)
+    if prompt_accounting is not None:
+        prompt_accounting.record(message.name, usage)
+        static_tokens = prompt_accounting.agents[message.name]["static_tokens"]
+        print(f"📏 {message.name} turn: {prompt_tokens} prompt tokens ({static_tokens} static), "
+              f"{completion_tokens} completion tokens")
+    # Agent runs were charged an estimate when they started; correct it with the reported usage
+    get_rate_limiter().settle_usage(usage_tokens(message))
+    if report_writer is not None:
+        section = report_writer.add(message)
+        if section is not None:
+            event_bus.publish(STAGE_DONE, stage=section, title=SECTION_TITLES[section])
+            if checkpoint is not None:
+                checkpoint.record_stage(section, report_writer.sections[section])
+
+def write_run_status(output_dir: str, status: str) -> None:
+    from workflow.rate_limit import get_rate_limiter
+
+    if status != "running":
+        event_bus.publish(RUN_STATUS, status=status, budget=run_budget.to_dict())
+    with open(os.path.join(output_dir, "run_status.json"), "w") as f:
+        json.dump({"status": status, "budget": run_budget.to_dict(), "memo": function_memo.stats(),
+                   "tool_calls": tool_executor.stats(), "rate_limit": get_rate_limiter().stats(),
+                   "prompts": prompt_accounting.stats() if prompt_accounting is not None else None}, f, indent=2)
+
+def close_event_writers(writers: list[JsonlEventWriter]) -> None:
+    tool_executor.event_bus = None
+    for writer in writers:
+        writer.close()
 
 async def get_agents(kernel: Kernel, settings: AzureAIAgentSettings, client: object) -> list[Agent]:
+    from semantic_kernel.agents import AgentRegistry, AzureAIAgent, AzureAIAgentSettings
+    from semantic_kernel.filters.filter_types import FilterTypes
+    from semantic_kernel.kernel import Kernel
+
+    # Import and register plugins
+    from tools.ai_search import RagPlugin
+    from tools.calculator import CalculatorPlugin
+    from tools.data_cleansing import DataCleansingPlugin
+    from tools.field_resolver import FieldResolverPlugin
+    from tools.peer_benchmark import PeerBenchmarkPlugin
+    from tools.ratio_lookup import RatioLookupPlugin
+    from tools.time_series import TimeSeriesPlugin
+    from tools.yoy_calculator import YoYCalculatorPlugin
+
     rag_agent_kernel = Kernel()
     rag_agent_kernel.add_plugin(RagPlugin(), plugin_name="ai_search")
     print("✅ Registered ai_search plugins to kernel")
@@ -58,13 +129,16 @@ async def get_agents(kernel: Kernel, settings: AzureAIAgentSettings, client: obj
     agent_id = "asst_V6udTBrczM71JlmWE0MzblsY"
     metric_retrieval_analyst_instance = await client.agents.get_agent(agent_id)
     metric_retrieval_analyst_instance.description = "This agent is used to search information from financial data(metrics) in json format, and return the information in json format. The financial data is in the file uploaded to the vector store, containg the financial data for the company Unilever and Tesco across years 2022-2024. The agent will return the metric information in json format."
+    metric_retrieval_kernel = Kernel()
+    metric_retrieval_kernel.add_plugin(FieldResolverPlugin(), plugin_name="field_resolver")
+    print("✅ Registered field_resolver plugin to kernel")
     metric_retrieval_analyst = AzureAIAgent(
-        kernel=kernel,
+        kernel=metric_retrieval_kernel,
         settings=metric_settings,
         client=client,
         name="Metric_Retrieval_Analyst",
         definition=metric_retrieval_analyst_instance,
-        instructions="""You are a financial data assistant that MUST ALWAYS use the file search tool to retrieve information from the financial_data.json file before providing any response.\n\n                        IMPORTANT: For EVERY user query, you MUST:\n                        1. ALWAYS call the file search tool first to search the financial_data.json file\n                        2. Extract the relevant financial data from the search results\n                        3. Format your response as JSON\n\n                        The output should be in the following format:\n                        {\n                            \"company\": \"Tesco\",\n                            \"year\": \"2024\",\n                            \"financial_metrics\": {\n                                \"metric1\": \"value1\",\n                                \"metric2\": \"value2\"\n                            }\n                        }\n\n                        NEVER provide information without first searching the file. If you cannot find relevant information in the file, return \"No relevant information found\"."""
+        instructions="""You are a financial data assistant that MUST ALWAYS use the file search tool to retrieve information from the financial_data.json file before providing any response.\n\n                        IMPORTANT: For EVERY user query, you MUST:\n                        0. When the query names formula variables (e.g. \"Inventories\", \"Shareholders Equity\"), first call field_resolver-resolve_fields with all of them and search for the returned field names; variables it leaves unresolved are not in the data\n                        1. ALWAYS call the file search tool first to search the financial_data.json file\n                        2. Extract the relevant financial data from the search results\n                        3. Format your response as JSON\n\n                        The output should be in the following format:\n                        {\n                            \"company\": \"Tesco\",\n                            \"year\": \"2024\",\n                            \"financial_metrics\": {\n                                \"metric1\": \"value1\",\n                                \"metric2\": \"value2\"\n                            }\n                        }\n\n                        NEVER provide information without first searching the file. If you cannot find relevant information in the file, return \"No relevant information found\"."""
     )
     print(f"✅ Initialized Metric Retrieval Analyst agent")
 
@@ -94,19 +168,27 @@ async def get_agents(kernel: Kernel, settings: AzureAIAgentSettings, client: obj
     agent_id = "asst_SboKcNFaQnkxS6k6mDj3GcGT"
     yoy_analyst_instance = await client.agents.get_agent(agent_id)
     yoy_analyst_instance.description = "An Agent to calculate the year-over-year (YoY) analysis of the metrics"
+    yoy_analyst_kernel = Kernel()
+    yoy_analyst_kernel.add_plugin(DataCleansingPlugin(), plugin_name="data_cleansing")
+    yoy_analyst_kernel.add_plugin(YoYCalculatorPlugin(), plugin_name="yoy_calculator")
+    yoy_analyst_kernel.add_plugin(TimeSeriesPlugin(), plugin_name="time_series")
+    print("✅ Registered data_cleansing, yoy_calculator and time_series plugins to kernel")
     yoy_analyst = AzureAIAgent(
-        kernel=kernel,
+        kernel=yoy_analyst_kernel,
         settings=yoy_analyst_settings,
         client=client,
         name="YoY_Analyst",
         definition=yoy_analyst_instance,
-        instructions="""You are a financial data assistant that MUST ALWAYS use the file search tool to retrieve information from the financial_data.json file before providing any response. \n                        Data Cleansing Instructions:\n                        \n                        1. Remove All Non-Numeric Characters\n                        \n                        Delete currency symbols (e.g., £, $, €), letters, spaces, and other non-numeric characters\n                        \n                        Exception: Preserve commas ,, parentheses ( ), and decimal points .\n                        \n                        Example:\n                        £68,187m → 68,187\n                        $(123.45) → (123.45)\n                        \n                        2. Eliminate Thousand Separators\n                        \n                        Remove all commas (,) used as thousand separators\n                        \n                        Example:\n                        68,187 → 68187\n                        (62,836) → (62836)\n                        \n                        3. Convert Parentheses to Negative Values\n                        \n                        Replace numbers wrapped in parentheses ( ) with negative equivalents:\n                        \n                        Remove parentheses\n                        \n                        Prefix with minus sign -\n                        \n                        Handles space variations automatically\n                        \n                        Example:\n                        (62836) → -62836\n                        ( 123.45 ) → -123.45\n                        \n                        4. Remove all metrics (dictionary entries) that contain any null (empty) values in their year fields\n                        \n                        For example, given json:\n                        {\"Metric\": \"Depreciation\", \"2022\": \"1577\", \"2023\": \"1700\", \"2024\": \"899\"},\n                        {\"Metric\": \"Amortization\", \"2022\": null, \"2023\": \"278\", \"2024\": \"280\"}\n                        \n                        Only keep entries where all year values are not null:\n                        {\"Metric\": \"Depreciation\", \"2022\": \"1577\", \"2023\": \"1700\", \"2024\": \"899\"}\n                        Delete any metric entry that contains null in any year field (e.g., \"2022\", \"2023\", or \"2024\").\n                        \n                        5. After cleansing, call the available calc_yoy tool to calculate the Year-over-Year (YOY) value for each metric using cleansed json data.\n                        \n                        6. Output the json"""
+        instructions="""You are a financial data assistant that MUST ALWAYS use the file search tool to retrieve information from the financial_data.json file before providing any response.\n                        1. Call the data_cleansing-cleanse_metrics tool with the raw metric json. It removes currency symbols, units and thousands separators, converts (123) to -123 and drops metrics with null year values. Do NOT cleanse the data yourself.\n                        \n                        2. Call the calc_yoy tool with the \"metrics\" of the cleansed json to calculate the Year-over-Year (YOY) value for each metric.\n                        \n                        3. When asked for the top metrics or significant changes, call the yoy_calculator-top_movers tool with the calc_yoy output (top_k and threshold_pct as requested). Do NOT rank or filter the metrics yourself.\n                        \n                        4. When more than two years of data are available or multi-year trends are requested, call the time_series-analyze_time_series tool once with all metrics (and all companies) to get CAGR, rolling growth, trend slope and volatility over every year.\n                        \n                        5. Output the json, and list the metrics the cleansing report dropped or coerced"""
     )
     print(f"✅ Initialized YoY Analyst agent")
 
     calculation_agent_kernel = Kernel()
     calculation_agent_kernel.add_plugin(CalculatorPlugin(), plugin_name="calculator")
-    print("✅ Registered calculator plugins to kernel")
+    calculation_agent_kernel.add_plugin(PeerBenchmarkPlugin(), plugin_name="peer_benchmark")
+    calculation_agent_kernel.add_plugin(RatioLookupPlugin(), plugin_name="ratio_lookup")
+    calculation_agent_kernel.add_plugin(FieldResolverPlugin(), plugin_name="field_resolver")
+    print("✅ Registered calculator, peer_benchmark, ratio_lookup and field_resolver plugins to kernel")
     calculation_agent = await AgentRegistry.create_from_file(
         f"src/agents/declarative/calculation_agent.yaml",
         kernel=calculation_agent_kernel,
@@ -123,75 +205,217 @@ async def get_agents(kernel: Kernel, settings: AzureAIAgentSettings, client: obj
     )
     print(f"✅ Initialized Report_formating_agent Agent")
 
+    for agent_kernel in (kernel, rag_agent_kernel, metric_retrieval_kernel, yoy_analyst_kernel, calculation_agent_kernel):
+        agent_kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, function_memo)
+        agent_kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, tool_executor)
+    print("✅ Registered memoizing and tool execution filters to agent kernels")
+
     return [rag_agent, metric_retrieval_analyst, formula_provider, yoy_analyst, calculation_agent, report_formating_agent]
 
-async def main():
+async def main(budget: RunBudget | None = None, output_dir: str | None = None, resume: str | None = None,
+               company: str | None = None):
+    global run_budget, report_writer, checkpoint, prompt_accounting, event_bus
+    from workflow.budget import RunBudget
+    from workflow.checkpoint import RunCheckpoint, resolve_run_dir
+
+    run_budget = budget or RunBudget.from_env()
+    if resume:
+        output_dir = resolve_run_dir(resume)
+        checkpoint = RunCheckpoint.load(output_dir)
+        company = company or checkpoint.company or DEFAULT_COMPANY
+    else:
+        output_dir = output_dir or os.path.join("outputs", datetime.datetime.now().strftime("%Y%m%d_%H%M"))
+        os.makedirs(output_dir, exist_ok=True)
+        company = company or DEFAULT_COMPANY
+        checkpoint = RunCheckpoint(output_dir)
+    checkpoint.company = company
+    checkpoint.save()
+    # Reset per-run state, the module may run several companies in one process (see workflow.batch)
+    agent_responses.clear()
+    streaming_agents.clear()
+    prompt_accounting = None
+    # Run output goes through the event bus: console, events.jsonl and the web app's pipe (FA_EVENT_FD)
+    event_bus = EventBus()
+    event_bus.subscribe(ConsolePrinter())
+    event_writers = [JsonlEventWriter(os.path.join(output_dir, EVENTS_FILE_NAME))]
+    stream_writer = EventStreamWriter.from_env()
+    if stream_writer is not None:
+        event_writers.append(stream_writer)
+    for writer in event_writers:
+        event_bus.subscribe(writer, types=RECORDED_EVENTS)
+    tool_executor.event_bus = event_bus
+    report_writer = IncrementalReportWriter(output_dir, company)
+    report_writer.restore(checkpoint.stages)
+    write_run_status(output_dir, "running")
+    print(f"📁 Run directory: {output_dir}")
+    print(f"🏢 Company: {company}")
+    if resume:
+        print(f"♻️ Resuming run, completed stages: {', '.join(checkpoint.completed_stages) or 'none'}")
+        if checkpoint.final_result is not None:
+            output_file_path = report_writer.finalize(checkpoint.final_result)
+            print(f"✅ Run already finished, report restored to {output_file_path}")
+            write_run_status(output_dir, "completed")
+            close_event_writers(event_writers)
+            return
     try:
-        creds = DefaultAzureCredential()
-        client = AzureAIAgent.create_client(credential=creds)
+        from azure.identity import DefaultAzureCredential
+        from semantic_kernel.agents import AzureAIAgent, AzureAIAgentSettings
+        from semantic_kernel.agents.runtime import InProcessRuntime
+        from semantic_kernel.kernel import Kernel
+
+        from workflow.budget import MeteredAzureChatCompletion, build_partial_report
+        from workflow.checkpoint import ResumableMagenticManager, message_from_dict
+        from workflow.history import BoundedMagenticOrchestration, HistoryPolicy
+        from workflow.prompt_profile import PromptAccounting
+        from workflow.rate_limit import AgentRateLimitPolicy, get_rate_limiter
+        from workflow.regenerate import record_section_inputs
+
+        fake_service_url = os.environ.get("FA_FAKE_SERVICE_URL")
+        if fake_service_url:
+            # Load testing against workflow/fake_service.py instead of Azure
+            from workflow.fake_service import agents_client_options, chat_completion_options
+
+            client_options = agents_client_options(fake_service_url)
+            agent_endpoint = client_options["endpoint"]
+            print(f"🧪 Using fake service at {fake_service_url}")
+        else:
+            client_options = {"credential": DefaultAzureCredential()}
+            agent_endpoint = os.environ.get("AZURE_AI_AGENT_ENDPOINT", "")
+        # All agents share this client, so its pipeline puts every agent call under the rate limiter
+        client = AzureAIAgent.create_client(custom_hook_policy=AgentRateLimitPolicy(), **client_options)
         
         kernel = Kernel()
         settings = AzureAIAgentSettings(
             model_deployment_name=os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME", ""),
-            endpoint=os.environ.get("AZURE_AI_AGENT_ENDPOINT", "")
+            endpoint=agent_endpoint
         )
         agents = await get_agents(kernel, settings, client)
+        prompt_accounting = PromptAccounting()
+        compacted = prompt_accounting.apply_profile(agents)
+        if compacted:
+            print(f"✂️ Instruction profile '{prompt_accounting.profile}' applied to: {', '.join(compacted)}")
+        prompt_accounting.measure(agents)
+        print(prompt_accounting.format_static())
 
-        chat_completion_service = AzureChatCompletion(
-            deployment_name=os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o"),
-            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-            endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT")
-        )
+        deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o")
+        if fake_service_url:
+            chat_completion_service = MeteredAzureChatCompletion(**chat_completion_options(fake_service_url, deployment_name))
+        else:
+            chat_completion_service = MeteredAzureChatCompletion(
+                deployment_name=deployment_name,
+                api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
+                endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT")
+            )
+        chat_completion_service.budget = run_budget
+        chat_completion_service.prompt_accounting = prompt_accounting
         print("Available agents:")
         for agent in agents:
             print(f"  - {agent.name}- {agent.id}")
 
-        manager = StandardMagenticManager(
-            chat_completion_service=chat_completion_service
+        history_policy = HistoryPolicy.from_env()
+        manager = ResumableMagenticManager(
+            chat_completion_service=chat_completion_service,
+            budget=run_budget,
+            checkpoint=checkpoint,
+            restored_history=[message_from_dict(m) for m in checkpoint.chat_history],
+            history_policy=history_policy,
         )
         print(f"Manager created: {type(manager).__name__}")
 
-        magentic_orchestration = MagenticOrchestration(
+        magentic_orchestration = BoundedMagenticOrchestration(
             name="Manager",
             members=agents,
             manager=manager,
             agent_response_callback=agent_response_callback,
             streaming_agent_response_callback=streaming_agent_response_callback,
-            description="Orchestration of the financial analysis workflow"
+            description="Orchestration of the financial analysis workflow",
+            history_policy=history_policy,
+            event_bus=event_bus,
         )
         print(f"MagenticOrchestration created with {len(agents)} agents")
 
         runtime = InProcessRuntime()
         runtime.start()
+        run_budget.start()
+        print(f"Run budget: {json.dumps(run_budget.to_dict())}")
 
         orchestration_result = await magentic_orchestration.invoke(
-            task=(
-                """
-                Help me to generate a comprehensive Financial Report through Formula Analysis and Year-over-Year (YoY) Analysis processes.\n\n                The Company name is \"Tesco\"\n\n                Your responsibilities:\n                1. Coordinate the execution of two main analytical workflows:\n                - Formula Analysis Process\n                - Year-over-Year (YoY) Analysis Process\n                2. Synthesize results from specialized agents: RAG_agent, Formula_provider, Metric_retrieval_analyst, YoY_analyst ,Calculation_agent and Report_formating_agent\n                3. Ensure all agents complete their tasks and integrate results effectively\n                4. After finishing the `Formula Analysis Process` and `ear-over-Year Analysis Process`, send all the result from the these processes to Report_formating_agent for generating final comprehensive Financial Analysis Report\n\n                Workflow coordination details:\n\n                **Formula Analysis Process:**\n                - Query RAG_agent with company name to identify the corresponding sector\n                - After retrieving the sector of this company, manager should send this sector toFormula_provider, and use this sector information to request relevant formulas and variable names from Formula_provider\n                - Retrieve detailed variable information from Metric_retrieval_analyst\n                - Return data to Calculation_agent for calculations\n                - Generate Formula Analysis results\n\n                **Year-over-Year Analysis Process:**\n                - After completing Formula Analysis, retrieve 3-year historical company metrics from Metric_retrieval_analyst\n                - Send data to YoY_analyst get YoY data and calculate top 10 metrics with changes exceeding 5% with the assistance of Calculation_agent\n                - Receive metrics list with corresponding change values from YoY_analyst\n                - Query RAG_agent with the metrics list from YoY_analyst to identify root causes for these metric changes\n                - Generate YoY Analysis results by manager\n\n                **Notice**\n                Assign task to RAG agent only when you are going to identify sector of the company in the fomula process and identify root causes for these metric changes in the YoY process.\n                The report and the summarization task should be finish by the manner as the orchestrator itself.\n\n                Manager should proceed the Formula Analysis workflow and YoY process, NOT the RAG Agent.\n\n                **Final Integration:**\n                - Synthesize Formula Analysis and YoY Analysis results\n                - Generate comprehensive Financial Report with actionable insights\n                - Provide confidence levels for all assessments\n                - Handle any errors or exceptions gracefully, ensuring the workflow can recover and continue\n                """
-            ),
+            task=TASK_TEMPLATE.format(company=company) + checkpoint.resume_note(),
             runtime=runtime,
         )
 
-        value = await orchestration_result.get()
+        timeout = run_budget.remaining_seconds()
+        if timeout is not None:
+            # Leave the manager time to write the partial report after the deadline
+            timeout += run_budget.grace_seconds
+        try:
+            value = await orchestration_result.get(timeout=timeout)
+            cancelled = False
+        except asyncio.TimeoutError:
+            if run_budget.exhausted_reason is None:
+                run_budget.exhausted_reason = f"deadline of {run_budget.deadline_seconds:.0f}s reached"
+            orchestration_result.cancel()
+            value = build_partial_report(agent_responses, run_budget.exhausted_reason)
+            cancelled = True
         print(f"***** Final Result *****\n{value}")
 
-        print("✅ Workflow completed successfully")
+        if run_budget.exhausted_reason is None:
+            print("✅ Workflow completed successfully")
+        else:
+            print(f"⚠️ Workflow stopped early: {run_budget.exhausted_reason}")
+        print(f"🧮 Memoized calls: {json.dumps(function_memo.stats())}")
+        print(f"⏱️ Tool call latency: {json.dumps(tool_executor.stats())}")
+        print(f"🚦 Rate limiter: {json.dumps(get_rate_limiter().stats())}")
+        print(f"📏 Prompt tokens per agent: {json.dumps(prompt_accounting.stats())}")
+        print(f"🗜️ Chat history: {json.dumps(history_policy.stats())}")
 
-        output_dir = os.path.join("outputs", datetime.datetime.now().strftime("%Y%m%d_%H%M"))
-        os.makedirs(output_dir, exist_ok=True)
-        output_file_path = os.path.join(output_dir, "financial_analysis_report.md")
-        with open(output_file_path, "w") as f:
-            f.write(f"Financial Analysis Report for Tesco\n")
-            f.write(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("### Analysis Results:\n")
-            f.write(str(value))
-            print(f"✅ Report saved to {output_file_path}")
+        checkpoint.record_final_result(value)
+        output_file_path = report_writer.finalize(value)
+        print(f"✅ Report saved to {output_file_path}")
+        # Lets `python -m workflow.regenerate` redo only the sections whose data changed
+        try:
+            record_section_inputs(output_dir, company, checkpoint.stages)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Section inputs not recorded: {e}")
+        write_run_status(output_dir, "completed" if run_budget.exhausted_reason is None else "partial")
 
-        await runtime.stop_when_idle()
+        if cancelled:
+            await runtime.stop()
+        else:
+            await runtime.stop_when_idle()
 
     except Exception as e:
         print(f"❌ An error occurred: {e}")
+        write_run_status(output_dir, "failed")
         raise
+    finally:
+        close_event_writers(event_writers)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the multi-agent financial analysis workflow.")
+    parser.add_argument("--max-rounds", type=int, default=None,
+                        help="Maximum manager rounds (default: FA_MAX_ROUNDS, unbounded if unset)")
+    parser.add_argument("--max-tokens", type=int, default=None,
+                        help="Maximum total tokens for the run (default: FA_MAX_TOKENS, unbounded if unset)")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Wall-clock deadline in seconds (default: FA_DEADLINE_SECONDS, unbounded if unset)")
+    parser.add_argument("--company", default=None,
+                        help=f"Company to analyze (default: {DEFAULT_COMPANY}, or the company of a resumed run)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Run directory for the report (default: outputs/<timestamp>)")
+    parser.add_argument("--resume", default=None, metavar="RUN",
+                        help="Resume a run (directory or run name under outputs/) from its last completed stage")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    args = parse_args()
+    from workflow.budget import RunBudget
+
+    budget = RunBudget.from_env()
+    if args.max_rounds is not None:
+        budget.max_rounds = args.max_rounds
+    if args.max_tokens is not None:
+        budget.max_tokens = args.max_tokens
+    if args.deadline is not None:
+        budget.deadline_seconds = args.deadline
+    asyncio.run(main(budget, args.output_dir, args.resume, args.company)) 
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Tests for validating analyzer outputs."""
+
+import numpy as np
+
+from data_provider.analyzer_loader import validate_metric_tables
+
+
+def test_json_numbers_are_copied_without_parsing():
+    tables = {"acme": [{"Metric": "Revenue", "2023": 1.5e20, "2024": 1e-05},
+                       {"Metric": "Cash", "2023": 12, "2024": "£1,234m"}]}
+    store, report = validate_metric_tables(tables, fields=[])
+    assert np.asarray(store.values).tolist() == [[[1.5e20, 1e-05], [12.0, 1234.0]]]
+    assert report["coerced_cells"] == 1
+    assert report["invalid_cells"] == []
+    assert report["valid"]
+
+
+def test_cells_that_are_not_numbers_or_text_are_invalid():
+    tables = {"acme": [{"Metric": "Revenue", "2023": True, "2024": "n/a"}]}
+    store, report = validate_metric_tables(tables, fields=[])
+    assert np.isnan(np.asarray(store.values)).all()
+    assert [cell["year"] for cell in report["invalid_cells"]] == ["2023", "2024"]
+    assert not report["valid"]
@@ -0,0 +1,35 @@
+"""Tests for the calculator's batch expression evaluation."""
+
+import json
+
+from tools.calculator import CalculatorPlugin
+
+
+def evaluate(expressions: dict, variables: dict) -> dict:
+    return json.loads(CalculatorPlugin().evaluate_expressions(json.dumps(expressions), json.dumps(variables)))
+
+
+def test_variables_bind_by_exact_name_only():
+    result = evaluate({"Coverage": "Cash / Debt"}, {"Operating Cash Flow": 100, "Total Debt": 50})
+    assert result["results"] == {}
+    assert result["errors"]["Coverage"] == "Missing variables: Cash, Debt"
+
+
+def test_partial_names_are_not_bound_to_longer_variables():
+    result = evaluate({"A": "Interest", "B": "Income - Tax"},
+                      {"Interest Expense": 40, "Net Income": 200, "Income Tax": 5})
+    assert result["results"] == {}
+    assert result["errors"]["A"] == "Missing variables: Interest"
+    assert result["errors"]["B"] == "Missing variables: Income, Tax"
+
+
+def test_names_match_ignoring_case_and_spacing():
+    result = evaluate({"Gross Margin": "(revenue - COGS) / Revenue * 100", "Double": "Gross  Margin * 2"},
+                      {"Revenue": "1,000", "cogs": 600})
+    assert result["results"] == {"Gross Margin": 40.0, "Double": 80.0}
+
+
+def test_huge_powers_are_undefined_instead_of_computed():
+    result = evaluate({"X": "9 ** 9 ** 9", "Y": "2 ** 10", "Z": "Growth ** 3"}, {"Growth": 1.1})
+    assert result["errors"] == {"X": "Undefined (division by zero or missing value)"}
+    assert result["results"] == {"Y": 1024.0, "Z": 1.331}
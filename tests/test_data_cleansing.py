@@ -0,0 +1,29 @@
+"""Tests for parsing raw metric cells."""
+
+import numpy as np
+
+from tools.data_cleansing import parse_numeric_cells
+
+
+def parse(*cells: str) -> dict:
+    return parse_numeric_cells(np.array(cells, dtype=str))
+
+
+def test_cleansing_rules():
+    parsed = parse("£68,187m", "(1,234)", "£4.5bn", "n/a")
+    assert parsed["values"][:3].tolist() == [68187.0, -1234.0, 4500.0]
+    assert parsed["valid"].tolist() == [True, True, True, False]
+    assert parsed["negative"].tolist() == [False, True, False, False]
+    assert parsed["billions"].tolist() == [False, False, True, False]
+
+
+def test_exponent_notation_is_parsed_as_is():
+    parsed = parse("1.2e3", "1.5E+20", "1e-05", "-2.5e2")
+    assert parsed["values"].tolist() == [1200.0, 1.5e20, 1e-05, -250.0]
+    assert parsed["valid"].all()
+    assert not (parsed["symbols_removed"] | parsed["negative"] | parsed["billions"]).any()
+
+
+def test_exponent_mixed_with_symbols_is_invalid():
+    parsed = parse("£1.2e3m", "1.5E+20 GBP")
+    assert parsed["valid"].tolist() == [False, False]
@@ -0,0 +1,12 @@
+"""Tests for the fake LLM and agent service."""
+
+from workflow.fake_service import FakeService
+
+
+def test_every_thread_walks_through_its_own_replies():
+    service = FakeService(scenario={"responses": {"Writer": ["first", "second"]}})
+    assert service.agent_reply("thread_a", "Writer") == "first"
+    assert service.agent_reply("thread_b", "Writer") == "first"
+    assert service.agent_reply("thread_a", "Writer") == "second"
+    assert service.agent_reply("thread_b", "Writer") == "second"
+    assert service.agent_reply("thread_a", "Reader") == service.scenario["default_response"]
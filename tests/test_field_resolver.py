@@ -0,0 +1,48 @@
+"""Tests for resolving formula variable names to analyzer schema fields."""
+
+from data_provider.metric_store import load_metric_schema
+from tools.field_resolver import FieldResolver, shared_field_resolver
+from tools.formulas import resolve_field
+
+
+def test_statement_lines_resolve_to_their_fields():
+    resolver = shared_field_resolver()
+    assert resolver.resolve("Total Revenue") == ("Revenue_a_k_a_Sales", 1.0)
+    assert resolver.resolve("Receivables") == ("Accounts_Receivable", 1.0)
+    assert resolver.resolve("Cash and Cash Equivalents") == ("Cash", 1.0)
+    assert resolver.resolve("Trade and other payables") == ("Accounts_Payable", 1.0)
+
+
+def test_field_words_missing_from_the_variable_count_against_a_match():
+    resolver = FieldResolver(load_metric_schema(), synonyms={})
+    assert resolver.resolve("Total Revenue") is None
+    assert resolver.candidates("Total Revenue")[0][1] < 0.7
+
+
+def test_near_tie_is_unresolved():
+    resolver = FieldResolver(load_metric_schema(), synonyms={})
+    (first, best), (second, runner_up) = resolver.candidates("Receivables")[:2]
+    assert {first, second} == {"Retention_Receivables", "Accounts_Receivable"}
+    assert resolver.resolve("Receivables", min_confidence=0.0) is None
+    assert resolver.resolve("Receivables", fields=["Accounts_Receivable"], min_confidence=0.0)[0] == "Accounts_Receivable"
+
+
+def test_name_variants_resolve_regardless_of_word_order_and_plurals():
+    resolver = shared_field_resolver()
+    assert resolver.resolve("Expenses Lease") == ("Lease_Expense", 1.0)
+    assert resolver.resolve("Cost of Goods Sold") == ("Cost_of_Goods_Sold_COGS", 0.95)
+
+
+def test_formula_variables_are_not_bound_to_fields_that_merely_contain_them():
+    fields = list(load_metric_schema())
+    for name in ["Assets", "Income", "Expense", "Liabilities", "Cash Flow"]:
+        assert shared_field_resolver().resolve(name) is None
+        assert resolve_field(name, fields) is None, name
+
+
+def test_formula_variables_resolve_to_their_fields():
+    fields = list(load_metric_schema())
+    assert resolve_field("Total Assets", fields) == "Total_Assets"
+    assert resolve_field("Inventories", fields) == "Inventory"
+    assert resolve_field("Net Operating Income", fields) == "Net_Operating_Income_NOI"
+    assert resolve_field("Cash and Cash Equivalents", fields) == "Cash"
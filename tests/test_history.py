@@ -0,0 +1,48 @@
+"""Tests for the bounded Magentic member actor."""
+
+import asyncio
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.agents.orchestration.magentic import MagenticResetMessage
+from semantic_kernel.agents.runtime import InProcessRuntime
+from semantic_kernel.agents.runtime.core.agent_id import CoreAgentId as AgentId
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
+
+from workflow.history import BoundedMagenticAgentActor, HistoryPolicy
+
+
+class FakeThread:
+    def __init__(self):
+        self.deleted = False
+
+    async def delete(self) -> None:
+        self.deleted = True
+
+
+def test_reset_message_clears_sent_ledger_and_thread():
+    async def run() -> tuple[BoundedMagenticAgentActor, FakeThread]:
+        agent = ChatCompletionAgent(
+            name="Member",
+            description="A member agent",
+            service=OpenAIChatCompletion(ai_model_id="gpt-4o", api_key="test"),
+        )
+        runtime = InProcessRuntime()
+        await BoundedMagenticAgentActor.register(
+            runtime,
+            "member",
+            lambda: BoundedMagenticAgentActor(agent, "internal", lambda e: None, history_policy=HistoryPolicy()),
+        )
+        runtime.start()
+        actor = await runtime.try_get_underlying_agent_instance(AgentId("member", "default"), BoundedMagenticAgentActor)
+        thread = FakeThread()
+        actor._sent.add(("assistant", "earlier answer"))
+        actor._agent_thread = thread
+
+        await runtime.send_message(MagenticResetMessage(), AgentId("member", "default"))
+        await runtime.stop_when_idle()
+        return actor, thread
+
+    actor, thread = asyncio.run(run())
+    assert actor._sent == set()
+    assert thread.deleted
+    assert actor._agent_thread is None
@@ -0,0 +1,41 @@
+"""Tests for memoizing pure kernel functions."""
+
+import asyncio
+
+from semantic_kernel import Kernel
+from semantic_kernel.filters.filter_types import FilterTypes
+from semantic_kernel.functions import KernelArguments
+
+from tools.calculator import CalculatorPlugin
+from tools.memoize import MemoizingFilter, MemoStore
+
+
+def invoke(memo: MemoizingFilter, first: float, second: float) -> float:
+    kernel = Kernel()
+    kernel.add_plugin(CalculatorPlugin(), plugin_name="calculator")
+    kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, memo)
+    result = asyncio.run(kernel.invoke(plugin_name="calculator", function_name="add_numbers",
+                                       arguments=KernelArguments(first_number=first, second_number=second)))
+    return result.value
+
+
+def test_repeated_calls_are_answered_from_memory():
+    memo = MemoizingFilter()
+    assert invoke(memo, 1, 2) == 3
+    assert invoke(memo, 1, 2) == 3
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 1
+
+
+def test_results_are_shared_across_runs_through_the_store(tmp_path):
+    path = tmp_path / "memo.sqlite3"
+    first_run = MemoizingFilter(store=MemoStore(path))
+    assert invoke(first_run, 2, 3) == 5
+    first_run.store.close()
+
+    # A later run is a new process: an empty memory cache over the same file
+    second_run = MemoizingFilter(store=MemoStore(path))
+    assert invoke(second_run, 2, 3) == 5
+    assert second_run.stats()["stored_hits"] == 1
+    assert second_run.stats()["misses"] == 0
+    second_run.store.close()
@@ -0,0 +1,49 @@
+"""Tests for saving and opening metric stores."""
+
+import multiprocessing
+
+import numpy as np
+
+from data_provider.metric_store import MetricStore, read_manifest
+
+
+def make_store(size: int) -> MetricStore:
+    values = np.full((size, 2, 3), float(size))
+    return MetricStore(values, np.array([f"c{i}" for i in range(size)]), np.array(["a", "b"]), np.array(["2023", "2024", "2025"]))
+
+
+def rebuild(path: str, size: int) -> None:
+    for _ in range(20):
+        make_store(size).save(path)
+
+
+def read(path: str) -> None:
+    for _ in range(100):
+        store = MetricStore.open(path)
+        # A torn store would mix the arrays of two saves
+        assert store.values.shape[0] == len(store.companies)
+        assert (np.asarray(store.values) == len(store.companies)).all()
+
+
+def test_save_replaces_the_store(tmp_path):
+    path = tmp_path / "data.metrics"
+    make_store(2).save(path, manifest={"note": "first"})
+    make_store(3).save(path)
+    store = MetricStore.open(path, mmap=False)
+    assert store.values.shape == (3, 2, 3)
+    assert "note" not in read_manifest(path)
+    # No staging or replaced directories are left behind
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == [".data.metrics.lock", "data.metrics"]
+
+
+def test_concurrent_rebuilds_never_expose_a_partial_store(tmp_path):
+    path = str(tmp_path / "data.metrics")
+    make_store(1).save(path)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=rebuild, args=(path, size)) for size in (1000, 2000, 3000)]
+    processes += [context.Process(target=read, args=(path,)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * len(processes)
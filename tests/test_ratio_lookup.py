@@ -0,0 +1,53 @@
+"""Tests for looking up materialized sector ratios."""
+
+from data_provider.derived_metrics import derive_metrics, formula_graph, formula_signatures
+from data_provider.metric_store import MetricStore
+from tools.ratio_lookup import lookup_ratios
+
+SECTOR_FORMULAS = {
+    "Inventory Turnover": "COGS / Average Inventory",
+    "Days Inventory Outstanding (DIO)": "365 / Inventory Turnover",
+}
+
+
+def build():
+    store = MetricStore.from_tables({"acme": [
+        {"Metric": "Revenue_a_k_a_Sales", "2023": "1,000", "2024": "1,200"},
+        {"Metric": "Cost_of_Goods_Sold_COGS", "2023": "730", "2024": "876"},
+        {"Metric": "Inventory", "2023": "100", "2024": "120"},
+    ]})
+    derived, missing, _ = derive_metrics(store, SECTOR_FORMULAS)
+    manifest = {
+        "formulas": SECTOR_FORMULAS,
+        "formula_signatures": formula_signatures(formula_graph(SECTOR_FORMULAS, store)),
+        "unresolved": missing,
+    }
+    return derived, manifest, store
+
+
+def test_materialized_formulas_are_precomputed():
+    derived, manifest, store = build()
+    report = lookup_ratios(derived, manifest, store, "acme")
+    assert report["source"] == {"Inventory Turnover": "precomputed", "Days Inventory Outstanding (DIO)": "precomputed"}
+    assert report["ratios"]["Days Inventory Outstanding (DIO)"] == {"2023": 50.0, "2024": 50.0}
+
+
+def test_abbreviation_with_the_same_dependencies_is_precomputed():
+    derived, manifest, store = build()
+    formulas = {"DIO": "365 / Inventory Turnover", "Inventory Turnover": "COGS / Inventories"}
+    report = lookup_ratios(derived, manifest, store, "acme", formulas)
+    assert report["source"] == {"DIO": "precomputed", "Inventory Turnover": "precomputed"}
+
+
+def test_changed_dependency_is_recomputed_despite_the_same_expression():
+    derived, manifest, store = build()
+    formulas = {"DIO": "365 / Inventory Turnover", "Inventory Turnover": "Revenue / Inventory"}
+    report = lookup_ratios(derived, manifest, store, "acme", formulas)
+    assert report["source"] == {"DIO": "computed", "Inventory Turnover": "computed"}
+    assert report["ratios"]["DIO"] == {"2023": 36.5, "2024": 36.5}
+
+
+def test_formula_without_its_dependency_is_not_served_precomputed():
+    derived, manifest, store = build()
+    report = lookup_ratios(derived, manifest, store, "acme", {"DIO": "365 / Inventory Turnover"})
+    assert report["source"].get("DIO") != "precomputed"
@@ -1,20 +1,39 @@
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
+import os
 
 from semantic_kernel.functions import kernel_function
 
 
-
-search_endpoint: str = "https://agentichack-search.search.windows.net"
-search_api_key: str = "CREbJyNtMs5jEiHfViliY08ajSJOAfFCwn9XF0VJlIAzSeBbNNfv"
-index_name: str = "tesco_report_agent"
-credential = AzureKeyCredential(search_api_key)
+search_endpoint: str = os.environ.get("AZURE_SEARCH_ENDPOINT", "https://agentichack-search.search.windows.net")
+search_api_key: str | None = os.environ.get("AZURE_SEARCH_API_KEY")
+index_name: str = os.environ.get("AZURE_SEARCH_INDEX_NAME", "tesco_report_agent")
 
 class RagPlugin:
     """
     A rag plugin for RAG Agent.
+
+    The Search SDK is imported and the search client created on the first
+    retrieval, so importing the plugin has no side effects.
     """
 
+    def __init__(self):
+        self._search_client = None
+
+    def _get_search_client(self):
+        if self._search_client is None:
+            # The key is only read from the environment (e.g. .env); there is no default
+            api_key = os.environ.get("AZURE_SEARCH_API_KEY") or search_api_key
+            if not api_key:
+                raise ValueError("Missing required environment variables: AZURE_SEARCH_API_KEY")
+            from azure.core.credentials import AzureKeyCredential
+            from azure.search.documents import SearchClient
+
+            self._search_client = SearchClient(
+                endpoint=search_endpoint,
+                credential=AzureKeyCredential(api_key),
+                index_name=index_name,
+            )
+        return self._search_client
+
     @kernel_function(
         name="retrieve_doc",
         description="retrieve relative sector information for the company and the root cause of metrics changes from AI Search for RAG Agent"
@@ -23,11 +42,11 @@ class RagPlugin:
 
         print(f"QQQQQQ{query}")
 
-        search_client = SearchClient(endpoint=search_endpoint, credential=credential, index_name=index_name)
+        search_client = self._get_search_client()
         results = search_client.search(query_type='simple',
                                        search_text=query,
                                        top=10,
                                        include_total_count=True)
         docs = "\n".join(result['page_chunk'] for result in results)
         # print(f"AAAAA:{docs}")
-        return docs
\ No newline at end of file
+        return docs
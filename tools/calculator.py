@@ -11,6 +11,13 @@ This module provides a simple calculator plugin that showcases:
 
 from typing import Annotated
 from semantic_kernel.functions import kernel_function
+import json
+
+import numpy as np
+
+from tools.data_cleansing import parse_numeric_cells
+from tools.formulas import evaluate_formulas, exact_field, parse_formulas
+from tools.memoize import memoized
 
 
 class CalculatorPlugin:
@@ -21,6 +28,7 @@ class CalculatorPlugin:
     for implementing other tools in the multi-agent system.
     """
 
+    @memoized
     @kernel_function(
         name="add_numbers",
         description="Add two numbers together and return the result"
@@ -48,6 +56,7 @@ class CalculatorPlugin:
         """
         return first_number + second_number
 
+    @memoized
     @kernel_function(
         name="subtract_numbers",
         description="Subtract the second number from the first and return the result"
@@ -75,6 +84,7 @@ class CalculatorPlugin:
         """
         return minuend - subtrahend
 
+    @memoized
     @kernel_function(
         name="multiply_numbers",
         description="Multiply two numbers together and return the result"
@@ -102,6 +112,7 @@ class CalculatorPlugin:
         """
         return first_number * second_number
 
+    @memoized
     @kernel_function(
         name="divide_numbers",
         description="Divide the first number by the second number and return the result"
@@ -134,6 +145,7 @@ class CalculatorPlugin:
             raise ValueError("Cannot divide by zero")
         return dividend / divisor
 
+    @memoized
     @kernel_function(
         name="calculate_percentage",
         description="Calculate what percentage the part represents of the whole"
@@ -166,6 +178,7 @@ class CalculatorPlugin:
             raise ValueError("Cannot calculate percentage with zero as whole")
         return (part / whole) * 100.0
 
+    @memoized
     @kernel_function(
         name="format_currency",
         description="Format a number as currency with proper decimal places"
@@ -191,4 +204,66 @@ class CalculatorPlugin:
             >>> print(result)
             $123.46
         """
-        return f"{currency_symbol}{amount:.2f}"
\ No newline at end of file
+        return f"{currency_symbol}{amount:.2f}"
+
+    @memoized
+    @kernel_function(
+        name="evaluate_expressions",
+        description="Evaluate a batch of named arithmetic expressions over named variables in one call. "
+                    "Expressions may use the variables and the results of other expressions"
+    )
+    def evaluate_expressions(
+        self,
+        expressions: Annotated[str, "JSON object of result name to expression, e.g. "
+                                    "{\"Fixed Charge Coverage\": \"(EBIT + Lease Expense) / (Interest + Lease Expense)\"}, "
+                                    "or 'Name = expression' lines"],
+        variables: Annotated[str, "JSON object of variable name to value, e.g. {\"EBIT\": 2822, \"Lease Expense\": 120}"]
+    ) -> Annotated[str, "JSON string with the value of every expression and any errors"]:
+        """
+        Evaluate named expressions over named variables in a single invocation.
+
+        Args:
+            expressions: Result name to expression (JSON object), or "Name = expression" lines
+            variables: Variable name to value (JSON object); values such as "1,234" or "(56)" are accepted
+
+        Returns:
+            JSON string with "results" (name to value) and "errors" (name to the
+            missing variables, or why the value is undefined)
+
+        Example:
+            Input: expressions='{"Gross Margin": "(Revenue - COGS) / Revenue * 100"}',
+                   variables='{"Revenue": 1000, "COGS": 600}'
+            Output: '{"results": {"Gross Margin": 40.0}, "errors": {}}'
+        """
+        try:
+            try:
+                named = json.loads(expressions)
+            except json.JSONDecodeError:
+                named = parse_formulas(expressions)
+            if isinstance(named, list):
+                named = {item["name"]: item["expression"] for item in named}
+            bindings = json.loads(variables) if variables else {}
+            if not isinstance(named, dict) or not isinstance(bindings, dict):
+                return json.dumps({"error": "expressions and variables must be JSON objects"}, indent=2)
+
+            names = list(bindings)
+            parsed = parse_numeric_cells(np.array(["" if bindings[n] is None else str(bindings[n]) for n in names], dtype=str))
+            values = {name: parsed["values"][i] for i, name in enumerate(names)}
+            # The caller names its values: bind them exactly, never to a similar-sounding schema field
+            results, missing = evaluate_formulas({str(k): str(v) for k, v in named.items()}, values, exact_field)
+
+            output = {"results": {}, "errors": {}}
+            for name in named:
+                if name in results:
+                    value = float(results[name])
+                    if np.isnan(value):
+                        output["errors"][name] = "Undefined (division by zero or missing value)"
+                    else:
+                        output["results"][name] = round(value, 6)
+                else:
+                    output["errors"][name] = f"Missing variables: {', '.join(missing.get(name, []))}"
+            return json.dumps(output, indent=2)
+        except json.JSONDecodeError:
+            return json.dumps({"error": "Invalid JSON format"}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Calculation error: {str(e)}"}, indent=2)
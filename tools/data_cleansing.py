@@ -0,0 +1,232 @@
+"""Deterministic data cleansing for financial metric tables.
+
+This module applies the YoY_Analyst's cleansing rules to whole metric tables
+in one vectorized pass instead of asking the LLM to do it:
+1. Remove currency symbols, letters and spaces (keeping digits, commas,
+   parentheses, decimal points and minus signs)
+2. Remove thousands separators
+3. Convert numbers wrapped in parentheses to negative values
+4. Drop metrics that have a null (or unparseable) value in any year
+
+Values are in millions, so a "bn" unit suffix is scaled to millions
+(£4.5bn -> 4500) rather than stripped. Numbers in exponent notation
+("1.5E+20") are parsed as they are; mixed with other symbols they are
+invalid. Every coerced cell and every dropped metric is listed in the
+cleansing report.
+"""
+
+import json
+import re
+from typing import Annotated, Any
+
+import numpy as np
+from semantic_kernel.functions import kernel_function
+
+from tools.memoize import memoized
+
+YEAR_KEY = re.compile(r"^\d{4}$")
+
+# Cell separator for the single regex pass over the whole table (never part of the data)
+_SEP = "\x1f"
+_NON_NUMERIC = re.compile(rf"[^0-9.,()\-{_SEP}]")
+_BILLIONS = re.compile(r"\d\s*(bn|billion)\b", re.IGNORECASE)
+# Exponent notation ("1.5E+20") is parsed as is; mixed with other symbols it is not a number
+_EXPONENT_NUMBER = re.compile(r"^\s*[-+]?(\d+(\.\d*)?|\.\d+)[eE][+-]?\d+\s*$")
+_EXPONENT = re.compile(r"\d[eE][+-]?\d")
+
+COMPANY_KEY = "Company"
+
+
+def year_columns(records: list[dict[str, Any]]) -> list[str]:
+    """Return the sorted year keys (e.g. "2022") used by a list of metric records."""
+    keys: set[Any] = set()
+    for record in records:
+        keys.update(record)
+    return sorted(str(key) for key in keys if YEAR_KEY.match(str(key)))
+
+
+def _clean_number(value: float) -> int | float:
+    return int(value) if float(value).is_integer() else round(float(value), 6)
+
+
+def parse_numeric_cells(cells: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Parse raw metric cells into numbers with rules 1-3, vectorized over all cells.
+
+    Args:
+        cells: 1-D string array of raw cell values ("" for null)
+
+    Returns:
+        Arrays aligned with cells: "values" (NaN where invalid), "valid",
+        "negative", "billions" and "symbols_removed"
+    """
+    if cells.size == 0:
+        empty = np.zeros(0, dtype=bool)
+        return {"values": np.zeros(0), "valid": empty, "negative": empty,
+                "billions": empty, "symbols_removed": empty}
+
+    # Rule 1 over every cell at once: join, strip in one regex pass, split back
+    stripped = np.array(_NON_NUMERIC.sub("", _SEP.join(cells)).split(_SEP), dtype=str)
+    # Only cells with a "b" can mention billions; the regex runs on those alone
+    billions = np.char.find(np.char.lower(cells), "b") >= 0
+    billions[billions] = [bool(_BILLIONS.search(cell)) for cell in cells[billions]]
+    # Likewise only cells with an "e" can use exponent notation
+    exponent = np.char.find(np.char.lower(cells), "e") >= 0
+    exponent[exponent] = [bool(_EXPONENT.search(cell)) for cell in cells[exponent]]
+    scientific = exponent.copy()
+    scientific[exponent] = [bool(_EXPONENT_NUMBER.match(cell)) for cell in cells[exponent]]
+
+    # Rules 2 and 3: thousands separators and parentheses
+    no_commas = np.char.replace(stripped, ",", "")
+    negative = np.char.startswith(no_commas, "(") & np.char.endswith(no_commas, ")")
+    digits = np.char.strip(no_commas, "()")
+    core = np.char.replace(np.char.lstrip(digits, "-"), ".", "", count=1)
+    valid = np.char.isdigit(core) & (np.char.count(digits, "-") <= 1) & ~exponent
+
+    values = np.full(cells.shape, np.nan)
+    values[valid] = digits[valid].astype(float)
+    values = np.where(negative, -values, values)
+    values = np.where(billions, values * 1000.0, values)
+    values[scientific] = cells[scientific].astype(float)
+    valid |= scientific
+    return {
+        "values": values,
+        "valid": valid,
+        "negative": negative & ~exponent,
+        "billions": billions & ~exponent,
+        "symbols_removed": (np.char.str_len(cells) != np.char.str_len(stripped)) & ~exponent,
+    }
+
+
+def cleanse_metric_tables(
+    tables: dict[str, list[dict[str, Any]]],
+) -> tuple[dict[str, list[dict[str, Any]]], dict[str, Any]]:
+    """
+    Cleanse metric tables for one or more companies in a single pass.
+
+    Args:
+        tables: Metric records per company, e.g. {"tesco": [{"Metric": ..., "2024": "£68,187m"}]}
+
+    Returns:
+        The cleansed tables (numeric year values, incomplete metrics removed)
+        and a report of every coerced cell and dropped metric
+    """
+    rows = [(company, record) for company, records in tables.items() for record in records]
+    years = year_columns([record for _, record in rows])
+    n_rows, n_years = len(rows), len(years)
+    if n_rows == 0 or n_years == 0:
+        # Nothing to cleanse: records without any year data cannot be analyzed
+        dropped = [{"company": company, "metric": record.get("Metric"), "null_years": [], "invalid": {}}
+                   for company, record in rows]
+        return {company: [] for company in tables}, {"rows_in": n_rows, "rows_out": 0, "dropped": dropped, "coerced": []}
+
+    raw = np.array(
+        [[record.get(year) for year in years] for _, record in rows], dtype=object
+    ).reshape(n_rows, n_years)
+    present = raw != None  # noqa: E711 - element-wise comparison
+    text = np.where(present, raw, "").astype(str)
+
+    parsed = {key: array.reshape(n_rows, n_years) for key, array in parse_numeric_cells(text.ravel()).items()}
+    values, valid = parsed["values"], parsed["valid"]
+    negative, billions, symbols_removed = parsed["negative"], parsed["billions"], parsed["symbols_removed"]
+
+    # Rule 4: drop metrics with any missing year
+    keep = valid.all(axis=1)
+
+    coerced_mask = present & valid & (symbols_removed | negative | billions)
+    invalid_mask = present & ~valid
+
+    report: dict[str, Any] = {"rows_in": n_rows, "rows_out": int(keep.sum()), "dropped": [], "coerced": []}
+    for i, j in zip(*np.nonzero(coerced_mask)):
+        company, record = rows[i]
+        rules = []
+        if symbols_removed[i, j]:
+            rules.append("removed_symbols")
+        if negative[i, j]:
+            rules.append("parentheses_to_negative")
+        if billions[i, j]:
+            rules.append("billions_to_millions")
+        report["coerced"].append({
+            "company": company,
+            "metric": record.get("Metric"),
+            "year": years[j],
+            "raw": raw[i, j],
+            "value": _clean_number(values[i, j]),
+            "rules": rules,
+        })
+    for i in np.nonzero(~keep)[0]:
+        company, record = rows[i]
+        report["dropped"].append({
+            "company": company,
+            "metric": record.get("Metric"),
+            "null_years": [years[j] for j in range(n_years) if not present[i, j]],
+            "invalid": {years[j]: raw[i, j] for j in range(n_years) if invalid_mask[i, j]},
+        })
+
+    cleansed: dict[str, list[dict[str, Any]]] = {company: [] for company in tables}
+    for i in np.nonzero(keep)[0]:
+        company, record = rows[i]
+        cleaned = {key: value for key, value in record.items() if not YEAR_KEY.match(str(key))}
+        cleaned.update({year: _clean_number(values[i, j]) for j, year in enumerate(years)})
+        cleansed[company].append(cleaned)
+    return cleansed, report
+
+
+def cleanse_metrics(data: Any) -> tuple[Any, dict[str, Any]]:
+    """
+    Cleanse metric data in any of the analyzer output shapes.
+
+    Accepts a list of metric records (one company), a dict of company to
+    records (e.g. financial_data.json), or a single record. The result has
+    the same shape as the input.
+    """
+    if isinstance(data, dict) and "Metric" in data:
+        data = [data]
+    if isinstance(data, list):
+        companies = {}
+        for record in data:
+            companies.setdefault(record.get(COMPANY_KEY, ""), []).append(record)
+        cleansed, report = cleanse_metric_tables(companies)
+        return [record for records in cleansed.values() for record in records], report
+    return cleanse_metric_tables(data)
+
+
+class DataCleansingPlugin:
+    """
+    A plugin for cleansing raw financial metrics before analysis.
+
+    This plugin replaces the prompt-driven cleanup in the YoY_Analyst with a
+    deterministic cleanser that also reports what it dropped or coerced.
+    """
+
+    @memoized
+    @kernel_function(
+        name="cleanse_metrics",
+        description="Cleanse raw financial metrics: strip currency symbols and units, remove thousands separators, "
+                    "turn (123) into -123 and drop metrics with null years. Returns the cleansed metrics and a report"
+    )
+    def cleanse_metrics(
+        self,
+        json_data: Annotated[str, "JSON string containing financial metrics with year data"]
+    ) -> Annotated[str, "JSON string with the cleansed metrics and a cleansing report"]:
+        """
+        Cleanse raw financial metrics.
+
+        Args:
+            json_data: JSON string containing financial metrics with year data
+
+        Returns:
+            JSON string with "metrics" (cleansed, same shape as the input) and "report"
+
+        Example:
+            Input: '[{"Metric": "Revenue", "2023": "65,762", "2024": "£68,187m"}]'
+            Output: '{"metrics": [{"Metric": "Revenue", "2023": 65762, "2024": 68187}], "report": {...}}'
+        """
+        try:
+            data = json.loads(json_data) if isinstance(json_data, str) else json_data
+            metrics, report = cleanse_metrics(data)
+            return json.dumps({"metrics": metrics, "report": report}, indent=2)
+        except json.JSONDecodeError:
+            return json.dumps({"error": "Invalid JSON format"}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Cleansing error: {str(e)}"}, indent=2)
@@ -0,0 +1,230 @@
+"""Fuzzy resolution of formula variable names to analyzer schema fields.
+
+The Formula_Provider names its variables in free text ("Inventories",
+"Shareholders Equity", "Lease Expense"), the analyzer schema
+(financial_metrics.json) uses field names such as `Inventory` or
+`Cost_of_Goods_Sold_COGS`. A `FieldResolver` is built once from the
+schema's field names and descriptions and precomputes:
+- an exact index of every field's name variants (the full name, its
+  abbreviation, the names around "a.k.a.", singular forms) and the
+  FIELD_SYNONYMS of tools.formulas, all with full confidence
+- word and character trigram indexes of the field names and descriptions,
+  for the variables that are not in the exact index
+
+A lookup is a dictionary hit for known names. Other names are scored
+against the fields sharing a word or trigram with them and the result is
+cached, so every name is scored at most once per process. A field only
+scores high if the variable covers its words as well as the other way round,
+so "Total Revenue" is not taken for `Total_Service_Revenue`. Confidences are
+between 0 and 1; below MIN_CONFIDENCE, or when two fields score within
+NEAR_TIE_MARGIN of each other, a variable counts as unresolved.
+"""
+
+import json
+import re
+from typing import Annotated, Any, Iterable
+
+from semantic_kernel.functions import kernel_function
+
+from tools.formulas import FIELD_SYNONYMS, _tokens, normalize_name
+from tools.memoize import memoized
+
+MIN_CONFIDENCE = 0.7
+MAX_CANDIDATES = 3
+# A fuzzy match this close to the runner-up is ambiguous ("Receivables")
+NEAR_TIE_MARGIN = 0.1
+
+# Confidence of name variants that are not the field's full name
+ALIAS_CONFIDENCE = 0.95
+# Fuzzy matches never reach the confidence of an exact name
+FUZZY_CONFIDENCE_CAP = 0.9
+
+_ALIAS_SEPARATOR = re.compile(r"_a_k_a_", re.IGNORECASE)
+_DESCRIPTION_STOPWORDS = {
+    "a", "all", "an", "and", "any", "are", "as", "at", "be", "by", "e", "etc", "for", "from", "g", "given",
+    "in", "is", "it", "its", "like", "not", "of", "on", "or", "over", "than", "that", "the", "to", "used", "with",
+}
+
+
+def _key(name: str) -> str:
+    """Exact index key: the name's singular words, sorted, so word order does not matter."""
+    return " ".join(sorted(_tokens(name)))
+
+
+def _trigrams(name: str) -> set[str]:
+    text = f" {''.join(re.findall(r'[a-z0-9]+', name.lower()))} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def field_aliases(field: str) -> list[str]:
+    """
+    Names a schema field goes by besides its own.
+
+    "Cost_of_Goods_Sold_COGS" -> "Cost of Goods Sold", "COGS";
+    "Revenue_a_k_a_Sales" -> "Revenue", "Sales"
+    """
+    aliases = [part.replace("_", " ") for part in _ALIAS_SEPARATOR.split(field)]
+    words = field.split("_")
+    if len(words) > 1 and len(words[-1]) >= 2 and words[-1].isupper():
+        aliases += [" ".join(words[:-1]), words[-1]]
+    return [alias for alias in aliases if normalize_name(alias) != normalize_name(field)]
+
+
+class FieldResolver:
+    """
+    Maps free-text variable names to schema fields with confidence scores.
+
+    Args:
+        schema: Field name to field definition (with an optional "description")
+        synonyms: Normalized variable name to field, matched with full confidence
+    """
+
+    def __init__(self, schema: dict[str, dict[str, Any]], synonyms: dict[str, str] = FIELD_SYNONYMS):
+        self.fields = list(schema)
+        self._exact: dict[str, tuple[str, float]] = {}
+        self._name_tokens: dict[str, list[set[str]]] = {}
+        self._description_tokens: dict[str, set[str]] = {}
+        self._field_trigrams: dict[str, set[str]] = {}
+        self._token_index: dict[str, set[str]] = {}
+        self._trigram_index: dict[str, set[str]] = {}
+        self._cache: dict[str, list[tuple[str, float]]] = {}
+
+        for field, definition in schema.items():
+            names = [field, *field_aliases(field)]
+            for rank, name in enumerate(names):
+                self._exact.setdefault(_key(name), (field, 1.0 if rank == 0 else ALIAS_CONFIDENCE))
+            self._name_tokens[field] = [_tokens(name) for name in names]
+            tokens = set().union(*self._name_tokens[field])
+            description = (definition or {}).get("description", "")
+            self._description_tokens[field] = _tokens(description) - _DESCRIPTION_STOPWORDS
+            self._field_trigrams[field] = set().union(*(_trigrams(name) for name in names))
+            for token in tokens | self._description_tokens[field]:
+                self._token_index.setdefault(token, set()).add(field)
+            for trigram in self._field_trigrams[field]:
+                self._trigram_index.setdefault(trigram, set()).add(field)
+        for name, field in synonyms.items():
+            if field in schema:
+                self._exact[_key(name)] = (field, 1.0)
+
+    def _score(self, variable: str) -> list[tuple[str, float]]:
+        wanted = _tokens(variable)
+        trigrams = _trigrams(variable)
+        candidates = set().union(*(self._token_index.get(token, ()) for token in wanted),
+                                 *(self._trigram_index.get(trigram, ()) for trigram in trigrams))
+        scored = []
+        for field in candidates:
+            # The share of the variable's words in a name of the field, times the
+            # share of that name's words in the variable: words the field has and
+            # the variable lacks count against it as much as the other way round
+            words = max((len(wanted & name) ** 2 / (len(wanted) * len(name))
+                         for name in self._name_tokens[field] if name), default=0.0) if wanted else 0.0
+            field_trigrams = self._field_trigrams[field]
+            spelling = len(trigrams & field_trigrams) / len(trigrams | field_trigrams) if trigrams else 0.0
+            description = len(wanted & self._description_tokens[field]) / len(wanted) if wanted else 0.0
+            confidence = min(FUZZY_CONFIDENCE_CAP, 0.6 * words + 0.3 * spelling + 0.1 * description)
+            scored.append((field, round(confidence, 3)))
+        scored.sort(key=lambda item: (-item[1], len(item[0])))
+        return scored
+
+    def candidates(self, variable: str, fields: Iterable[str] | None = None) -> list[tuple[str, float]]:
+        """
+        The fields a variable may name, best first.
+
+        Args:
+            variable: The variable name
+            fields: Only consider these fields (default: every schema field)
+
+        Returns:
+            Up to MAX_CANDIDATES (field, confidence) pairs
+        """
+        key = _key(variable)
+        if key not in self._cache:
+            exact = self._exact.get(key)
+            ranked = self._score(variable)
+            if exact is not None:
+                ranked = [exact] + [item for item in ranked if item[0] != exact[0]]
+            self._cache[key] = ranked
+        ranked = self._cache[key]
+        if fields is not None:
+            allowed = set(fields)
+            ranked = [item for item in ranked if item[0] in allowed]
+        return ranked[:MAX_CANDIDATES]
+
+    def resolve(
+        self, variable: str, fields: Iterable[str] | None = None, min_confidence: float = MIN_CONFIDENCE
+    ) -> tuple[str, float] | None:
+        """
+        The best field for a variable and its confidence.
+
+        Returns:
+            None below `min_confidence`, or if the best match is fuzzy and
+            another field scores within NEAR_TIE_MARGIN of it
+        """
+        ranked = self.candidates(variable, fields)
+        if not ranked or ranked[0][1] < min_confidence:
+            return None
+        if ranked[0][1] <= FUZZY_CONFIDENCE_CAP and len(ranked) > 1 and ranked[0][1] - ranked[1][1] < NEAR_TIE_MARGIN:
+            return None
+        return ranked[0]
+
+
+_shared_resolver: FieldResolver | None = None
+
+
+def shared_field_resolver() -> FieldResolver:
+    """Resolver over the analyzer schema, built once per process."""
+    global _shared_resolver
+    if _shared_resolver is None:
+        from data_provider.metric_store import load_metric_schema
+
+        _shared_resolver = FieldResolver(load_metric_schema())
+    return _shared_resolver
+
+
+class FieldResolverPlugin:
+    """A plugin for mapping formula variable names to the analyzer's metric fields."""
+
+    @memoized
+    @kernel_function(
+        name="resolve_fields",
+        description="Map formula variable names (e.g. 'Inventories', 'Shareholders Equity') to the metric field names "
+                    "of the financial data, with a confidence score per variable"
+    )
+    def resolve_fields(
+        self,
+        variables: Annotated[str, "The variable names, separated by commas or new lines"]
+    ) -> Annotated[str, "JSON string with the field and confidence per variable"]:
+        """
+        Resolve variable names to analyzer fields.
+
+        Args:
+            variables: Variable names such as "Current Assets, Inventories, EBIT"
+
+        Returns:
+            JSON string with "fields" (field, confidence and alternative fields
+            per resolved variable) and "unresolved" (variables without a field
+            of sufficient confidence, with their closest candidates)
+
+        Example:
+            Input: variables="Inventories, EBIT"
+            Output: '{"fields": {"Inventories": {"field": "Inventory", "confidence": 1.0, "alternatives": [...]}, ...}}'
+        """
+        try:
+            names = [name.strip() for name in re.split(r"[,\n]", variables) if name.strip()]
+            if not names:
+                return json.dumps({"error": "No variable names given"}, indent=2)
+            resolver = shared_field_resolver()
+            result: dict[str, Any] = {"fields": {}, "unresolved": {}}
+            for name in names:
+                ranked = resolver.candidates(name)
+                if resolver.resolve(name) is not None:
+                    result["fields"][name] = {
+                        "field": ranked[0][0],
+                        "confidence": ranked[0][1],
+                        "alternatives": [{"field": field, "confidence": confidence} for field, confidence in ranked[1:]],
+                    }
+                else:
+                    result["unresolved"][name] = [{"field": field, "confidence": confidence} for field, confidence in ranked]
+            return json.dumps(result, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Field resolution error: {str(e)}"}, indent=2)
@@ -0,0 +1,380 @@
+"""Parsing and vectorized evaluation of financial formulas.
+
+The Formula_Provider answers with numbered formula lines such as:
+
+    7. Interest Coverage Ratio = EBIT / Interest Expense
+    19. Days Inventory Outstanding (DIO) = 365 / Inventory Turnover
+
+This module turns those lines into expressions over named variables, maps
+the variable names to analyzer metric fields (e.g. "COGS" ->
+"Cost_of_Goods_Sold_COGS") and evaluates the expressions with NumPy, so a
+formula is computed for every company and year at once. Formulas may refer
+to other formulas by name or abbreviation (DIO above); `FormulaGraph` orders
+them by their dependencies and recomputes only what a change affects.
+"""
+
+import ast
+import operator
+import re
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+_FORMULA_LINE = re.compile(r"^\s*(?:\d+[.)]\s*)?(?P<name>[^=]+?)\s*=\s*(?P<expression>.+?)\s*$")
+_ABBREVIATION = re.compile(r"\(([^)]+)\)\s*$")
+_OPERATOR_SPLIT = re.compile(r"(\*\*|[+\-*/()])")
+_NUMBER = re.compile(r"^\d+(\.\d+)?$")
+
+# Larger exponents (e.g. "9 ** 9 ** 9") give an undefined value instead of a huge power
+MAX_EXPONENT = 100
+
+
+def _power(base: Any, exponent: Any) -> Any:
+    exponent = np.asarray(exponent, dtype=float)
+    allowed = np.abs(exponent) <= MAX_EXPONENT
+    return np.where(allowed, np.power(np.asarray(base, dtype=float), np.where(allowed, exponent, 0.0)), np.nan)
+
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: _power,
+}
+_UNARY_OPERATORS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+# Formula variable names that do not share their words with the analyzer field names
+FIELD_SYNONYMS = {
+    "revenue": "Revenue_a_k_a_Sales",
+    "sales": "Revenue_a_k_a_Sales",
+    "net sales": "Revenue_a_k_a_Sales",
+    "cogs": "Cost_of_Goods_Sold_COGS",
+    "ebit": "Operating_Income_EBIT",
+    "operating income": "Operating_Income_EBIT",
+    "inventories": "Inventory",
+    "average inventory": "Inventory",
+    "interest": "Interest_Expense",
+    "capex": "Capital_Expenditures_Capex",
+    "sg&a expense": "Operating_Expenses_and_sub_items_SG_A_Advertising_R_D",
+    "net profit": "Net_Income",
+    "profit after tax": "Net_Income",
+    "operating profit": "Operating_Income_EBIT",
+    "equity": "Shareholders_Equity",
+    "total equity": "Shareholders_Equity",
+    "market cap": "Market_Value_of_Equity_MVE",
+    "market capitalization": "Market_Value_of_Equity_MVE",
+    "total revenue": "Revenue_a_k_a_Sales",
+    "turnover": "Revenue_a_k_a_Sales",
+    "cost of sales": "Cost_of_Goods_Sold_COGS",
+    "capital expenditure": "Capital_Expenditures_Capex",
+    "capital expenditures": "Capital_Expenditures_Capex",
+    "cash and cash equivalents": "Cash",
+    "cash equivalents": "Cash",
+    "receivables": "Accounts_Receivable",
+    "trade receivables": "Accounts_Receivable",
+    "trade and other receivables": "Accounts_Receivable",
+    "payables": "Accounts_Payable",
+    "trade payables": "Accounts_Payable",
+    "trade and other payables": "Accounts_Payable",
+    "borrowings": "Total_Debt",
+    "shareholders funds": "Shareholders_Equity",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Case- and spacing-insensitive key for a formula or variable name."""
+    return " ".join(name.lower().replace("_", " ").split())
+
+
+def _tokens(name: str) -> set[str]:
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    return {word[:-3] + "y" if word.endswith("ies") else word.rstrip("s") or word for word in words}
+
+
+def parse_formulas(text: str) -> dict[str, str]:
+    """
+    Parse "Name = expression" lines (optionally numbered) into a formula dict.
+
+    Lines without an "=" (headings, variable lists, citations) are ignored.
+    """
+    formulas: dict[str, str] = {}
+    for line in text.splitlines():
+        match = _FORMULA_LINE.match(line)
+        if match and not match.group("name").lower().startswith("variable"):
+            formulas[match.group("name").strip("*# ")] = match.group("expression").strip("* ")
+    return formulas
+
+
+def formula_aliases(name: str) -> list[str]:
+    """Names a formula can be referred to by: its full name, without and as its abbreviation."""
+    aliases = [normalize_name(name)]
+    match = _ABBREVIATION.search(name)
+    if match:
+        aliases.append(normalize_name(name[:match.start()]))
+        aliases.append(normalize_name(match.group(1)))
+    return aliases
+
+
+def compile_expression(expression: str) -> tuple[ast.Expression, dict[str, str]]:
+    """
+    Compile a formula expression whose variables are free text (e.g. "Current Assets").
+
+    Returns:
+        The expression tree, with variables replaced by placeholders, and the
+        placeholder to variable name mapping
+
+    Raises:
+        ValueError: If the expression is not plain arithmetic
+    """
+    variables: dict[str, str] = {}
+    parts = []
+    for token in _OPERATOR_SPLIT.split(expression):
+        stripped = token.strip()
+        if not stripped or _OPERATOR_SPLIT.fullmatch(stripped) or _NUMBER.match(stripped):
+            parts.append(stripped)
+            continue
+        placeholder = next((key for key, name in variables.items() if name == stripped), None)
+        if placeholder is None:
+            placeholder = f"v{len(variables)}"
+            variables[placeholder] = stripped
+        parts.append(placeholder)
+    try:
+        tree = ast.parse(" ".join(part for part in parts if part), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Unsupported formula expression: {expression}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                                 *_BINARY_OPERATORS, *_UNARY_OPERATORS)):
+            raise ValueError(f"Unsupported formula expression: {expression}")
+    return tree, variables
+
+
+def evaluate(tree: ast.Expression, bindings: dict[str, Any]) -> Any:
+    """Evaluate a compiled expression; bindings may be numbers or NumPy arrays."""
+
+    def visit(node: ast.AST) -> Any:
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            # Floats, so arithmetic on constants overflows to inf instead of building huge integers
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return bindings[node.id]
+        if isinstance(node, ast.BinOp):
+            return _BINARY_OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp):
+            return _UNARY_OPERATORS[type(node.op)](visit(node.operand))
+        raise ValueError(f"Unsupported expression node: {type(node).__name__}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return visit(tree)
+
+
+def resolve_field(variable: str, fields: Iterable[str]) -> str | None:
+    """
+    Map a formula variable name to an analyzer metric field.
+
+    Synonyms are checked first, then a field with exactly the variable's
+    words. Anything else goes to the schema resolver (tools.field_resolver),
+    which only picks a field it is confident about: a field that merely
+    contains the variable's words ("Assets" in Current_Assets) is not enough.
+    """
+    fields = list(fields)
+    synonym = FIELD_SYNONYMS.get(normalize_name(variable))
+    if synonym in fields:
+        return synonym
+    wanted = _tokens(variable)
+    if not wanted:
+        return None
+    same_words = [field for field in fields if _tokens(field) == wanted]
+    if len(same_words) == 1:
+        return same_words[0]
+    from tools.field_resolver import shared_field_resolver
+
+    match = shared_field_resolver().resolve(variable, fields)
+    return match[0] if match else None
+
+
+def exact_field(variable: str, fields: Iterable[str]) -> str | None:
+    """Bind a variable only to the field of the same name, ignoring case and spacing."""
+    wanted = normalize_name(variable)
+    return next((field for field in fields if normalize_name(field) == wanted), None)
+
+
+class FormulaGraph:
+    """
+    Dependency graph of formulas over base metric fields.
+
+    Every formula is a node whose inputs are base fields or other formulas
+    (referred to by name or abbreviation). Formulas are evaluated in
+    topological order, so a derived value such as Working Capital is computed
+    once and reused by the formulas built on it, and a change to a base field
+    or a formula only recomputes its downstream formulas.
+
+    Args:
+        formulas: Formula name to expression
+        fields: The base metric fields variables are resolved against
+        resolver: Maps a variable name to one of the fields, or None (default:
+            the schema-aware `resolve_field`; `exact_field` for caller-named values)
+    """
+
+    def __init__(
+        self,
+        formulas: dict[str, str],
+        fields: Iterable[str],
+        resolver: Callable[[str, list[str]], str | None] = resolve_field,
+    ):
+        self.formulas = dict(formulas)
+        self.fields = list(fields)
+        # Per formula, the expression tree and what each placeholder is bound to: ("field" | "formula", name)
+        self.trees: dict[str, ast.Expression] = {}
+        self.inputs: dict[str, dict[str, tuple[str, str]]] = {}
+        self.missing: dict[str, list[str]] = {}
+
+        compiled: dict[str, tuple[ast.Expression, dict[str, str]]] = {}
+        for name, expression in self.formulas.items():
+            try:
+                compiled[name] = compile_expression(expression)
+            except ValueError:
+                self.missing[name] = [expression]
+        by_alias: dict[str, str] = {}
+        for name in compiled:
+            by_alias.update({alias: name for alias in formula_aliases(name)})
+
+        variables: dict[str, dict[str, str]] = {}
+        for name, (tree, names) in compiled.items():
+            inputs, unresolved = {}, []
+            for placeholder, variable in names.items():
+                # A variable naming another formula depends on that formula instead of matching a field
+                formula = by_alias.get(normalize_name(variable))
+                field = None if formula else resolver(variable, self.fields)
+                if formula and formula != name:
+                    inputs[placeholder] = ("formula", formula)
+                elif field:
+                    inputs[placeholder] = ("field", field)
+                else:
+                    unresolved.append(variable)
+            if unresolved:
+                self.missing[name] = unresolved
+            else:
+                self.trees[name] = tree
+                self.inputs[name] = inputs
+                variables[name] = names
+
+        # Kahn's algorithm; formulas left over depend on a cycle or on a formula that cannot be evaluated
+        self.order: list[str] = []
+        waiting = {name: {target for kind, target in inputs.values() if kind == "formula"}
+                   for name, inputs in self.inputs.items()}
+        ready = [name for name, dependencies in waiting.items() if not dependencies]
+        while ready:
+            name = ready.pop(0)
+            self.order.append(name)
+            del waiting[name]
+            for other, dependencies in waiting.items():
+                if name in dependencies:
+                    dependencies.discard(name)
+                    if not dependencies:
+                        ready.append(other)
+        for name, dependencies in waiting.items():
+            self.missing[name] = [variables[name][placeholder] for placeholder, (kind, target) in self.inputs[name].items()
+                                  if kind == "formula" and target in dependencies]
+            del self.trees[name], self.inputs[name]
+
+    def dependencies(self, name: str) -> list[str]:
+        """The formulas a formula uses directly."""
+        return [target for kind, target in self.inputs.get(name, {}).values() if kind == "formula"]
+
+    def base_fields(self, name: str) -> list[str]:
+        """Every base field a formula depends on, directly or through other formulas."""
+        fields: list[str] = []
+        for kind, target in self.inputs.get(name, {}).values():
+            for field in ([target] if kind == "field" else self.base_fields(target)):
+                if field not in fields:
+                    fields.append(field)
+        return fields
+
+    def dependents(self, fields: Iterable[str] = (), formulas: Iterable[str] = ()) -> list[str]:
+        """
+        The formulas affected by changed base fields or changed formulas.
+
+        Returns:
+            The changed formulas and every formula downstream of a change, in evaluation order
+        """
+        fields, affected = set(fields), set(formulas)
+        for name in self.order:
+            if any((target in fields) if kind == "field" else (target in affected)
+                   for kind, target in self.inputs[name].values()):
+                affected.add(name)
+        return [name for name in self.order if name in affected]
+
+    def missing_inputs(self, metric_values: dict[str, Any]) -> dict[str, list[str]]:
+        """
+        The inputs every formula lacks, found before evaluating anything.
+
+        Returns:
+            For each formula that cannot be evaluated: its unresolved variables,
+            the base fields missing from the data, or the formulas it depends on
+            that cannot be evaluated
+        """
+        missing = {name: list(variables) for name, variables in self.missing.items()}
+        for name in self.order:
+            absent = [target for kind, target in self.inputs[name].values()
+                      if (kind == "field" and target not in metric_values) or (kind == "formula" and target in missing)]
+            if absent:
+                missing[name] = absent
+        return missing
+
+    def evaluate(
+        self,
+        metric_values: dict[str, Any],
+        previous: dict[str, Any] | None = None,
+        only: Iterable[str] | None = None,
+    ) -> tuple[dict[str, np.ndarray], dict[str, list[str]]]:
+        """
+        Evaluate the formulas in topological order.
+
+        Args:
+            metric_values: Base field name to values (numbers or arrays, all the same shape)
+            previous: Earlier results, reused for the formulas not recomputed
+            only: Recompute only these formulas (e.g. from `dependents()`); all when None
+
+        Returns:
+            Results per formula (non-finite values as NaN) and, for every formula
+            that could not be evaluated, the inputs it is missing
+        """
+        missing = self.missing_inputs(metric_values)
+        only = set(self.order if only is None else only)
+        previous = previous or {}
+        results: dict[str, np.ndarray] = {}
+        for name in self.order:
+            if name in missing:
+                continue
+            if name not in only and name in previous:
+                results[name] = previous[name]
+                continue
+            bindings = {placeholder: metric_values[target] if kind == "field" else results[target]
+                        for placeholder, (kind, target) in self.inputs[name].items()}
+            value = np.asarray(evaluate(self.trees[name], bindings), dtype=float)
+            results[name] = np.where(np.isfinite(value), value, np.nan)
+        return results, missing
+
+
+def evaluate_formulas(
+    formulas: dict[str, str],
+    metric_values: dict[str, np.ndarray],
+    resolver: Callable[[str, list[str]], str | None] = resolve_field,
+) -> tuple[dict[str, np.ndarray], dict[str, list[str]]]:
+    """
+    Evaluate formulas over metric arrays, resolving formulas that use other formulas.
+
+    Args:
+        formulas: Formula name to expression
+        metric_values: Metric field name to values (any shape, all the same)
+        resolver: Maps variable names to metric fields (see FormulaGraph)
+
+    Returns:
+        Results per formula (non-finite values as NaN) and, for every formula
+        that could not be evaluated, the variables it is missing
+    """
+    return FormulaGraph(formulas, metric_values, resolver).evaluate(metric_values)
@@ -0,0 +1,256 @@
+"""Memoization of pure kernel functions.
+
+Plugin functions whose result depends only on their arguments (calc_yoy,
+calculate_percentage, ...) opt in with the `memoized` decorator. A
+`MemoizingFilter` added to a kernel then answers repeated calls from a
+size-bounded LRU cache instead of invoking the function again:
+
+    @memoized
+    @kernel_function(name="calc_yoy", ...)
+    def calc_yoy(self, json_data: ...) -> ...:
+
+The cache key is the plugin, the function and the canonicalized arguments,
+so JSON arguments that differ only in whitespace or key order share an entry.
+
+Every run is a separate process, so results are also kept in a small SQLite
+file (FA_MEMO_PATH, default outputs/function_memo.sqlite3) shared by all runs
+and batch workers. Its keys also carry a fingerprint of the plugin's source
+file, so results cached by an older version of a plugin are never served.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+if TYPE_CHECKING:
+    from semantic_kernel.filters.functions.function_invocation_context import FunctionInvocationContext
+
+MEMOIZE_ATTRIBUTE = "__kernel_function_memoized__"
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MEMO_PATH = os.path.join("outputs", "function_memo.sqlite3")
+DEFAULT_MAX_STORED_ENTRIES = 20000
+
+
+def memoized(func: Callable) -> Callable:
+    """Mark a kernel function as pure, so a MemoizingFilter may cache its results."""
+    setattr(func, MEMOIZE_ATTRIBUTE, True)
+    return func
+
+
+def _canonical(value: Any) -> str:
+    """Canonical text of an argument; JSON strings are re-serialized with sorted keys."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, ValueError):
+            return value
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@lru_cache(maxsize=None)
+def _source_fingerprint(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return ""
+
+
+def _code_fingerprint(function: Any) -> str:
+    """Fingerprint of the source file a kernel function is defined in."""
+    method = getattr(function, "method", None)
+    try:
+        path = inspect.getsourcefile(method)
+    except TypeError:
+        path = None
+    return _source_fingerprint(path) if path else ""
+
+
+class MemoStore:
+    """
+    Memoized results shared across processes in a SQLite file.
+
+    Only JSON-serializable results are stored. The least recently used
+    entries beyond `max_entries` are pruned every few writes. The file is
+    opened on first use, so creating a store (e.g. at import) touches nothing.
+
+    Args:
+        path: The SQLite file
+        max_entries: Maximum number of stored results
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str | os.PathLike, max_entries: int = DEFAULT_MAX_STORED_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(os.fspath(self.path), timeout=10, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, value TEXT, used REAL)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """(True, result) for a stored key, else (False, None)."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            connection.execute("UPDATE memo SET used = ? WHERE key = ?", (time.time(), key))
+        return True, json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            connection = self._connect()
+            connection.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?)", (key, text, time.time()))
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM memo WHERE key NOT IN (SELECT key FROM memo ORDER BY used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MemoizingFilter:
+    """
+    Function invocation filter that caches the results of memoized kernel functions.
+
+    One filter can be shared by several kernels; add it with
+    `kernel.add_filter("function_invocation", memo_filter)`.
+
+    Args:
+        max_entries: Maximum number of cached results; the least recently used is evicted first
+        store: Results shared with other runs, looked up on a miss in memory
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, store: MemoStore | None = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._cache: OrderedDict[tuple[str, str, str], Any] = OrderedDict()
+        self.hits = 0
+        self.stored_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "MemoizingFilter":
+        """
+        Create a filter sized from FA_MEMO_MAX_ENTRIES (0 disables caching),
+        sharing results across runs in FA_MEMO_PATH (empty for this process only).
+        """
+        max_entries = int(os.environ.get("FA_MEMO_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        path = os.environ.get("FA_MEMO_PATH", DEFAULT_MEMO_PATH).strip()
+        return cls(max_entries, MemoStore(path) if max_entries > 0 and path else None)
+
+    @staticmethod
+    def is_memoized(context: FunctionInvocationContext) -> bool:
+        method = getattr(context.function, "method", None)
+        return bool(getattr(method, MEMOIZE_ATTRIBUTE, False))
+
+    @staticmethod
+    def cache_key(context: FunctionInvocationContext) -> tuple[str, str, str]:
+        parameters = [p.name for p in context.function.metadata.parameters]
+        arguments = {name: _canonical(context.arguments[name]) for name in parameters if name in context.arguments}
+        return (
+            context.function.plugin_name or "",
+            context.function.name,
+            json.dumps(arguments, sort_keys=True, separators=(",", ":")),
+        )
+
+    async def __call__(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        if self.max_entries <= 0 or context.is_streaming or not self.is_memoized(context):
+            await next(context)
+            return
+
+        from semantic_kernel.functions.function_result import FunctionResult
+
+        key = self.cache_key(context)
+        stored_key = json.dumps([*key, _code_fingerprint(context.function)]) if self.store is not None else None
+        if key not in self._cache and stored_key is not None:
+            found, value = self._stored(stored_key)
+            if found:
+                self.stored_hits += 1
+                self._remember(key, value)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            context.result = FunctionResult(
+                function=context.function.metadata,
+                value=self._cache[key],
+                metadata={"arguments": context.arguments, "memoized": True},
+            )
+            return
+
+        self.misses += 1
+        await next(context)
+        if context.result is not None:
+            self._remember(key, context.result.value)
+            if stored_key is not None:
+                try:
+                    self.store.put(stored_key, context.result.value)
+                except (OSError, sqlite3.Error):
+                    pass  # the shared store is best effort, e.g. while another process holds a long lock
+
+    def _stored(self, stored_key: str) -> tuple[bool, Any]:
+        try:
+            return self.store.get(stored_key)
+        except (OSError, sqlite3.Error, ValueError):
+            # e.g. a read-only location: results are then cached in this process only
+            return False, None
+
+    def _remember(self, key: tuple[str, str, str], value: Any) -> None:
+        self._cache[key] = value
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stored_hits": self.stored_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
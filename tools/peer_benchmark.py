@@ -0,0 +1,178 @@
+"""Cross-company peer benchmarking of sector ratios.
+
+Every sector formula (as returned by the Formula_Provider) is evaluated for
+every company and year of a metric store in one pass, giving a ratio cube
+[ratio, company, year]. For each ratio and year the engine then computes the
+peer median, mean and standard deviation, and every company's percentile
+rank and z-score within its peers, so ranking a company against hundreds of
+sector peers is a single call.
+"""
+
+import json
+import os
+from typing import Annotated, Any
+
+import numpy as np
+from semantic_kernel.functions import kernel_function
+
+from data_provider.ingest import ANALYZER_OUTPUT_DIR
+from data_provider.metric_store import MetricStore, load_metric_store
+from tools.formulas import evaluate_formulas, parse_formulas
+
+DEFAULT_PEER_DATA = ANALYZER_OUTPUT_DIR / "financial_data.json"
+
+# Read-only peer stores, opened once per process and shared by every run in it
+_shared_stores: dict[str, MetricStore] = {}
+
+
+def shared_metric_store(path: str | os.PathLike = DEFAULT_PEER_DATA) -> MetricStore:
+    """Metric store of an analyzer output, converted if needed and opened once per process."""
+    key = os.fspath(path)
+    if key not in _shared_stores:
+        _shared_stores[key] = load_metric_store(path)
+    return _shared_stores[key]
+
+
+def _number(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def peer_statistics(ratios: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Peer statistics of a ratio cube [ratio, company, year], ignoring missing values.
+
+    Returns:
+        "median", "mean", "std" and "peers" [ratio, year], and "percentile"
+        and "z_score" [ratio, company, year]
+    """
+    present = ~np.isnan(ratios)
+    peers = present.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(present, ratios, 0.0).sum(axis=1) / peers
+        deviation = np.where(present, ratios - mean[:, None, :], 0.0)
+        std = np.sqrt((deviation ** 2).sum(axis=1) / peers)
+        z_score = np.where(present & (std[:, None, :] > 0), deviation / std[:, None, :], np.nan)
+
+    # Sorting along the company axis puts NaN last; medians and percentile
+    # ranks come from positions in the sorted peer values
+    ordered = np.sort(ratios, axis=1)
+    median = np.full(peers.shape, np.nan)
+    percentile = np.full(ratios.shape, np.nan)
+    for r, y in zip(*np.nonzero(peers)):
+        values = ordered[r, :peers[r, y], y]
+        median[r, y] = np.median(values)
+        companies = present[r, :, y]
+        below = np.searchsorted(values, ratios[r, companies, y], side="left")
+        equal = np.searchsorted(values, ratios[r, companies, y], side="right") - below
+        percentile[r, companies, y] = (below + 0.5 * equal) / peers[r, y] * 100
+    return {"median": median, "mean": mean, "std": std, "peers": peers, "percentile": percentile, "z_score": z_score}
+
+
+def benchmark_peers(store: MetricStore, formulas: dict[str, str], company: str | None = None) -> dict[str, Any]:
+    """
+    Benchmark every company of a store on every formula.
+
+    Args:
+        store: Metric data of the peer set
+        formulas: Formula name to expression
+        company: Only report this company's rankings (peer statistics still use every company)
+
+    Returns:
+        Peer statistics per ratio and year, rankings per company, ratio and
+        year, and the missing variables of formulas that could not be evaluated
+    """
+    values = np.asarray(store.values, dtype=float)
+    metric_values = {str(metric): values[:, m, :] for m, metric in enumerate(store.metrics)}
+    results, missing = evaluate_formulas(formulas, metric_values)
+    names = list(results)
+    years = [str(year) for year in store.years]
+    companies = list(store.iter_companies())
+    if not names:
+        return {"years": years, "peers": companies, "ratios": {}, "companies": {}, "unresolved": missing}
+
+    ratios = np.stack([results[name] for name in names])
+    stats = peer_statistics(ratios)
+    selected = [store.company_code(company)] if company else range(len(companies))
+
+    report: dict[str, Any] = {"years": years, "peers": companies, "ratios": {}, "companies": {}, "unresolved": missing}
+    for r, name in enumerate(names):
+        report["ratios"][name] = {
+            year: {
+                "median": _number(stats["median"][r, y]),
+                "mean": _number(stats["mean"][r, y]),
+                "std": _number(stats["std"][r, y]),
+                "peers": int(stats["peers"][r, y]),
+            }
+            for y, year in enumerate(years)
+        }
+    for c in selected:
+        report["companies"][companies[c]] = {
+            name: {
+                year: {
+                    "value": _number(ratios[r, c, y]),
+                    "percentile": _number(stats["percentile"][r, c, y]),
+                    "z_score": _number(stats["z_score"][r, c, y]),
+                }
+                for y, year in enumerate(years)
+            }
+            for r, name in enumerate(names)
+        }
+    return report
+
+
+class PeerBenchmarkPlugin:
+    """
+    A plugin for benchmarking companies against their sector peers.
+
+    Args:
+        data_path: Analyzer output with the peer set's metrics (default: financial_data.json)
+    """
+
+    def __init__(self, data_path: str | None = None):
+        self.data_path = data_path or DEFAULT_PEER_DATA
+
+    @kernel_function(
+        name="benchmark_peers",
+        description="Calculate every sector formula for a company and all its peers, and return peer medians, "
+                    "percentile ranks and z-scores per ratio and year"
+    )
+    def benchmark_peers(
+        self,
+        formulas: Annotated[str, "The sector formulas from the Formula_Provider, one 'Name = expression' per line"],
+        company: Annotated[str, "The company to rank against its peers (empty for all companies)"] = "",
+        json_data: Annotated[str, "Optional JSON metric data of the peer set (company name to metric records); "
+                                  "the ingested analyzer data is used when empty"] = ""
+    ) -> Annotated[str, "JSON string with peer statistics and rankings"]:
+        """
+        Benchmark a company against its peers on the sector formulas.
+
+        Args:
+            formulas: Formula lines such as "Current Ratio = Current Assets / Current Liabilities"
+            company: The company to rank; all companies when empty
+            json_data: Peer metric data; the analyzer output is used when empty
+
+        Returns:
+            JSON string with "ratios" (median, mean, std and peer count per
+            ratio and year), "companies" (value, percentile and z-score per
+            ratio and year) and "unresolved" (formulas with missing variables)
+
+        Example:
+            Input: formulas="Current Ratio = Current Assets / Current Liabilities", company="tesco"
+            Output: '{"ratios": {"Current Ratio": {"2024": {"median": 0.78, ...}}}, "companies": {"tesco": ...}}'
+        """
+        try:
+            parsed = parse_formulas(formulas)
+            if not parsed:
+                return json.dumps({"error": "No formulas found; expected lines like 'Name = expression'"}, indent=2)
+            if json_data:
+                data = json.loads(json_data)
+                store = MetricStore.from_tables(data if isinstance(data, dict) else {company or "company": data})
+            else:
+                store = shared_metric_store(self.data_path)
+            return json.dumps(benchmark_peers(store, parsed, company or None), indent=2)
+        except json.JSONDecodeError:
+            return json.dumps({"error": "Invalid JSON format"}, indent=2)
+        except KeyError as e:
+            return json.dumps({"error": str(e).strip("'\"")}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Benchmark error: {str(e)}"}, indent=2)
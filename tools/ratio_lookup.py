@@ -0,0 +1,144 @@
+"""Lookup of the sector ratios materialized at ingest time.
+
+The formula analysis asks for the ratios of the Formula_Provider's formulas.
+A formula is read from the derived metric store when the materialized sector
+formula set has it with the same dependency signature: the same expression,
+the same formulas it uses (transitively) and the same resolved base fields.
+Only the others are evaluated, for the one company, from its raw metrics.
+"""
+
+import json
+import os
+from typing import Annotated, Any
+
+import numpy as np
+from semantic_kernel.functions import kernel_function
+
+from data_provider.derived_metrics import formula_graph, formula_signatures, load_derived_metrics
+from data_provider.metric_store import MetricStore
+from tools.formulas import formula_aliases, parse_formulas
+from tools.peer_benchmark import DEFAULT_PEER_DATA, shared_metric_store
+
+# Derived stores with their manifests, opened once per process like the peer stores
+_shared_derived: dict[str, tuple[MetricStore, dict[str, Any]]] = {}
+
+
+def shared_derived_metrics(path: str | os.PathLike = DEFAULT_PEER_DATA) -> tuple[MetricStore, dict[str, Any]]:
+    """Derived store of an analyzer output, rebuilt if needed and opened once per process."""
+    key = os.fspath(path)
+    if key not in _shared_derived:
+        _shared_derived[key] = load_derived_metrics(path)
+    return _shared_derived[key]
+
+
+def _number(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def lookup_ratios(
+    derived: MetricStore,
+    manifest: dict[str, Any],
+    store: MetricStore,
+    company: str,
+    formulas: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    A company's ratios per year, looked up where possible.
+
+    Args:
+        derived: The derived metric store
+        manifest: Its manifest (the formulas it was built from and their signatures)
+        store: The raw metric store, for formulas that are not materialized
+        company: The company
+        formulas: Formula name to expression (default: every materialized ratio)
+
+    Returns:
+        Ratio values per year, the source of every ratio ("precomputed" or
+        "computed") and the missing variables of formulas that could not be
+        evaluated
+    """
+    names = {str(name) for name in derived.metrics}
+    materialized = {alias: name for name in manifest["formulas"] if name in names for alias in formula_aliases(name)}
+    recorded = manifest.get("formula_signatures", {})
+    requested = formulas if formulas is not None else {name: manifest["formulas"][name] for name in derived.metrics}
+    graph = formula_graph(requested, store)
+    signatures = formula_signatures(graph)
+    years = [str(year) for year in derived.years]
+    row = np.asarray(derived.values[derived.company_code(company)])
+
+    report: dict[str, Any] = {"company": company, "years": years, "ratios": {}, "source": {}, "unresolved": {}}
+    to_compute = []
+    for name in requested:
+        match = next((materialized[alias] for alias in formula_aliases(name) if alias in materialized), None)
+        # A formula of the same name may use other definitions of its dependencies
+        if match is not None and name in signatures and signatures[name] == recorded.get(match):
+            values = row[derived.metric_code(match)]
+            report["ratios"][name] = {year: _number(values[y]) for y, year in enumerate(years)}
+            report["source"][name] = "precomputed"
+        else:
+            to_compute.append(name)
+
+    if to_compute:
+        # Evaluate every requested formula, so computed ones can use the others
+        values = np.asarray(store.values[store.company_code(company)], dtype=float)
+        metric_values = {str(metric): values[m] for m, metric in enumerate(store.metrics)}
+        results, missing = graph.evaluate(metric_values)
+        for name in to_compute:
+            if name in results:
+                report["ratios"][name] = {year: _number(results[name][y]) for y, year in enumerate(years)}
+                report["source"][name] = "computed"
+            else:
+                report["unresolved"][name] = missing.get(name, [])
+    return report
+
+
+class RatioLookupPlugin:
+    """
+    A plugin for looking up a company's precomputed sector ratios.
+
+    Args:
+        data_path: Analyzer output the ratios were materialized from (default: financial_data.json)
+    """
+
+    def __init__(self, data_path: str | None = None):
+        self.data_path = data_path or DEFAULT_PEER_DATA
+
+    @kernel_function(
+        name="lookup_ratios",
+        description="Look up a company's sector ratios for every year, precomputed from the ingested financial data; "
+                    "formulas that are not precomputed are calculated in the same call"
+    )
+    def lookup_ratios(
+        self,
+        company: Annotated[str, "The company to look up"],
+        formulas: Annotated[str, "The sector formulas from the Formula_Provider, one 'Name = expression' per line "
+                                 "(empty for every precomputed ratio)"] = ""
+    ) -> Annotated[str, "JSON string with the ratio values per year"]:
+        """
+        Look up a company's ratios.
+
+        Args:
+            company: The company
+            formulas: Formula lines such as "Current Ratio = Current Assets / Current Liabilities";
+                every precomputed ratio when empty
+
+        Returns:
+            JSON string with "ratios" (value per ratio and year), "source"
+            ("precomputed" or "computed" per ratio) and "unresolved"
+            (formulas with missing variables)
+
+        Example:
+            Input: company="tesco", formulas="Current Ratio = Current Assets / Current Liabilities"
+            Output: '{"company": "tesco", "ratios": {"Current Ratio": {"2024": 0.76, ...}}, "source": {...}}'
+        """
+        try:
+            parsed = parse_formulas(formulas) if formulas.strip() else None
+            if parsed == {}:
+                return json.dumps({"error": "No formulas found; expected lines like 'Name = expression'"}, indent=2)
+            derived, manifest = shared_derived_metrics(self.data_path)
+            report = lookup_ratios(derived, manifest, shared_metric_store(self.data_path), company, parsed)
+            return json.dumps(report, indent=2)
+        except KeyError as e:
+            return json.dumps({"error": str(e).strip("'\"")}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Ratio lookup error: {str(e)}"}, indent=2)
@@ -0,0 +1,181 @@
+"""Multi-period time-series analytics for financial metrics.
+
+The functions in this module work on arrays of metric values whose last
+axis is the fiscal year (e.g. [company, metric, year]), with NaN for missing
+years. Every statistic is computed for all series at once, so a report with
+ten years of history for many companies costs the same single call as one
+with three years for one company:
+- CAGR between the first and last reported year
+- Rolling growth over a window of years (window=1 is YoY growth)
+- Trend slope (least-squares change per year)
+- Volatility (standard deviation of the YoY growth rates)
+
+Growth rates are fractions here; the plugin reports them as percentages.
+"""
+
+import json
+from typing import Annotated, Any
+
+import numpy as np
+from semantic_kernel.functions import kernel_function
+
+from data_provider.metric_store import MetricStore
+from tools.memoize import memoized
+
+
+def _first_last_valid(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Indices of the first and last non-NaN year of every series, and whether it has any."""
+    present = ~np.isnan(values)
+    n_years = values.shape[-1]
+    first = np.argmax(present, axis=-1)
+    last = n_years - 1 - np.argmax(present[..., ::-1], axis=-1)
+    return first, last, present.any(axis=-1)
+
+
+def cagr(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Compound annual growth rate between the first and last reported year of every series.
+
+    NaN where the series has fewer than two years or a non-positive start or end value.
+    """
+    years = np.asarray(years, dtype=float)
+    first, last, any_present = _first_last_valid(values)
+    begin = np.take_along_axis(values, first[..., None], axis=-1)[..., 0]
+    end = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    span = years[last] - years[first]
+    ok = any_present & (span > 0) & (begin > 0) & (end > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.power(end / begin, 1.0 / span) - 1.0
+    return np.where(ok, result, np.nan)
+
+
+def rolling_growth(values: np.ndarray, window: int = 1) -> np.ndarray:
+    """
+    Annualized growth over `window` years for every year after the first `window`.
+
+    Returns an array with `window` fewer years than the input; NaN where either
+    end of the window is missing or not positive (YoY growth for window=1 allows
+    any non-zero start and is relative to its magnitude).
+    """
+    if window < 1 or window >= values.shape[-1]:
+        return np.full(values.shape[:-1] + (0,), np.nan)
+    begin, end = values[..., :-window], values[..., window:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if window == 1:
+            return np.where(begin != 0, (end - begin) / np.abs(begin), np.nan)
+        result = np.power(end / begin, 1.0 / window) - 1.0
+    return np.where((begin > 0) & (end > 0), result, np.nan)
+
+
+def trend_slope(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Least-squares slope (value change per year) of every series, ignoring missing years."""
+    years = np.broadcast_to(np.asarray(years, dtype=float), values.shape)
+    present = ~np.isnan(values)
+    count = present.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.where(present, years, 0.0).sum(axis=-1) / count
+        y_mean = np.where(present, values, 0.0).sum(axis=-1) / count
+        dx = np.where(present, years - x_mean[..., None], 0.0)
+        dy = np.where(present, values - y_mean[..., None], 0.0)
+        slope = (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+    return np.where(count >= 2, slope, np.nan)
+
+
+def volatility(values: np.ndarray) -> np.ndarray:
+    """Standard deviation of the YoY growth rates of every series (NaN with fewer than two)."""
+    growth = rolling_growth(values, 1)
+    present = ~np.isnan(growth)
+    count = present.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(present, growth, 0.0).sum(axis=-1) / count
+        squares = np.where(present, growth - mean[..., None], 0.0) ** 2
+        std = np.sqrt(squares.sum(axis=-1) / (count - 1))
+    return np.where(count >= 2, std, np.nan)
+
+
+def analyze_time_series(store: MetricStore, window: int = 1) -> dict[str, list[dict[str, Any]]]:
+    """
+    Compute every time-series statistic for every company and metric in a store.
+
+    Returns:
+        Per company, one record per metric with the statistics (percentages
+        rounded to two decimals, None where a statistic is not defined)
+    """
+    values = np.asarray(store.values, dtype=float)
+    years = np.array([int(year) for year in store.years])
+    stats = {
+        "CAGR": cagr(values, years) * 100,
+        "Trend_Slope": trend_slope(values, years),
+        "Volatility": volatility(values) * 100,
+    }
+    rolling = rolling_growth(values, window) * 100
+    rolling_years = [str(year) for year in store.years[window:]] if rolling.shape[-1] else []
+    first, last, any_present = _first_last_valid(values)
+
+    def number(value: float) -> float | None:
+        return None if np.isnan(value) else round(float(value), 2)
+
+    result: dict[str, list[dict[str, Any]]] = {}
+    for c, company in enumerate(store.iter_companies()):
+        records = []
+        for m, metric in enumerate(store.metrics):
+            if not any_present[c, m]:
+                continue
+            record: dict[str, Any] = {
+                "Metric": str(metric),
+                "Period": f"{store.years[first[c, m]]}-{store.years[last[c, m]]}",
+            }
+            record.update({name: number(array[c, m]) for name, array in stats.items()})
+            record["Rolling_Growth"] = {year: number(rolling[c, m, y]) for y, year in enumerate(rolling_years)}
+            records.append(record)
+        result[company] = records
+    return result
+
+
+class TimeSeriesPlugin:
+    """
+    A plugin for multi-period time-series analysis of financial metrics.
+
+    This plugin extends the single-value growth tools of the YoY calculator to
+    any number of fiscal years, for all metrics and companies in one call.
+    """
+
+    @memoized
+    @kernel_function(
+        name="analyze_time_series",
+        description="Calculate CAGR, rolling growth, trend slope and volatility for every metric "
+                    "over all available years, for one or many companies"
+    )
+    def analyze_time_series(
+        self,
+        json_data: Annotated[str, "JSON string of metric records with year data (a list for one company, "
+                                  "or an object of company name to such a list)"],
+        window: Annotated[int, "Number of years for the rolling growth (1 = year-over-year)"] = 1
+    ) -> Annotated[str, "JSON string with the time-series statistics per company and metric"]:
+        """
+        Calculate time-series statistics for financial metrics.
+
+        Args:
+            json_data: Metric records with any number of year columns
+            window: Number of years for the rolling growth
+
+        Returns:
+            JSON string with one record per metric: Period, CAGR (%), Trend_Slope
+            (value change per year), Volatility (% std of YoY growth) and
+            Rolling_Growth (% per year)
+
+        Example:
+            Input: '[{"Metric": "Revenue", "2022": "1000", "2023": "1200", "2024": "1500"}]'
+            Output: '[{"Metric": "Revenue", "Period": "2022-2024", "CAGR": 22.47, "Trend_Slope": 250.0, ...}]'
+        """
+        try:
+            data = json.loads(json_data) if isinstance(json_data, str) else json_data
+            single = not isinstance(data, dict) or "Metric" in data
+            if single:
+                data = {"": data if isinstance(data, list) else [data]}
+            result = analyze_time_series(MetricStore.from_tables(data), window)
+            return json.dumps(result[""] if single else result, indent=2)
+        except json.JSONDecodeError:
+            return json.dumps({"error": "Invalid JSON format"}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Calculation error: {str(e)}"}, indent=2)
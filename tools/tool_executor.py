@@ -0,0 +1,136 @@
+"""Concurrent execution of kernel tool calls.
+
+Semantic Kernel already gathers the function calls an agent emits in one
+turn, but synchronous plugin functions (e.g. RagPlugin.retrieve_doc, which
+does blocking HTTP) run directly on the event loop, so parallel calls run
+one after another and stall the orchestration and its streaming callbacks.
+
+`ToolExecutionFilter` runs synchronous plugin functions in a bounded thread
+pool instead, so gathered calls overlap, and records the latency of every
+call. Add it to a kernel after every other function invocation filter (the
+first filter added runs outermost), so it only wraps the actual function
+execution and, e.g., memoized results never reach the pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from workflow.events import TOOL_CALL
+
+if TYPE_CHECKING:
+    from semantic_kernel.filters.functions.function_invocation_context import FunctionInvocationContext
+
+DEFAULT_MAX_WORKERS = 8
+
+# Latency records kept for the run summary
+MAX_LATENCY_RECORDS = 1000
+
+
+def _call_sync(method: Callable, arguments: dict[str, Any]) -> Any:
+    result = method(**arguments)
+    return list(result) if inspect.isgenerator(result) else result
+
+
+class ToolExecutionFilter:
+    """
+    Function invocation filter that offloads synchronous plugin functions to a thread pool.
+
+    One filter can be shared by several kernels, so the pool bounds the
+    number of blocking tool calls across all agents.
+
+    Args:
+        max_workers: Maximum number of synchronous tool calls running at the same time
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.calls: list[dict[str, Any]] = []
+        self._totals: dict[str, dict[str, float]] = {}
+        # Set to a workflow.events.EventBus to publish tool_call events instead of printing
+        self.event_bus: Any = None
+
+    @classmethod
+    def from_env(cls) -> "ToolExecutionFilter":
+        """Create a filter sized from FA_TOOL_WORKERS."""
+        return cls(int(os.environ.get("FA_TOOL_WORKERS", DEFAULT_MAX_WORKERS)))
+
+    @staticmethod
+    def _is_sync(context: FunctionInvocationContext) -> bool:
+        method = getattr(context.function, "method", None)
+        return (
+            method is not None
+            and not context.is_streaming
+            and not inspect.iscoroutinefunction(method)
+            and not inspect.isasyncgenfunction(method)
+        )
+
+    async def __call__(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        name = context.function.fully_qualified_name
+        started = time.perf_counter()
+        offloaded = self._is_sync(context)
+        status = "ok"
+        try:
+            if offloaded:
+                from semantic_kernel.functions.function_result import FunctionResult
+
+                arguments = context.function.gather_function_parameters(context)
+                loop = asyncio.get_running_loop()
+                value = await loop.run_in_executor(self._executor, partial(_call_sync, context.function.method, arguments))
+                context.result = value if isinstance(value, FunctionResult) else FunctionResult(
+                    function=context.function.metadata,
+                    value=value,
+                    metadata={"arguments": context.arguments, "used_arguments": arguments},
+                )
+            else:
+                await next(context)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000, offloaded, status)
+
+    def record(self, name: str, latency_ms: float, offloaded: bool, status: str) -> None:
+        if self.event_bus is not None:
+            self.event_bus.publish(TOOL_CALL, function=name, status=status,
+                                   latency_ms=round(latency_ms, 1), offloaded=offloaded)
+        else:
+            print(f"🔧 Tool call {name} {status} in {latency_ms:.0f} ms")
+        if len(self.calls) < MAX_LATENCY_RECORDS:
+            self.calls.append({
+                "function": name,
+                "latency_ms": round(latency_ms, 1),
+                "offloaded": offloaded,
+                "status": status,
+            })
+        totals = self._totals.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        totals["calls"] += 1
+        totals["errors"] += status == "error"
+        totals["total_ms"] += latency_ms
+        totals["max_ms"] = max(totals["max_ms"], latency_ms)
+
+    def stats(self) -> dict[str, Any]:
+        """Call count, errors and mean/max latency per function."""
+        return {
+            name: {
+                "calls": int(totals["calls"]),
+                "errors": int(totals["errors"]),
+                "mean_ms": round(totals["total_ms"] / totals["calls"], 1),
+                "max_ms": round(totals["max_ms"], 1),
+            }
+            for name, totals in self._totals.items()
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
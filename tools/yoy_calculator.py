@@ -6,8 +6,41 @@ and percentage changes for financial metrics.
 
 from typing import Annotated, Dict, Any
 from semantic_kernel.functions import kernel_function
+import heapq
 import json
 
+from tools.memoize import memoized
+
+
+def _to_float(value: Any) -> float | None:
+    """Parse a number or a percentage string such as "20.0%" or "1,200"; None if not numeric."""
+    try:
+        return float(str(value).replace(',', '').replace('%', '').strip())
+    except (ValueError, TypeError):
+        return None
+
+
+def _mover(item: Dict[str, Any], current_year: str, previous_year: str) -> Dict[str, Any] | None:
+    """
+    Return a copy of a metric record with numeric growth (%) and change, or None
+    if the change cannot be determined. Uses the calc_yoy fields when present and
+    falls back to the year values otherwise.
+    """
+    growth = _to_float(item.get("YoY_Growth"))
+    change = _to_float(item.get("YoY_Change"))
+    if growth is None or change is None:
+        current_value = _to_float(item.get(current_year))
+        previous_value = _to_float(item.get(previous_year))
+        if current_value is None or previous_value is None or previous_value == 0:
+            return None
+        change = current_value - previous_value
+        growth = change / abs(previous_value) * 100
+    mover = dict(item)
+    mover["YoY_Growth_Pct"] = round(growth, 2)
+    mover["YoY_Change"] = change
+    mover["Direction"] = "up" if change >= 0 else "down"
+    return mover
+
 
 class YoYCalculatorPlugin:
     """
@@ -17,6 +50,7 @@ class YoYCalculatorPlugin:
     calculating percentage changes between different time periods.
     """
 
+    @memoized
     @kernel_function(
         name="calc_yoy",
         description="Calculate Year-over-Year (YoY) growth rate for financial metrics"
@@ -82,6 +116,94 @@ class YoYCalculatorPlugin:
         except Exception as e:
             return json.dumps([{"error": f"Calculation error: {str(e)}"}], indent=2)
 
+    @memoized
+    @kernel_function(
+        name="top_movers",
+        description="Select the top-k metrics with the largest YoY change above a threshold, "
+                    "per company or across a peer universe"
+    )
+    def top_movers(
+        self,
+        json_data: Annotated[str, "JSON string of YoY results: a list of metric records (e.g. calc_yoy output) "
+                                  "or an object of company name to such a list"],
+        top_k: Annotated[int, "Number of metrics to return"] = 10,
+        threshold_pct: Annotated[float, "Only include metrics whose YoY growth exceeds this percentage"] = 5.0,
+        rank_by: Annotated[str, "'relative' to rank by YoY growth %, 'absolute' to rank by YoY change"] = "relative",
+        per_company: Annotated[bool, "Select top-k per company (true) or across all companies (false)"] = True,
+        current_year: Annotated[str, "The current year, used when YoY fields are missing"] = "2024",
+        previous_year: Annotated[str, "The previous year, used when YoY fields are missing"] = "2023"
+    ) -> Annotated[str, "JSON string with the ranked significant movers"]:
+        """
+        Select the most significant movers from YoY result sets.
+
+        Metrics whose absolute YoY growth does not exceed threshold_pct are
+        filtered out; the remaining metrics are ranked by absolute growth % or
+        absolute change with a heap (partial selection, no full sort).
+
+        Args:
+            json_data: YoY results for one company (list) or many companies (object)
+            top_k: Number of metrics to return per company, or in total
+            threshold_pct: Minimum absolute YoY growth in percent
+            rank_by: "relative" or "absolute"
+            per_company: Rank within each company instead of across the peer universe
+            current_year: The current year, used when YoY fields are missing
+            previous_year: The previous year, used when YoY fields are missing
+
+        Returns:
+            JSON string with "movers": a ranked list, or an object of company to
+            ranked list when ranking per company
+
+        Example:
+            Input: '[{"Metric": "Revenue", "YoY_Growth": "20.0%", "YoY_Change": 200}, ...]', top_k=1
+            Output: '{"movers": [{"Metric": "Revenue", ..., "YoY_Growth_Pct": 20.0, "Direction": "up", "Rank": 1}], ...}'
+        """
+        try:
+            data = json.loads(json_data) if isinstance(json_data, str) else json_data
+            if rank_by not in ("relative", "absolute"):
+                return json.dumps({"error": "rank_by must be 'relative' or 'absolute'"}, indent=2)
+
+            if isinstance(data, dict) and "Metric" not in data:
+                companies = data
+            else:
+                companies = {None: data if isinstance(data, list) else [data]}
+
+            candidates: Dict[Any, list] = {}
+            for company, items in companies.items():
+                for item in items:
+                    if not isinstance(item, dict):
+                        continue
+                    mover = _mover(item, current_year, previous_year)
+                    if mover is None or abs(mover["YoY_Growth_Pct"]) <= threshold_pct:
+                        continue
+                    if company is not None:
+                        mover["Company"] = company
+                    candidates.setdefault(company if per_company else None, []).append(mover)
+
+            field = "YoY_Growth_Pct" if rank_by == "relative" else "YoY_Change"
+            selected = {}
+            for group, movers in candidates.items():
+                ranked = heapq.nlargest(max(top_k, 0), movers, key=lambda m: abs(m[field]))
+                for rank, mover in enumerate(ranked, start=1):
+                    mover["Rank"] = rank
+                selected[group] = ranked
+
+            if per_company and None not in companies:
+                movers: Any = {company: selected.get(company, []) for company in companies}
+            else:
+                movers = selected.get(None, [])
+            return json.dumps({
+                "rank_by": rank_by,
+                "threshold_pct": threshold_pct,
+                "top_k": top_k,
+                "movers": movers,
+            }, indent=2)
+
+        except json.JSONDecodeError:
+            return json.dumps({"error": "Invalid JSON format"}, indent=2)
+        except Exception as e:
+            return json.dumps({"error": f"Selection error: {str(e)}"}, indent=2)
+
+    @memoized
     @kernel_function(
         name="calculate_growth_rate",
         description="Calculate growth rate between two values"
@@ -113,6 +235,7 @@ class YoYCalculatorPlugin:
         growth_rate = ((current_value - previous_value) / previous_value) * 100
         return f"{growth_rate:.1f}%"
 
+    @memoized
     @kernel_function(
         name="calculate_compound_growth",
         description="Calculate compound annual growth rate (CAGR)"
@@ -0,0 +1,147 @@
+"""
+Per-job event delivery for the web interface.
+
+Every workflow run is a job with its own Socket.IO room (the job id is the
+run directory name). Browsers join the room of the job they watch with a
+`subscribe` event, and the job's events only go to the room's members.
+
+Events are not emitted straight from the workflow reader. Each subscribed
+client has a bounded send queue drained by its own background task:
+- Queued events are sent in batches as one `job_events` message, and the
+  next batch waits until the client acknowledges the previous one, so a slow
+  client never has more than one batch in flight
+- When a client's queue is full, its oldest log lines are dropped (status
+  events are always kept) and the client receives a `log_gap` event with the
+  number of dropped lines, so it can fetch them with /api/workflow/logs
+
+A slow viewer therefore costs a bounded amount of memory and never holds up
+the workflow reader or the other viewers.
+"""
+
+import collections
+import threading
+from typing import Any
+
+# Events that may be dropped for a slow client
+DROPPABLE_EVENTS = {'log_update'}
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+ACK_TIMEOUT_SECONDS = 10.0
+
+
+class ClientQueue:
+    """Bounded queue of events waiting to be sent to one client."""
+
+    def __init__(self, sid: str, max_size: int = DEFAULT_QUEUE_SIZE):
+        self.sid = sid
+        self.max_size = max(1, max_size)
+        self.events: collections.deque = collections.deque()
+        self.dropped = 0
+        self.unreported_drops = 0
+        self.closed = False
+        self._ready = threading.Condition()
+
+    def put(self, event: str, data: Any) -> None:
+        with self._ready:
+            if len(self.events) >= self.max_size:
+                self._drop_oldest_log()
+            self.events.append({'event': event, 'data': data})
+            self._ready.notify()
+
+    def _drop_oldest_log(self) -> None:
+        for i, queued in enumerate(self.events):
+            if queued['event'] in DROPPABLE_EVENTS:
+                del self.events[i]
+                self.dropped += 1
+                self.unreported_drops += 1
+                return
+        # Nothing droppable left: the oldest status event goes
+        self.events.popleft()
+        self.dropped += 1
+
+    def take(self, max_events: int, timeout: float) -> list[dict[str, Any]]:
+        """Wait up to `timeout` for events and return at most `max_events` of them."""
+        with self._ready:
+            if not self.events and not self.closed:
+                self._ready.wait(timeout)
+            batch = []
+            if self.unreported_drops:
+                batch.append({'event': 'log_gap', 'data': {'dropped': self.unreported_drops}})
+                self.unreported_drops = 0
+            while self.events and len(batch) < max_events:
+                batch.append(self.events.popleft())
+            return batch
+
+    def close(self) -> None:
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+
+class JobEventHub:
+    """
+    Routes job events to the clients subscribed to the job's room.
+
+    Args:
+        socketio: The Flask-SocketIO server
+        queue_size: Events queued per client before log lines are dropped
+        batch_size: Events sent per `job_events` message
+    """
+
+    def __init__(self, socketio: Any, queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.socketio = socketio
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.clients: dict[str, ClientQueue] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, sid: str, job_id: str) -> None:
+        """Add a client to a job's room; call from the client's Socket.IO handler."""
+        from flask_socketio import join_room, rooms, leave_room
+
+        # A client watches one job at a time
+        for room in rooms(sid=sid):
+            if room != sid:
+                leave_room(room, sid=sid)
+        join_room(job_id, sid=sid)
+        with self._lock:
+            if sid in self.clients:
+                return
+            client = self.clients[sid] = ClientQueue(sid, self.queue_size)
+        self.socketio.start_background_task(self._send_loop, client)
+
+    def unsubscribe(self, sid: str) -> None:
+        """Stop sending to a client, e.g. when it disconnects."""
+        with self._lock:
+            client = self.clients.pop(sid, None)
+        if client is not None:
+            client.close()
+
+    def subscribers(self, job_id: str) -> list[str]:
+        manager = self.socketio.server.manager
+        return [sid for sid, _ in manager.get_participants('/', job_id)] if job_id in manager.rooms.get('/', {}) else []
+
+    def publish(self, job_id: str, event: str, data: Any) -> None:
+        """Queue an event for every subscriber of a job."""
+        for sid in self.subscribers(job_id):
+            client = self.clients.get(sid)
+            if client is not None:
+                client.put(event, data)
+
+    def _send_loop(self, client: ClientQueue) -> None:
+        while not client.closed:
+            batch = client.take(self.batch_size, timeout=1.0)
+            if not batch:
+                continue
+            acknowledged = threading.Event()
+            self.socketio.emit('job_events', batch, to=client.sid, callback=lambda *args: acknowledged.set())
+            acknowledged.wait(ACK_TIMEOUT_SECONDS)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            clients = list(self.clients.values())
+        return {
+            'clients': len(clients),
+            'queued': sum(len(client.events) for client in clients),
+            'dropped': sum(client.dropped for client in clients),
+        }
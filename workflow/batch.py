@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Multi-company Batch Runner.
+
+Runs the financial analysis workflow for a list of companies across a pool
+of worker processes:
+- Every company gets its own run directory (<batch dir>/<company>/) with its
+  report, checkpoint, run status and the run's log
+- `batch_summary.json` in the batch directory lists every company's status,
+  duration and run directory, and is rewritten as companies finish
+- Each worker loads the shared read-only assets (the SDKs, the plugins and
+  the peer metric store) once and reuses them for every company it runs
+- The Azure OpenAI quota (FA_RATE_LIMIT_RPM / FA_RATE_LIMIT_TPM) is split
+  evenly between the workers, each of which rate limits its own calls
+
+Run from the repository root:
+    python -m workflow.batch Tesco Unilever --workers 2
+    python -m workflow.batch --file companies.txt --max-rounds 30
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+SUMMARY_FILE_NAME = "batch_summary.json"
+RUN_LOG_FILE_NAME = "run.log"
+RUN_STATUS_FILE_NAME = "run_status.json"
+
+
+def company_dir_name(company: str) -> str:
+    """File-system safe directory name for a company."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", company.strip()).strip("_") or "company"
+
+
+def read_companies(names: list[str], path: str | None) -> list[str]:
+    """Companies from the command line and/or a file (one per line, # comments allowed), without duplicates."""
+    companies = list(names)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            companies += [line.split("#", 1)[0].strip() for line in f]
+    seen: set[str] = set()
+    return [c for c in companies if c and not (c.lower() in seen or seen.add(c.lower()))]
+
+
+def init_worker(workers: int = 1) -> None:
+    """Load the shared read-only assets once per worker process and take its share of the quota."""
+    import financial_analysis_workflow  # noqa: F401 - loads the workflow module and .env
+    from semantic_kernel.agents import AzureAIAgent  # noqa: F401
+    from semantic_kernel.agents.orchestration.magentic import MagenticOrchestration  # noqa: F401
+
+    from tools.peer_benchmark import shared_metric_store
+    from tools.ratio_lookup import shared_derived_metrics
+    from workflow import budget, checkpoint  # noqa: F401
+
+    shared_metric_store()
+    shared_derived_metrics()
+    # The rate limiter reads its quota on first use, after .env has been loaded
+    for name in ("FA_RATE_LIMIT_RPM", "FA_RATE_LIMIT_TPM"):
+        if os.environ.get(name, "").strip():
+            os.environ[name] = str(max(1, int(os.environ[name]) // workers))
+
+
+def run_company(company: str, output_dir: str, budget_overrides: dict[str, Any]) -> dict[str, Any]:
+    """
+    Run the workflow for one company in the current worker process.
+
+    The run's output goes to run.log in its run directory.
+    """
+    import financial_analysis_workflow
+    from workflow.budget import RunBudget
+
+    os.makedirs(output_dir, exist_ok=True)
+    budget = RunBudget.from_env()
+    for name, value in budget_overrides.items():
+        if value is not None:
+            setattr(budget, name, value)
+
+    started = time.perf_counter()
+    error = None
+    with open(os.path.join(output_dir, RUN_LOG_FILE_NAME), "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            asyncio.run(financial_analysis_workflow.main(budget, output_dir, company=company))
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+
+    status = "failed"
+    status_path = os.path.join(output_dir, RUN_STATUS_FILE_NAME)
+    if os.path.exists(status_path):
+        with open(status_path, "r") as f:
+            status = json.load(f).get("status", status)
+    return {
+        "company": company,
+        "status": "failed" if error else status,
+        "error": error,
+        "duration_seconds": round(time.perf_counter() - started, 1),
+        "output_dir": output_dir,
+    }
+
+
+def write_summary(batch_dir: str, started_at: str, results: dict[str, dict[str, Any]]) -> str:
+    statuses: dict[str, int] = {}
+    for result in results.values():
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    path = os.path.join(batch_dir, SUMMARY_FILE_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "started_at": started_at,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "statuses": statuses,
+            "companies": list(results.values()),
+        }, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_batch(companies: list[str], batch_dir: str, workers: int, budget_overrides: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Run every company across a pool of worker processes and keep the batch summary up to date."""
+    os.makedirs(batch_dir, exist_ok=True)
+    started_at = datetime.datetime.now().isoformat()
+    results = {
+        company: {"company": company, "status": "pending", "error": None, "duration_seconds": None,
+                  "output_dir": os.path.join(batch_dir, company_dir_name(company))}
+        for company in companies
+    }
+    write_summary(batch_dir, started_at, results)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(workers,)) as pool:
+        futures = {
+            pool.submit(run_company, company, results[company]["output_dir"], budget_overrides): company
+            for company in companies
+        }
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                results[company] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. init_worker failed)
+                results[company].update(status="failed", error=str(e))
+            result = results[company]
+            icon = {"completed": "✅", "partial": "⚠️"}.get(result["status"], "❌")
+            duration = f" in {result['duration_seconds']:.0f}s" if result["duration_seconds"] is not None else ""
+            print(f"{icon} {company}: {result['status']}{duration} -> {result['output_dir']}")
+            write_summary(batch_dir, started_at, results)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the financial analysis workflow for many companies.")
+    parser.add_argument("companies", nargs="*", help="Companies to analyze")
+    parser.add_argument("--file", default=None, help="File with one company per line")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("FA_BATCH_WORKERS", 2)),
+                        help="Number of worker processes (default: FA_BATCH_WORKERS or 2)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Batch directory (default: outputs/batch_<timestamp>)")
+    parser.add_argument("--max-rounds", type=int, default=None, help="Maximum manager rounds per company")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Maximum total tokens per company")
+    parser.add_argument("--deadline", type=float, default=None, help="Wall-clock deadline in seconds per company")
+    args = parser.parse_args()
+
+    companies = read_companies(args.companies, args.file)
+    if not companies:
+        parser.error("no companies given")
+    batch_dir = args.output_dir or os.path.join(
+        "outputs", f"batch_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    budget_overrides = {
+        "max_rounds": args.max_rounds,
+        "max_tokens": args.max_tokens,
+        "deadline_seconds": args.deadline,
+    }
+
+    print(f"📦 Running {len(companies)} companies with {args.workers} workers into {batch_dir}")
+    results = run_batch(companies, batch_dir, max(1, args.workers), budget_overrides)
+    failed = [company for company, result in results.items() if result["status"] == "failed"]
+    print(f"📋 Summary: {os.path.join(batch_dir, SUMMARY_FILE_NAME)}")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
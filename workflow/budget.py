@@ -0,0 +1,236 @@
+"""Per-run budgets for the Magentic orchestration.
+
+This module bounds a financial analysis run by:
+- Manager rounds (progress ledger evaluations)
+- Total tokens used by the manager and the member agents
+- A wall-clock deadline
+
+When a budget is exhausted the manager stops delegating and prepares the
+best final answer it can from the conversation so far.
+"""
+
+import os
+import time
+from typing import Any
+
+from semantic_kernel.agents.orchestration.magentic import (
+    MagenticContext,
+    ProgressLedger,
+    ProgressLedgerItem,
+    StandardMagenticManager,
+)
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.contents import ChatMessageContent
+
+from workflow.prompt_profile import PromptAccounting
+from workflow.rate_limit import get_rate_limiter, throttling_retry_after
+
+
+def _env_number(name: str, cast: type) -> Any:
+    """Read an optional numeric budget from the environment."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return None
+    return cast(value)
+
+
+def usage_tokens(message: ChatMessageContent) -> int:
+    """Return the total tokens reported in a message's usage metadata, or 0."""
+    usage = (message.metadata or {}).get("usage")
+    if usage is None:
+        return 0
+    if isinstance(usage, dict):
+        total = usage.get("total_tokens")
+        if total is None:
+            total = (usage.get("prompt_tokens") or 0) + (usage.get("completion_tokens") or 0)
+        return int(total or 0)
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        total = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+    return int(total or 0)
+
+
+class RunBudget:
+    """
+    Track round, token and time usage for a single orchestration run.
+
+    Any limit left as None is unbounded.
+    """
+
+    def __init__(
+        self,
+        max_rounds: int | None = None,
+        max_tokens: int | None = None,
+        deadline_seconds: float | None = None,
+        grace_seconds: float = 60.0,
+    ):
+        self.max_rounds = max_rounds
+        self.max_tokens = max_tokens
+        self.deadline_seconds = deadline_seconds
+        # Extra time after the deadline for the manager to write the partial report
+        self.grace_seconds = grace_seconds
+        self.rounds_used = 0
+        self.tokens_used = 0
+        self.exhausted_reason: str | None = None
+        self._started_at = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> "RunBudget":
+        """Create a budget from the FA_MAX_ROUNDS, FA_MAX_TOKENS and FA_DEADLINE_SECONDS variables."""
+        grace_seconds = _env_number("FA_DEADLINE_GRACE_SECONDS", float)
+        return cls(
+            max_rounds=_env_number("FA_MAX_ROUNDS", int),
+            max_tokens=_env_number("FA_MAX_TOKENS", int),
+            deadline_seconds=_env_number("FA_DEADLINE_SECONDS", float),
+            grace_seconds=60.0 if grace_seconds is None else grace_seconds,
+        )
+
+    def start(self) -> None:
+        """Restart the wall clock, e.g. once agents have been initialized."""
+        self._started_at = time.monotonic()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self._started_at
+
+    def remaining_seconds(self) -> float | None:
+        """Seconds left before the deadline, or None when there is no deadline."""
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed_seconds)
+
+    def record_round(self) -> None:
+        self.rounds_used += 1
+
+    def record_usage(self, message: ChatMessageContent) -> None:
+        self.tokens_used += usage_tokens(message)
+
+    def check(self) -> str | None:
+        """
+        Check every limit and remember the first one that was hit.
+
+        Returns:
+            A human readable reason when the budget is exhausted, otherwise None
+        """
+        if self.exhausted_reason is not None:
+            return self.exhausted_reason
+        if self.max_rounds is not None and self.rounds_used >= self.max_rounds:
+            self.exhausted_reason = f"round budget of {self.max_rounds} reached"
+        elif self.max_tokens is not None and self.tokens_used >= self.max_tokens:
+            self.exhausted_reason = f"token budget of {self.max_tokens} reached ({self.tokens_used} used)"
+        elif self.deadline_seconds is not None and self.elapsed_seconds >= self.deadline_seconds:
+            self.exhausted_reason = f"deadline of {self.deadline_seconds:.0f}s reached"
+        return self.exhausted_reason
+
+    def to_dict(self) -> dict[str, Any]:
+        """Budget limits and usage, suitable for the run status."""
+        return {
+            "max_rounds": self.max_rounds,
+            "rounds_used": self.rounds_used,
+            "max_tokens": self.max_tokens,
+            "tokens_used": self.tokens_used,
+            "deadline_seconds": self.deadline_seconds,
+            "elapsed_seconds": round(self.elapsed_seconds, 1),
+            "exhausted": self.exhausted_reason is not None,
+            "exhausted_reason": self.exhausted_reason,
+        }
+
+
+def estimate_request_tokens(chat_history, settings) -> int:
+    """Rough size of a chat request: about 4 characters per prompt token plus the completion limit."""
+    prompt_chars = sum(len(message.content or "") for message in chat_history.messages)
+    return prompt_chars // 4 + (getattr(settings, "max_tokens", None) or 1000)
+
+
+class MeteredAzureChatCompletion(AzureChatCompletion):
+    """
+    Azure chat completion service that charges reported token usage to a run budget.
+
+    Every request goes through the process-wide rate limiter (see workflow.rate_limit),
+    and each call's prompt size is recorded as a "Manager" turn.
+    """
+
+    budget: RunBudget | None = None
+    prompt_accounting: PromptAccounting | None = None
+
+    async def get_chat_message_contents(self, chat_history, settings, **kwargs: Any) -> list[ChatMessageContent]:
+        limiter = get_rate_limiter()
+        lease = await limiter.acquire(estimate_request_tokens(chat_history, settings))
+        try:
+            results = await super().get_chat_message_contents(chat_history, settings, **kwargs)
+        except Exception as e:
+            limiter.release(lease, actual_tokens=0, retry_after=throttling_retry_after(e))
+            raise
+        limiter.release(lease, actual_tokens=sum(usage_tokens(result) for result in results))
+        if self.budget is not None:
+            for result in results:
+                self.budget.record_usage(result)
+        if self.prompt_accounting is not None:
+            for result in results:
+                self.prompt_accounting.record("Manager", (result.metadata or {}).get("usage"))
+        return results
+
+
+class BudgetedMagenticManager(StandardMagenticManager):
+    """
+    Standard Magentic manager that stops delegating once the run budget is exhausted.
+
+    Instead of asking for another agent turn, the progress ledger reports the
+    request as satisfied so the manager moves straight to the final answer,
+    built from whatever the agents have produced so far.
+    """
+
+    budget: RunBudget
+
+    async def create_progress_ledger(self, magentic_context: MagenticContext) -> ProgressLedger:
+        reason = self.budget.check()
+        if reason is None:
+            self.budget.record_round()
+            return await super().create_progress_ledger(magentic_context)
+
+        print(f"⚠️ Run budget exhausted: {reason}. Preparing partial report.")
+        stop = f"Run budget exhausted: {reason}"
+        return ProgressLedger(
+            is_request_satisfied=ProgressLedgerItem(reason=stop, answer=True),
+            is_in_loop=ProgressLedgerItem(reason=stop, answer=False),
+            is_progress_being_made=ProgressLedgerItem(reason=stop, answer=False),
+            next_speaker=ProgressLedgerItem(reason=stop, answer=""),
+            instruction_or_question=ProgressLedgerItem(reason=stop, answer=""),
+        )
+
+    async def prepare_final_answer(self, magentic_context: MagenticContext) -> ChatMessageContent:
+        if self.budget.exhausted_reason is not None:
+            magentic_context.task.content += (
+                "\n\nThe run budget is exhausted "
+                f"({self.budget.exhausted_reason}). Write the best partial report from the results "
+                "gathered so far and clearly list the analysis steps that were not completed."
+            )
+        return await super().prepare_final_answer(magentic_context)
+
+
+def build_partial_report(responses: list[ChatMessageContent], reason: str) -> str:
+    """
+    Assemble a partial report from agent responses when no final answer is available.
+
+    The latest non-empty response of each agent is kept, in the order the
+    agents first answered.
+
+    Args:
+        responses: Agent responses collected during the run
+        reason: Why the run stopped early
+
+    Returns:
+        Markdown text of the partial report
+    """
+    latest: dict[str, str] = {}
+    for message in responses:
+        content = (message.content or "").strip()
+        if content and content != "No relevant information found":
+            latest[message.name or "Agent"] = content
+
+    lines = [f"> ⚠️ Partial report: the run stopped early ({reason}).", ""]
+    if not latest:
+        lines.append("No agent results were produced before the run stopped.")
+    for name, content in latest.items():
+        lines.extend([f"#### {name}", content, ""])
+    return "\n".join(lines)
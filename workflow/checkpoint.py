@@ -0,0 +1,191 @@
+"""Checkpoint and resume support for long orchestration runs.
+
+The checkpoint lives in `<run dir>/checkpoint.json` and holds:
+- The company being analyzed
+- The output of every completed report stage (sector, formulas, ...)
+- The manager's task ledger (facts and plan)
+- The manager's chat history as of the latest round
+- The final result, once there is one
+
+A resumed run restores the completed stages, reuses the task ledger instead of
+planning again and hands the manager its previous conversation, so completed
+stages are not repeated.
+"""
+
+import datetime
+import json
+import os
+from typing import Any
+
+from semantic_kernel.agents.orchestration.magentic import MagenticContext, ProgressLedger, _TaskLedger
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from workflow.budget import BudgetedMagenticManager
+from workflow.history import HistoryPolicy
+from workflow.report_writer import SECTION_TITLES
+
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+
+
+def message_to_dict(message: ChatMessageContent) -> dict[str, Any]:
+    return {"role": message.role.value, "name": message.name, "content": message.content or ""}
+
+
+def message_from_dict(data: dict[str, Any]) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole(data["role"]), name=data.get("name"), content=data.get("content", ""))
+
+
+def resolve_run_dir(run: str, outputs_dir: str = "outputs") -> str:
+    """
+    Resolve a run given as a directory path or as a run name under the outputs directory.
+
+    Raises:
+        FileNotFoundError: If the run has no checkpoint
+    """
+    candidates = [run, os.path.join(outputs_dir, run)]
+    for candidate in candidates:
+        if os.path.exists(os.path.join(candidate, CHECKPOINT_FILE_NAME)):
+            return candidate
+    raise FileNotFoundError(f"No checkpoint found for run '{run}'")
+
+
+class RunCheckpoint:
+    """
+    Persistent state of a single orchestration run.
+
+    Args:
+        output_dir: Run directory that holds the checkpoint file
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CHECKPOINT_FILE_NAME)
+        self.company: str | None = None
+        self.stages: dict[str, list[str]] = {}
+        self.task_ledger: dict[str, str] | None = None
+        self.chat_history: list[dict[str, Any]] = []
+        self.final_result: str | None = None
+        self.updated_at: str | None = None
+
+    @classmethod
+    def load(cls, output_dir: str) -> "RunCheckpoint":
+        checkpoint = cls(output_dir)
+        with open(checkpoint.path, "r") as f:
+            data = json.load(f)
+        checkpoint.company = data.get("company")
+        checkpoint.stages = data.get("stages", {})
+        checkpoint.task_ledger = data.get("task_ledger")
+        checkpoint.chat_history = data.get("chat_history", [])
+        checkpoint.final_result = data.get("final_result")
+        checkpoint.updated_at = data.get("updated_at")
+        return checkpoint
+
+    def save(self) -> None:
+        """Write the checkpoint atomically so a crash never leaves it half written."""
+        self.updated_at = datetime.datetime.now().isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "company": self.company,
+                "stages": self.stages,
+                "task_ledger": self.task_ledger,
+                "chat_history": self.chat_history,
+                "final_result": self.final_result,
+                "updated_at": self.updated_at,
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def completed_stages(self) -> list[str]:
+        return [key for key in SECTION_TITLES if key in self.stages]
+
+    def record_stage(self, key: str, outputs: list[str]) -> None:
+        self.stages[key] = list(outputs)
+        self.save()
+
+    def record_task_ledger(self, facts: str, plan: str) -> None:
+        self.task_ledger = {"facts": facts, "plan": plan}
+        self.save()
+
+    def record_chat_history(self, messages: list[ChatMessageContent]) -> None:
+        self.chat_history = [message_to_dict(m) for m in messages]
+        self.save()
+
+    def record_final_result(self, value: Any) -> None:
+        self.final_result = str(value)
+        self.save()
+
+    def resume_note(self) -> str:
+        """Task addendum telling the manager which stages are already done."""
+        if not self.completed_stages:
+            return ""
+        lines = [
+            "",
+            "**Resumed run**",
+            "This run resumes an earlier run. The following stages are already completed and their results "
+            "are included below and in the conversation. Do NOT ask any agent to repeat them; continue from "
+            "the next stage that is not completed.",
+        ]
+        for key in self.completed_stages:
+            lines.append(f"\n### {SECTION_TITLES[key]} (completed)\n")
+            lines.append("\n\n".join(self.stages[key]))
+        return "\n".join(lines)
+
+
+class ResumableMagenticManager(BudgetedMagenticManager):
+    """
+    Budgeted Magentic manager that checkpoints its state and can resume from it.
+
+    The task ledger is saved after planning and reused on resume, and the chat
+    history is saved every round. A resumed manager sees the restored chat
+    history ahead of the new conversation.
+
+    With a history policy, the manager's prompts get a compacted copy of the
+    chat history while the checkpoint keeps the full one.
+    """
+
+    checkpoint: RunCheckpoint
+    restored_history: list[ChatMessageContent] = []
+    history_policy: HistoryPolicy | None = None
+
+    def _with_restored_history(self, magentic_context: MagenticContext) -> MagenticContext:
+        if self.restored_history:
+            live_messages = list(magentic_context.chat_history.messages)
+            magentic_context.chat_history.messages = [m.model_copy() for m in self.restored_history] + live_messages
+        return magentic_context
+
+    def _compacted(self, magentic_context: MagenticContext, summarize_older: bool = True) -> MagenticContext:
+        if self.history_policy is not None:
+            magentic_context.chat_history.messages = self.history_policy.compact(
+                magentic_context.chat_history.messages, summarize_older=summarize_older
+            )
+        return magentic_context
+
+    async def plan(self, magentic_context: MagenticContext) -> ChatMessageContent:
+        if self.checkpoint.task_ledger is not None:
+            print("♻️ Reusing task ledger from checkpoint")
+            self.task_ledger = _TaskLedger(
+                facts=ChatMessageContent(role=AuthorRole.ASSISTANT, content=self.checkpoint.task_ledger["facts"]),
+                plan=ChatMessageContent(role=AuthorRole.ASSISTANT, content=self.checkpoint.task_ledger["plan"]),
+            )
+            return await self._render_task_ledger(magentic_context)
+
+        task_ledger = await super().plan(magentic_context)
+        self.checkpoint.record_task_ledger(self.task_ledger.facts.content, self.task_ledger.plan.content)
+        return task_ledger
+
+    async def replan(self, magentic_context: MagenticContext) -> ChatMessageContent:
+        task_ledger = await super().replan(self._compacted(self._with_restored_history(magentic_context)))
+        self.checkpoint.record_task_ledger(self.task_ledger.facts.content, self.task_ledger.plan.content)
+        return task_ledger
+
+    async def create_progress_ledger(self, magentic_context: MagenticContext) -> ProgressLedger:
+        magentic_context = self._with_restored_history(magentic_context)
+        self.checkpoint.record_chat_history(magentic_context.chat_history.messages)
+        return await super().create_progress_ledger(self._compacted(magentic_context))
+
+    async def prepare_final_answer(self, magentic_context: MagenticContext) -> ChatMessageContent:
+        # The final answer sees every distinct result, only duplicates are dropped
+        magentic_context = self._compacted(self._with_restored_history(magentic_context), summarize_older=False)
+        return await super().prepare_final_answer(magentic_context)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Start-up Diagnostics.
+
+Reports where the import time of the entry points goes. Each module is
+imported in a fresh interpreter with `python -X importtime`, and the self
+time of every imported module is summed per subsystem (semantic_kernel,
+azure.ai.agents, numpy, ...), together with the wall-clock time of the cold
+import.
+
+Run from the repository root:
+    python -m workflow.diagnostics [modules...] [--top N] [--json]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["financial_analysis_workflow", "app"]
+
+# "import time:       412 |       1093 |     semantic_kernel.functions"
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def subsystem_of(module: str) -> str:
+    """Group a module under its top-level package (azure.* by SDK, e.g. azure.ai.agents)."""
+    parts = module.split(".")
+    if parts[0] == "azure" and len(parts) > 1:
+        return ".".join(parts[:3] if parts[1] == "ai" and len(parts) > 2 else parts[:2])
+    return parts[0]
+
+
+def parse_import_times(stderr: str) -> list[dict[str, Any]]:
+    """Parse `-X importtime` output into one record per imported module."""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            records.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": len(match.group(3)) // 2,
+            })
+    return records
+
+
+def import_profile(module: str, python: str = sys.executable) -> dict[str, Any]:
+    """
+    Import a module in a fresh interpreter and aggregate its import time per subsystem.
+
+    Returns:
+        Wall-clock seconds, total import time and per-subsystem self time
+        (microseconds) and module counts, largest first
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - started
+
+    records = parse_import_times(completed.stderr)
+    subsystems: dict[str, dict[str, int]] = {}
+    for record in records:
+        totals = subsystems.setdefault(subsystem_of(record["module"]), {"self_us": 0, "modules": 0})
+        totals["self_us"] += record["self_us"]
+        totals["modules"] += 1
+    error = None
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+    return {
+        "module": module,
+        "ok": completed.returncode == 0,
+        "error": error,
+        "wall_seconds": round(wall_seconds, 3),
+        "import_us": sum(record["self_us"] for record in records),
+        "modules": len(records),
+        "subsystems": dict(sorted(subsystems.items(), key=lambda item: item[1]["self_us"], reverse=True)),
+    }
+
+
+def format_profile(profile: dict[str, Any], top: int) -> str:
+    status = "✅" if profile["ok"] else f"❌ {profile['error']}"
+    lines = [
+        f"{status} import {profile['module']}: {profile['wall_seconds']:.2f}s wall, "
+        f"{profile['import_us'] / 1e6:.2f}s importing {profile['modules']} modules",
+        f"  {'subsystem':<32} {'self ms':>9} {'share':>6} {'modules':>8}",
+    ]
+    for name, totals in list(profile["subsystems"].items())[:top]:
+        share = totals["self_us"] / profile["import_us"] * 100 if profile["import_us"] else 0.0
+        lines.append(f"  {name:<32} {totals['self_us'] / 1000:>9.1f} {share:>5.1f}% {totals['modules']:>8}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report import time of the entry points per subsystem.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of subsystems to show per module")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    profiles = [import_profile(module) for module in args.modules]
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+    else:
+        print("\n\n".join(format_profile(profile, args.top) for profile in profiles))
+    if not all(profile["ok"] for profile in profiles):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
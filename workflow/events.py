@@ -0,0 +1,217 @@
+"""Typed in-process event bus for a workflow run.
+
+The orchestration callbacks, the member actors, the tool executor and the
+report writer publish structured events instead of printing. Subscribers
+decide what to do with them:
+- `ConsolePrinter` writes the human-readable run output to stdout (streamed
+  messages are printed once, not again when the final message arrives)
+- `JsonlEventWriter` appends events to `events.jsonl` in the run directory
+- `EventStreamWriter` writes events as JSON lines to a file descriptor;
+  app.py passes a pipe as FA_EVENT_FD and reads the events from it, instead
+  of parsing the run's log lines
+
+Handlers run synchronously in the publisher's thread and must be quick. A
+failing handler is reported and skipped, never fails the run.
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+from typing import Any, Callable, Iterable
+
+from workflow.report_writer import SECTION_READY_PREFIX
+
+AGENT_STARTED = "agent_started"
+TOKEN_DELTA = "token_delta"
+MESSAGE_FINAL = "message_final"
+TOOL_CALL = "tool_call"
+STAGE_DONE = "stage_done"
+RUN_STATUS = "run_status"
+
+# Fields every event of a type carries
+EVENT_FIELDS = {
+    AGENT_STARTED: ("agent",),
+    TOKEN_DELTA: ("agent", "content"),
+    MESSAGE_FINAL: ("agent", "content", "streamed", "prompt_tokens", "completion_tokens"),
+    TOOL_CALL: ("function", "status", "latency_ms", "offloaded"),
+    STAGE_DONE: ("stage", "title"),
+    RUN_STATUS: ("status", "budget"),
+}
+
+# Events written to files and streams; token deltas only go to the console,
+# the final message carries the full text
+RECORDED_EVENTS = tuple(event_type for event_type in EVENT_FIELDS if event_type != TOKEN_DELTA)
+
+EVENTS_FILE_NAME = "events.jsonl"
+
+# Prefix of the budget usage line printed at the end of a run
+BUDGET_USAGE_PREFIX = "📊 Budget usage: "
+
+
+class WorkflowEvent:
+    """An event published on the bus, numbered in publishing order."""
+
+    __slots__ = ("type", "seq", "time", "data")
+
+    def __init__(self, type: str, seq: int, time: str, data: dict[str, Any]):
+        self.type = type
+        self.seq = seq
+        self.time = time
+        self.data = data
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"type": self.type, "seq": self.seq, "time": self.time, **self.data}
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "WorkflowEvent":
+        data = {key: item for key, item in value.items() if key not in ("type", "seq", "time")}
+        return cls(value["type"], value["seq"], value["time"], data)
+
+
+class EventBus:
+    """Publishes typed workflow events to the subscribed handlers."""
+
+    def __init__(self):
+        self._handlers: list[tuple[Callable[[WorkflowEvent], None], frozenset[str] | None]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[WorkflowEvent], None], types: Iterable[str] | None = None) -> Callable[[], None]:
+        """
+        Call a handler for every event, or only for the given event types.
+
+        Returns:
+            A function that unsubscribes the handler
+        """
+        entry = (handler, frozenset(types) if types is not None else None)
+        with self._lock:
+            self._handlers.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._handlers:
+                    self._handlers.remove(entry)
+
+        return unsubscribe
+
+    def publish(self, type: str, **data: Any) -> WorkflowEvent:
+        """
+        Publish an event.
+
+        Raises:
+            ValueError: If the type is unknown or a field of the type is missing
+        """
+        if type not in EVENT_FIELDS:
+            raise ValueError(f"Unknown event type '{type}'")
+        missing = [field for field in EVENT_FIELDS[type] if field not in data]
+        if missing:
+            raise ValueError(f"Event '{type}' is missing: {', '.join(missing)}")
+        with self._lock:
+            self._seq += 1
+            event = WorkflowEvent(type, self._seq, datetime.datetime.now().isoformat(timespec="milliseconds"), data)
+            handlers = list(self._handlers)
+        for handler, types in handlers:
+            if types is None or type in types:
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"⚠️ Event handler {getattr(handler, '__name__', handler.__class__.__name__)} failed: {e}")
+        return event
+
+
+class ConsolePrinter:
+    """Prints the run's events as readable output."""
+
+    def __init__(self, stream: Any = None):
+        self.stream = stream or sys.stdout
+        self._streaming: str | None = None
+
+    def _print(self, text: str = "", end: str = "\n") -> None:
+        print(text, end=end, file=self.stream, flush=True)
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        data = event.data
+        if event.type == AGENT_STARTED:
+            self._end_stream()
+            self._print(f"# {data['agent']}")
+            self._streaming = data["agent"]
+        elif event.type == TOKEN_DELTA:
+            if self._streaming != data["agent"]:
+                self._end_stream()
+                self._print(f"# {data['agent']}")
+                self._streaming = data["agent"]
+            self._print(data["content"], end="")
+        elif event.type == MESSAGE_FINAL:
+            self._end_stream()
+            # Streamed content has been printed already
+            if not data["streamed"]:
+                self._print(f"**{data['agent']}**\n{data['content']}")
+        elif event.type == TOOL_CALL:
+            self._print(f"🔧 Tool call {data['function']} {data['status']} in {data['latency_ms']:.0f} ms")
+        elif event.type == STAGE_DONE:
+            self._print(f"{SECTION_READY_PREFIX}{data['title']}")
+        elif event.type == RUN_STATUS:
+            self._print(f"{BUDGET_USAGE_PREFIX}{json.dumps(data['budget'])}")
+
+    def _end_stream(self) -> None:
+        if self._streaming is not None:
+            self._print()
+            self._streaming = None
+
+
+class JsonlEventWriter:
+    """
+    Appends events to a JSON lines file.
+
+    Args:
+        path: The events file
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        line = json.dumps(event.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class EventStreamWriter(JsonlEventWriter):
+    """Writes events as JSON lines to an inherited file descriptor (e.g. a pipe from app.py)."""
+
+    def __init__(self, fd: int):
+        self.path = f"fd:{fd}"
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "EventStreamWriter | None":
+        fd = os.environ.get("FA_EVENT_FD", "").strip()
+        return cls(int(fd)) if fd else None
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        try:
+            super().__call__(event)
+        except (BrokenPipeError, ValueError):
+            # The reader went away; the run carries on without the stream
+            pass
+
+
+def read_events(lines: Iterable[str]) -> Iterable[WorkflowEvent]:
+    """Parse events from JSON lines, skipping lines that are not events."""
+    for line in lines:
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict) and value.get("type") in EVENT_FIELDS:
+            yield WorkflowEvent.from_dict(value)
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Fake LLM and Agent Service.
+
+A local stand-in for the Azure OpenAI chat completion endpoint (used by the
+Magentic manager) and the Azure AI Agents endpoints (used by the member
+agents), so the workflow and the web app can be load tested with many
+concurrent runs without touching real quotas:
+- Scripted responses: the manager's progress ledger walks through a list of
+  speakers and then finishes, and every agent answers from its own list of
+  replies (see DEFAULT_SCENARIO, or pass --scenario with a JSON file)
+- Latency: time to first token is log-normally distributed around
+  --latency-ms, and responses stream at about --tokens-per-second
+- Faults: --throttle-rate of model requests get a 429 with Retry-After,
+  --error-rate get a 500
+- GET /stats reports request, fault, concurrency and token counters
+
+Run from the repository root:
+    python -m workflow.fake_service --port 8090 --latency-ms 800 --throttle-rate 0.05
+
+and point the workflow (or the web app, whose runs inherit the variable) at it:
+    FA_FAKE_SERVICE_URL=http://localhost:8090 python financial_analysis_workflow.py
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any
+
+from aiohttp import web
+
+DEFAULT_PORT = 8090
+PROJECT_PATH = "/api/projects/fake"
+STEP_MARKER = re.compile(r"\[step (\d+)\]")
+
+DEFAULT_SCENARIO: dict[str, Any] = {
+    # Agents the workflow fetches by id instead of creating them
+    "agent_ids": {
+        "asst_V6udTBrczM71JlmWE0MzblsY": "Metric_Retrieval_Analyst",
+        "asst_62cjkb6GOd6ryvTcFtlcM3EQ": "Formula_Provider",
+        "asst_SboKcNFaQnkxS6k6mDj3GcGT": "YoY_Analyst",
+    },
+    # Speakers the manager's progress ledger selects, in order, before finishing
+    "speakers": [
+        "RAG_Agent", "Formula_Provider", "Metric_Retrieval_Analyst", "Calculation_Agent",
+        "Metric_Retrieval_Analyst", "YoY_Analyst", "RAG_Agent", "Report_formating_agent",
+    ],
+    # Replies per agent, used in turn
+    "responses": {
+        "RAG_Agent": [
+            "The company operates in the Retail sector.",
+            "Revenue grew on higher volumes and pricing; operating profit rose on cost savings; "
+            "net debt fell as lease liabilities were repaid.",
+        ],
+        "Formula_Provider": [
+            "Gross Margin = Gross Profit / Revenue\nOperating Margin = Operating Income (EBIT) / Revenue\n"
+            "Inventory Turnover = COGS / Average Inventory",
+        ],
+        "Metric_Retrieval_Analyst": [
+            '{"company": "Tesco", "year": "2024", "financial_metrics": {"Revenue": "68187", '
+            '"Gross Profit": "5012", "Operating Income (EBIT)": "2821", "COGS": "63175", "Inventory": "2536"}}',
+        ],
+        "Calculation_Agent": [
+            '{"results": {"Gross Margin": 0.0735, "Operating Margin": 0.0414, "Inventory Turnover": 24.91}}',
+        ],
+        "YoY_Analyst": [
+            '{"Revenue": {"2023": 65322, "2024": 68187, "YoY_Growth_Pct": 4.39}, '
+            '"Operating Income (EBIT)": {"2023": 1889, "2024": 2821, "YoY_Growth_Pct": 49.34}}',
+        ],
+        "Report_formating_agent": [
+            "### **Financial Report: 52 Weeks Ended 24 February 2024 (FY24)**\n**Currency: Million GBP (GBP'm)**\n\n"
+            "### **1. Revenue & Profitability**\n\n| Metric | FY23 | FY24 | YoY Δ |\n| --- | --- | --- | --- |\n"
+            "| Sales Revenue | 65,322 | 68,187 | +4.4% |\n| Operating Profit | 1,889 | 2,821 | +49.3% |",
+        ],
+    },
+    "default_response": "Done.",
+    "final_answer": "## Financial Analysis Report\n\nRevenue grew 4.4% to GBP 68.2bn and operating profit rose 49.3%, "
+                    "driven by volume growth and cost savings.",
+}
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def text_chunks(text: str) -> list[str]:
+    """Words with their trailing whitespace, so the chunks join back to the text."""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _content_text(content: Any) -> str:
+    """Text of an OpenAI or Agents message content (a string or a list of parts)."""
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        if isinstance(part, dict):
+            text = part.get("text")
+            parts.append(text.get("value", "") if isinstance(text, dict) else str(text or ""))
+    return "".join(parts)
+
+
+class FakeService:
+    """
+    Scripted stand-in for the chat completion and agent endpoints.
+
+    Args:
+        scenario: Speakers, replies and agent ids (see DEFAULT_SCENARIO)
+        latency_ms: Median time to first token
+        latency_sigma: Spread of the log-normal time to first token
+        tokens_per_second: Mean streaming rate of responses
+        throttle_rate: Share of model requests answered with 429
+        error_rate: Share of model requests answered with 500
+        retry_after: Retry-After seconds of the 429 responses
+        seed: Random seed, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        scenario: dict[str, Any] | None = None,
+        latency_ms: float = 500.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 80.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 2.0,
+        seed: int | None = None,
+    ):
+        self.scenario = {**DEFAULT_SCENARIO, **(scenario or {})}
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.agents: dict[str, dict[str, Any]] = {}
+        self.threads: dict[str, list[dict[str, Any]]] = {}
+        self.runs: dict[str, dict[str, Any]] = {}
+        # Turn of every agent in every thread, so each run walks through its own script
+        self.replies: dict[tuple[str, str], int] = {}
+        self.counters = {
+            "requests": 0, "chat_completions": 0, "runs": 0, "throttled": 0, "errors": 0,
+            "in_flight": 0, "max_in_flight": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    # region behaviour
+
+    def first_token_delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.random.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+    def chunk_delay(self, chunk: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        rate = max(1.0, self.random.gauss(self.tokens_per_second, self.tokens_per_second * 0.2))
+        return count_tokens(chunk) / rate
+
+    def fault(self) -> web.Response | None:
+        """A 429 or 500 response for the configured share of model requests, else None."""
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            self.counters["throttled"] += 1
+            return web.json_response(
+                {"error": {"code": "429", "message": f"Rate limit is exceeded. Try again in {self.retry_after:g} seconds."}},
+                status=429,
+                headers={"Retry-After": f"{self.retry_after:g}", "retry-after-ms": str(int(self.retry_after * 1000))},
+            )
+        if roll < self.throttle_rate + self.error_rate:
+            self.counters["errors"] += 1
+            return web.json_response({"error": {"code": "InternalServerError", "message": "Injected error"}}, status=500)
+        return None
+
+    def agent_reply(self, thread_id: str, name: str) -> str:
+        replies = self.scenario["responses"].get(name) or [self.scenario["default_response"]]
+        turn = self.replies.get((thread_id, name), 0)
+        self.replies[(thread_id, name)] = turn + 1
+        return replies[turn % len(replies)]
+
+    def manager_reply(self, messages: list[dict[str, Any]], response_format: Any) -> str:
+        """Progress ledger JSON, or plain text for the task ledger and the final answer."""
+        texts = [_content_text(message.get("content")) for message in messages]
+        schema_name = (response_format or {}).get("json_schema", {}).get("name") if isinstance(response_format, dict) else None
+        if schema_name == "ProgressLedger":
+            # The step number travels in the manager's own instructions, so it survives history compaction
+            step = max((int(n) for text in texts for n in STEP_MARKER.findall(text)), default=0) + 1
+            prompt = texts[-1] if texts else ""
+            speakers = [s for s in self.scenario["speakers"] if s in prompt] or self.scenario["speakers"]
+            done = step > len(speakers)
+            speaker = "" if done else speakers[step - 1]
+
+            def item(answer: Any) -> dict[str, Any]:
+                return {"reason": "Scripted by the fake service", "answer": answer}
+
+            return json.dumps({
+                "is_request_satisfied": item(done),
+                "is_in_loop": item(False),
+                "is_progress_being_made": item(True),
+                "next_speaker": item(speaker),
+                "instruction_or_question": item("" if done else f"[step {step}] {speaker}, please complete your part of the task."),
+            })
+        if texts and "provide the final answer" in texts[-1]:
+            return self.scenario["final_answer"]
+        return "Facts: the task is a financial analysis of the company.\nPlan: collect sector, formulas, metrics and YoY results, then format the report."
+
+    # endregion
+
+    # region chat completions
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.counters["requests"] += 1
+        self.counters["chat_completions"] += 1
+        self.counters["in_flight"] += 1
+        self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+        try:
+            body = await request.json()
+            if (fault := self.fault()) is not None:
+                return fault
+            messages = body.get("messages", [])
+            text = self.manager_reply(messages, body.get("response_format"))
+            usage = {
+                "prompt_tokens": sum(count_tokens(_content_text(m.get("content"))) for m in messages),
+                "completion_tokens": count_tokens(text),
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            self.counters["prompt_tokens"] += usage["prompt_tokens"]
+            self.counters["completion_tokens"] += usage["completion_tokens"]
+            completion_id = _new_id("chatcmpl")
+            model = request.match_info.get("deployment", body.get("model", "fake"))
+            await asyncio.sleep(self.first_token_delay())
+
+            if not body.get("stream"):
+                await asyncio.sleep(sum(self.chunk_delay(chunk) for chunk in text_chunks(text)))
+                return web.json_response({
+                    "id": completion_id, "object": "chat.completion", "created": _now(), "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": usage,
+                })
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+
+            async def send(delta: dict[str, Any], finish_reason: str | None = None, **extra: Any) -> None:
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": _now(), "model": model,
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+            await send({"role": "assistant", "content": ""})
+            for chunk in text_chunks(text):
+                await asyncio.sleep(self.chunk_delay(chunk))
+                await send({"content": chunk})
+            await send({}, "stop", usage=usage if (body.get("stream_options") or {}).get("include_usage") else None)
+            await response.write(b"data: [DONE]\n\n")
+            return response
+        finally:
+            self.counters["in_flight"] -= 1
+
+    # endregion
+
+    # region agents
+
+    def agent_object(self, agent_id: str) -> dict[str, Any]:
+        if agent_id not in self.agents:
+            name = self.scenario["agent_ids"].get(agent_id, agent_id)
+            self.agents[agent_id] = {"id": agent_id, "object": "assistant", "created_at": _now(), "name": name,
+                                     "description": None, "model": "fake", "instructions": "", "tools": [],
+                                     "tool_resources": {}, "metadata": {}, "temperature": 0.1, "top_p": 1.0}
+        return self.agents[agent_id]
+
+    async def create_agent(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        agent = self.agent_object(_new_id("asst"))
+        agent.update({key: value for key, value in body.items() if key in agent and value is not None})
+        return web.json_response(agent)
+
+    async def get_agent(self, request: web.Request) -> web.Response:
+        return web.json_response(self.agent_object(request.match_info["agent_id"]))
+
+    async def delete_agent(self, request: web.Request) -> web.Response:
+        agent_id = request.match_info["agent_id"]
+        self.agents.pop(agent_id, None)
+        return web.json_response({"id": agent_id, "object": "assistant.deleted", "deleted": True})
+
+    async def create_thread(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else {}
+        thread_id = _new_id("thread")
+        self.threads[thread_id] = []
+        for message in body.get("messages") or []:
+            self.add_message(thread_id, message.get("role", "user"), _content_text(message.get("content")))
+        return web.json_response({"id": thread_id, "object": "thread", "created_at": _now(),
+                                  "metadata": body.get("metadata") or {}, "tool_resources": {}})
+
+    async def delete_thread(self, request: web.Request) -> web.Response:
+        thread_id = request.match_info["thread_id"]
+        self.threads.pop(thread_id, None)
+        for key in [key for key in self.replies if key[0] == thread_id]:
+            del self.replies[key]
+        return web.json_response({"id": thread_id, "object": "thread.deleted", "deleted": True})
+
+    def add_message(self, thread_id: str, role: str, text: str, **fields: Any) -> dict[str, Any]:
+        message = {
+            "id": _new_id("msg"), "object": "thread.message", "created_at": _now(), "thread_id": thread_id,
+            "status": "completed", "role": role, "attachments": [], "metadata": {},
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "assistant_id": None, "run_id": None, "incomplete_details": None, "completed_at": _now(),
+            "incomplete_at": None, **fields,
+        }
+        self.threads.setdefault(thread_id, []).append(message)
+        return message
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        thread_id = request.match_info["thread_id"]
+        return web.json_response(self.add_message(thread_id, body.get("role", "user"), _content_text(body.get("content"))))
+
+    async def list_messages(self, request: web.Request) -> web.Response:
+        messages = self.threads.get(request.match_info["thread_id"], [])
+        if request.query.get("order", "desc") == "desc":
+            messages = list(reversed(messages))
+        # The SDK pages with after=<last_id> until a page comes back empty
+        after = request.query.get("after")
+        if after:
+            ids = [message["id"] for message in messages]
+            messages = messages[ids.index(after) + 1:] if after in ids else []
+        page = messages[:int(request.query.get("limit", 20))]
+        return web.json_response({"object": "list", "data": page, "has_more": len(messages) > len(page),
+                                  "first_id": page[0]["id"] if page else None,
+                                  "last_id": page[-1]["id"] if page else None})
+
+    async def get_message(self, request: web.Request) -> web.Response:
+        for message in self.threads.get(request.match_info["thread_id"], []):
+            if message["id"] == request.match_info["message_id"]:
+                return web.json_response(message)
+        return web.json_response({"error": {"code": "NotFound", "message": "Message not found"}}, status=404)
+
+    async def get_run(self, request: web.Request) -> web.Response:
+        run = self.runs.get(request.match_info["run_id"])
+        if run is None:
+            return web.json_response({"error": {"code": "NotFound", "message": "Run not found"}}, status=404)
+        return web.json_response(run)
+
+    async def create_run(self, request: web.Request) -> web.StreamResponse:
+        self.counters["requests"] += 1
+        self.counters["runs"] += 1
+        self.counters["in_flight"] += 1
+        self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+        try:
+            body = await request.json()
+            if (fault := self.fault()) is not None:
+                return fault
+            thread_id = request.match_info["thread_id"]
+            for message in body.get("additional_messages") or []:
+                self.add_message(thread_id, message.get("role", "user"), _content_text(message.get("content")))
+            return await self.execute_run(request, thread_id, body)
+        finally:
+            self.counters["in_flight"] -= 1
+
+    async def execute_run(self, request: web.Request, thread_id: str, body: dict[str, Any]) -> web.StreamResponse:
+        agent = self.agent_object(body.get("assistant_id", ""))
+        history = self.threads.get(thread_id, [])
+        truncation = body.get("truncation_strategy") or {}
+        if truncation.get("type") == "last_messages" and truncation.get("last_messages"):
+            history = history[-truncation["last_messages"]:]
+        text = self.agent_reply(thread_id, agent["name"])
+        usage = {
+            "prompt_tokens": count_tokens(body.get("instructions") or agent["instructions"] or "")
+                             + sum(count_tokens(_content_text(m["content"])) for m in history),
+            "completion_tokens": count_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self.counters["prompt_tokens"] += usage["prompt_tokens"]
+        self.counters["completion_tokens"] += usage["completion_tokens"]
+
+        run = {
+            "id": _new_id("run"), "object": "thread.run", "created_at": _now(), "thread_id": thread_id,
+            "assistant_id": agent["id"], "status": "queued", "model": agent["model"],
+            "instructions": body.get("instructions") or agent["instructions"], "tools": [], "metadata": {},
+            "required_action": None, "last_error": None, "usage": None, "incomplete_details": None,
+            "truncation_strategy": truncation or None, "parallel_tool_calls": True,
+        }
+        self.runs[run["id"]] = run
+        message_id = _new_id("msg")
+        step = {
+            "id": _new_id("step"), "object": "thread.run.step", "type": "message_creation", "created_at": _now(),
+            "assistant_id": agent["id"], "thread_id": thread_id, "run_id": run["id"], "status": "completed",
+            "step_details": {"type": "message_creation", "message_creation": {"message_id": message_id}},
+            "usage": usage, "last_error": None,
+        }
+
+        def finish() -> dict[str, Any]:
+            message = self.add_message(thread_id, "assistant", text, assistant_id=agent["id"], run_id=run["id"])
+            message["id"] = message_id
+            run.update(status="completed", completed_at=_now(), usage=usage)
+            return message
+
+        await asyncio.sleep(self.first_token_delay())
+        if not body.get("stream"):
+            await asyncio.sleep(sum(self.chunk_delay(chunk) for chunk in text_chunks(text)))
+            finish()
+            return web.json_response(run)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(event: str, data: Any) -> None:
+            payload = data if isinstance(data, str) else json.dumps(data)
+            await response.write(f"event: {event}\ndata: {payload}\n\n".encode())
+
+        await send("thread.run.created", run)
+        run["status"] = "in_progress"
+        await send("thread.run.in_progress", run)
+        in_progress = {"id": message_id, "object": "thread.message", "created_at": _now(), "thread_id": thread_id,
+                       "status": "in_progress", "role": "assistant", "content": [], "assistant_id": agent["id"],
+                       "run_id": run["id"], "attachments": [], "metadata": {}}
+        await send("thread.message.created", in_progress)
+        for chunk in text_chunks(text):
+            await asyncio.sleep(self.chunk_delay(chunk))
+            await send("thread.message.delta", {
+                "id": message_id, "object": "thread.message.delta",
+                "delta": {"role": "assistant", "content": [{"index": 0, "type": "text", "text": {"value": chunk}}]},
+            })
+        await send("thread.message.completed", finish())
+        await send("thread.run.step.completed", step)
+        await send("thread.run.completed", run)
+        await send("done", "[DONE]")
+        return response
+
+    # endregion
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.counters, "threads": len(self.threads), "agents": len(self.agents)})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        project = "/api/projects/{project}"
+        app.add_routes([
+            web.post("/openai/deployments/{deployment}/chat/completions", self.chat_completions),
+            web.post(f"{project}/assistants", self.create_agent),
+            web.get(f"{project}/assistants/{{agent_id}}", self.get_agent),
+            web.delete(f"{project}/assistants/{{agent_id}}", self.delete_agent),
+            web.post(f"{project}/threads", self.create_thread),
+            web.delete(f"{project}/threads/{{thread_id}}", self.delete_thread),
+            web.post(f"{project}/threads/{{thread_id}}/messages", self.create_message),
+            web.get(f"{project}/threads/{{thread_id}}/messages", self.list_messages),
+            web.get(f"{project}/threads/{{thread_id}}/messages/{{message_id}}", self.get_message),
+            web.post(f"{project}/threads/{{thread_id}}/runs", self.create_run),
+            web.get(f"{project}/threads/{{thread_id}}/runs/{{run_id}}", self.get_run),
+            web.get("/stats", self.stats),
+        ])
+        return app
+
+
+class FakeCredential:
+    """Async token credential that hands out a static token, for the fake service."""
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> Any:
+        from azure.core.credentials import AccessToken
+
+        return AccessToken("fake-token", _now() + 3600)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "FakeCredential":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+def agents_client_options(service_url: str) -> dict[str, Any]:
+    """
+    Arguments for `AzureAIAgent.create_client` that point the agents client at the fake service.
+
+    The service runs on plain http, which the bearer token policy rejects, so
+    the credential is paired with a no-op authentication policy.
+    """
+    from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+    return {
+        "credential": FakeCredential(),
+        "endpoint": service_url.rstrip("/") + PROJECT_PATH,
+        "authentication_policy": SansIOHTTPPolicy(),
+    }
+
+
+def chat_completion_options(service_url: str, deployment_name: str) -> dict[str, Any]:
+    """Arguments for `AzureChatCompletion` that point it at the fake service (base_url, since endpoint must be https)."""
+    return {
+        "deployment_name": deployment_name,
+        "base_url": f"{service_url.rstrip('/')}/openai/deployments/{deployment_name}",
+        "api_key": "fake-key",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local fake Azure OpenAI and Azure AI Agents service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--scenario", default=None, help="JSON file overriding the default scenario")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Median time to first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread of the log-normal latency")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="Mean streaming rate (0 for instant)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of model requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of model requests answered with 500")
+    parser.add_argument("--retry-after", type=float, default=2.0, help="Retry-After seconds of 429 responses")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    scenario = None
+    if args.scenario:
+        with open(args.scenario, "r", encoding="utf-8") as f:
+            scenario = json.load(f)
+    service = FakeService(
+        scenario=scenario,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"🧪 Fake service on http://{args.host}:{args.port} "
+          f"(set FA_FAKE_SERVICE_URL=http://{args.host}:{args.port}), stats at /stats")
+    web.run_app(service.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
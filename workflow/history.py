@@ -0,0 +1,268 @@
+"""Bounded chat history for the Magentic orchestration.
+
+The shared conversation keeps every agent response, and agents often repeat
+the same output (e.g. the sector lookup) in later rounds, so every round
+re-sends an ever-growing history. `HistoryPolicy` keeps it bounded:
+- Duplicate agent responses are dropped, keeping the latest one
+- When the history exceeds FA_HISTORY_MAX_TOKENS, everything but the task
+  ledger and the most recent messages is folded into one summary message
+  (the manager's earlier instructions and each agent's latest result)
+- Members only receive messages their thread has not seen yet, and their
+  runs only read the last FA_MEMBER_HISTORY_MESSAGES thread messages
+
+The manager's full history is still checkpointed; only the prompts are
+compacted. The summary is built from the messages themselves, without extra
+model calls.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any
+
+from semantic_kernel.agents import Agent, AzureAIAgent
+from semantic_kernel.agents.orchestration.magentic import MagenticAgentActor, MagenticOrchestration, MagenticResetMessage
+from semantic_kernel.agents.runtime.core.message_context import MessageContext
+from semantic_kernel.agents.runtime.core.routed_agent import message_handler
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from workflow.events import AGENT_STARTED
+from workflow.prompt_profile import count_tokens
+
+DEFAULT_MAX_TOKENS = 24000
+DEFAULT_KEEP_RECENT = 6
+DEFAULT_MEMBER_MESSAGES = 12
+SUMMARY_ENTRY_CHARS = 1200
+INSTRUCTION_CHARS = 200
+MANAGER_NAME = "MagenticManagerActor"
+TRANSFER_PREFIX = "Transferred to "
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else default
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = text.strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + " …"
+
+
+def fingerprint(message: ChatMessageContent) -> tuple[str, str]:
+    """Author and whitespace-normalized content of a message."""
+    return message.name or str(message.role), re.sub(r"\s+", " ", message.content or "").strip()
+
+
+def is_agent_response(message: ChatMessageContent) -> bool:
+    return message.role == AuthorRole.ASSISTANT and message.name not in (None, MANAGER_NAME)
+
+
+def message_tokens(messages: list[ChatMessageContent]) -> int:
+    return sum(count_tokens(message.content or "") for message in messages)
+
+
+def drop_duplicates(messages: list[ChatMessageContent]) -> list[ChatMessageContent]:
+    """
+    Drop agent responses that repeat a later response of the same agent.
+
+    The "Transferred to <agent>" marker in front of a dropped response is
+    dropped with it. Manager messages are kept, so loops stay visible.
+    """
+    seen: set[tuple[str, str]] = set()
+    kept: list[ChatMessageContent] = []
+    skip_transfer = False
+    for message in reversed(messages):
+        if skip_transfer and message.role == AuthorRole.USER and (message.content or "").startswith(TRANSFER_PREFIX):
+            skip_transfer = False
+            continue
+        skip_transfer = False
+        if is_agent_response(message):
+            key = fingerprint(message)
+            if key in seen:
+                skip_transfer = True
+                continue
+            seen.add(key)
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+def summarize(messages: list[ChatMessageContent]) -> ChatMessageContent:
+    """Fold messages into one summary: the manager's instructions and each agent's latest result."""
+    instructions = [
+        _truncate(message.content or "", INSTRUCTION_CHARS)
+        for message in messages
+        if message.role == AuthorRole.ASSISTANT and message.name == MANAGER_NAME and message.content
+    ]
+    latest: dict[str, str] = {}
+    for message in messages:
+        if is_agent_response(message) and (message.content or "").strip():
+            latest.pop(message.name, None)
+            latest[message.name] = message.content
+    lines = [f"Summary of {len(messages)} earlier messages."]
+    if instructions:
+        lines.append("Earlier manager instructions:")
+        lines.extend(f"- {instruction}" for instruction in instructions)
+    if latest:
+        lines.append("Latest results by agent:")
+        for name, content in latest.items():
+            lines.extend([f"### {name}", _truncate(content, SUMMARY_ENTRY_CHARS)])
+    return ChatMessageContent(role=AuthorRole.USER, content="\n".join(lines))
+
+
+class HistoryPolicy:
+    """
+    Keep the conversation sent to the model within a token limit.
+
+    Args:
+        max_tokens: Token limit of the manager's chat history (0 for no limit)
+        keep_recent: Most recent messages that are always kept verbatim
+        member_messages: Thread messages a member's run reads (0 for all)
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        keep_recent: int = DEFAULT_KEEP_RECENT,
+        member_messages: int = DEFAULT_MEMBER_MESSAGES,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_recent = max(1, keep_recent)
+        self.member_messages = member_messages
+        self.compactions = 0
+        self.member_duplicates_dropped = 0
+        self.last_duplicates_dropped = 0
+        self.last_messages_summarized = 0
+        self.last_tokens_before = 0
+        self.last_tokens_after = 0
+        self.max_tokens_after = 0
+
+    @classmethod
+    def from_env(cls) -> "HistoryPolicy":
+        return cls(
+            max_tokens=_env_int("FA_HISTORY_MAX_TOKENS", DEFAULT_MAX_TOKENS),
+            keep_recent=_env_int("FA_HISTORY_KEEP_RECENT", DEFAULT_KEEP_RECENT),
+            member_messages=_env_int("FA_MEMBER_HISTORY_MESSAGES", DEFAULT_MEMBER_MESSAGES),
+        )
+
+    def compact(self, messages: list[ChatMessageContent], summarize_older: bool = True) -> list[ChatMessageContent]:
+        """
+        Compact a chat history for the manager's next prompt.
+
+        Args:
+            messages: The full chat history, task ledger first
+            summarize_older: Fold older messages into a summary when over the limit;
+                when False only duplicates are dropped (e.g. for the final answer)
+
+        Returns:
+            The messages to send
+        """
+        tokens_before = message_tokens(messages)
+        compacted = drop_duplicates(messages)
+        self.last_duplicates_dropped = len(messages) - len(compacted)
+        self.last_messages_summarized = 0
+
+        if summarize_older and self.max_tokens and message_tokens(compacted) > self.max_tokens:
+            pinned, rest = compacted[:1], compacted[1:]
+            older, recent = rest[:-self.keep_recent], rest[-self.keep_recent:]
+            # Move recent messages into the summary until it fits, always keeping the last one
+            while len(recent) > 1 and message_tokens(pinned + [summarize(older)] + recent) > self.max_tokens:
+                older.append(recent.pop(0))
+            if older:
+                self.last_messages_summarized = len(older)
+                compacted = pinned + [summarize(older)] + recent
+
+        self.compactions += 1
+        self.last_tokens_before = tokens_before
+        self.last_tokens_after = message_tokens(compacted)
+        self.max_tokens_after = max(self.max_tokens_after, self.last_tokens_after)
+        return compacted
+
+    def member_run_options(self, agent: Agent) -> dict[str, Any]:
+        """Run options that bound how much of its thread a member reads."""
+        if not self.member_messages or not isinstance(agent, AzureAIAgent):
+            return {}
+        from azure.ai.agents.models import TruncationObject
+
+        return {"truncation_strategy": TruncationObject(type="last_messages", last_messages=self.member_messages)}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_tokens": self.max_tokens,
+            "compactions": self.compactions,
+            "last_duplicates_dropped": self.last_duplicates_dropped,
+            "last_messages_summarized": self.last_messages_summarized,
+            "last_tokens_before": self.last_tokens_before,
+            "last_tokens_after": self.last_tokens_after,
+            "max_tokens_after": self.max_tokens_after,
+            "member_duplicates_dropped": self.member_duplicates_dropped,
+        }
+
+
+class BoundedMagenticAgentActor(MagenticAgentActor):
+    """Member actor that only forwards unseen messages to its agent's thread and bounds its runs."""
+
+    def __init__(self, agent: Agent, *args: Any, history_policy: HistoryPolicy, event_bus: Any = None, **kwargs: Any):
+        super().__init__(agent, *args, **kwargs)
+        self._history_policy = history_policy
+        self._event_bus = event_bus
+        self._sent: set[tuple[str, str]] = set()
+
+    def _create_messages(self, additional_messages: Any = None) -> list[ChatMessageContent]:
+        messages = super()._create_messages(additional_messages)
+        unseen = []
+        for i, message in enumerate(messages):
+            key = fingerprint(message)
+            # The last message is the manager's request to this agent and is always sent
+            if is_agent_response(message) and key in self._sent and i < len(messages) - 1:
+                self._history_policy.member_duplicates_dropped += 1
+                continue
+            self._sent.add(key)
+            unseen.append(message)
+        return unseen
+
+    async def _invoke_agent(self, additional_messages: Any = None, **kwargs: Any) -> ChatMessageContent:
+        options = {**self._history_policy.member_run_options(self._agent), **kwargs}
+        if self._event_bus is not None:
+            self._event_bus.publish(AGENT_STARTED, agent=self._agent.name)
+        return await super()._invoke_agent(additional_messages, **options)
+
+    # Overrides must be registered as handlers again, or the runtime never delivers resets to them
+    @message_handler
+    async def _handle_reset_message(self, message: MagenticResetMessage, ctx: MessageContext) -> None:
+        self._sent.clear()
+        await super()._handle_reset_message(message, ctx)
+
+
+class BoundedMagenticOrchestration(MagenticOrchestration):
+    """
+    Magentic orchestration whose members use `BoundedMagenticAgentActor`.
+
+    Args:
+        history_policy: The history policy shared with the manager
+        event_bus: Bus the members publish agent_started events to (optional)
+        Other arguments as for MagenticOrchestration
+    """
+
+    def __init__(self, *args: Any, history_policy: HistoryPolicy, event_bus: Any = None, **kwargs: Any):
+        self._history_policy = history_policy
+        self._event_bus = event_bus
+        super().__init__(*args, **kwargs)
+
+    async def _register_members(self, runtime: Any, internal_topic_type: str, exception_callback: Any) -> None:
+        await asyncio.gather(*[
+            BoundedMagenticAgentActor.register(
+                runtime,
+                self._get_agent_actor_type(agent, internal_topic_type),
+                lambda agent=agent: BoundedMagenticAgentActor(
+                    agent,
+                    internal_topic_type,
+                    exception_callback,
+                    self._agent_response_callback,
+                    self._streaming_agent_response_callback,
+                    history_policy=self._history_policy,
+                    event_bus=self._event_bus,
+                ),
+            )
+            for agent in self._members
+        ])
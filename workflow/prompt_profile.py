@@ -0,0 +1,154 @@
+"""Prompt size accounting and instruction profiles for the agents.
+
+Every agent turn re-sends the agent's instructions and tool schemas, so their
+size is a fixed input cost per turn. This module:
+- Applies an instruction profile (FA_INSTRUCTION_PROFILE, see
+  src/agents/instruction_profiles.yaml) to the agents at start-up
+- Counts each agent's static prompt tokens (instructions, description and
+  tool schemas) and prints them per agent
+- Records the prompt and completion tokens of every turn per agent, from the
+  usage the service reports
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+PROFILES_PATH = Path(__file__).resolve().parent.parent / "src" / "agents" / "instruction_profiles.yaml"
+FULL_PROFILE = "full"
+
+_encoding: Any = None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of a text with the gpt-4o encoding, or about 4 characters per token without tiktoken."""
+    global _encoding
+    if not text:
+        return 0
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text))
+
+
+def usage_breakdown(usage: Any) -> tuple[int, int]:
+    """Prompt and completion tokens of a usage object or dict, 0 when not reported."""
+    if usage is None:
+        return 0, 0
+    if isinstance(usage, dict):
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    return int(getattr(usage, "prompt_tokens", 0) or 0), int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def load_profile(name: str | None = None, path: str | os.PathLike = PROFILES_PATH) -> dict[str, str]:
+    """
+    Instructions of a profile, by agent name.
+
+    Args:
+        name: Profile name (default: FA_INSTRUCTION_PROFILE or "full")
+        path: Profiles file
+
+    Returns:
+        Agent name to instructions; empty for the "full" profile
+
+    Raises:
+        ValueError: If the profile is not defined in the profiles file
+    """
+    name = name or os.environ.get("FA_INSTRUCTION_PROFILE", FULL_PROFILE)
+    if name == FULL_PROFILE:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        profiles = yaml.safe_load(f) or {}
+    if name not in profiles:
+        raise ValueError(f"Unknown instruction profile '{name}', expected one of: {FULL_PROFILE}, {', '.join(profiles)}")
+    return {agent: instructions.strip() for agent, instructions in profiles[name].items()}
+
+
+def tool_schemas(agent: Any) -> list[dict[str, Any]]:
+    """The tool definitions sent with an agent's runs: its kernel functions and its definition's tools."""
+    from semantic_kernel.connectors.ai.function_calling_utils import kernel_function_metadata_to_function_call_format
+
+    schemas = [
+        kernel_function_metadata_to_function_call_format(metadata)
+        for metadata in agent.kernel.get_full_list_of_function_metadata()
+    ]
+    for tool in getattr(getattr(agent, "definition", None), "tools", None) or []:
+        schemas.append(tool.as_dict() if hasattr(tool, "as_dict") else {"type": str(getattr(tool, "type", tool))})
+    return schemas
+
+
+class PromptAccounting:
+    """
+    Per-agent static prompt size and per-turn token usage of a run.
+
+    Args:
+        profile: The instruction profile in use
+    """
+
+    def __init__(self, profile: str | None = None):
+        self.profile = profile or os.environ.get("FA_INSTRUCTION_PROFILE", FULL_PROFILE)
+        self.agents: dict[str, dict[str, int]] = {}
+
+    def apply_profile(self, agents: list[Any]) -> list[str]:
+        """Replace the instructions of the agents listed in the profile and return their names."""
+        instructions = load_profile(self.profile)
+        applied = []
+        for agent in agents:
+            if agent.name in instructions:
+                agent.instructions = instructions[agent.name]
+                applied.append(agent.name)
+        return applied
+
+    def _entry(self, name: str) -> dict[str, int]:
+        return self.agents.setdefault(name, {
+            "instruction_tokens": 0, "tool_tokens": 0, "static_tokens": 0,
+            "turns": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        })
+
+    def measure(self, agents: list[Any]) -> None:
+        """Count the static prompt tokens of every agent."""
+        for agent in agents:
+            entry = self._entry(agent.name)
+            entry["instruction_tokens"] = count_tokens(agent.instructions or "") + count_tokens(agent.description or "")
+            schemas = tool_schemas(agent)
+            entry["tool_tokens"] = count_tokens(json.dumps(schemas)) if schemas else 0
+            entry["static_tokens"] = entry["instruction_tokens"] + entry["tool_tokens"]
+
+    def record(self, name: str, usage: Any) -> tuple[int, int]:
+        """Add one turn's usage to an agent (or the manager) and return its prompt and completion tokens."""
+        prompt_tokens, completion_tokens = usage_breakdown(usage)
+        entry = self._entry(name)
+        entry["turns"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        return prompt_tokens, completion_tokens
+
+    def format_static(self) -> str:
+        lines = [
+            f"📏 Prompt sizes (instruction profile: {self.profile})",
+            f"  {'agent':<28} {'instructions':>12} {'tools':>7} {'static':>7}",
+        ]
+        for name, entry in self.agents.items():
+            if entry["static_tokens"]:
+                lines.append(f"  {name:<28} {entry['instruction_tokens']:>12} {entry['tool_tokens']:>7} "
+                             f"{entry['static_tokens']:>7}")
+        lines.append(f"  {'total':<28} {sum(e['static_tokens'] for e in self.agents.values()):>28}")
+        return "\n".join(lines)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "agents": {
+                name: {**entry, "mean_prompt_tokens": round(entry["prompt_tokens"] / entry["turns"]) if entry["turns"] else 0}
+                for name, entry in self.agents.items()
+            },
+        }
@@ -0,0 +1,288 @@
+"""Process-wide rate limiting for Azure OpenAI calls.
+
+All model calls of a process share one `RateLimiter`:
+- The manager's chat completion service acquires it around every request
+- The Azure AI agents client gets `AgentRateLimitPolicy`, which acquires it
+  for every request that starts model work (run creation, tool outputs)
+
+The limiter keeps two token buckets, requests per minute (FA_RATE_LIMIT_RPM)
+and tokens per minute (FA_RATE_LIMIT_TPM), and an adaptive concurrency limit
+(FA_MAX_CONCURRENCY). Requests are charged an estimate up front and the
+estimate is corrected once the actual usage is known. A 429 halves the
+concurrency limit and pauses new requests for the Retry-After period; every
+`limit` successful requests raise it by one again, so throughput settles
+near the quota without retry storms. The time requests spend waiting in the
+queue is recorded and reported.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_ESTIMATED_TOKENS = 2000
+DEFAULT_RETRY_AFTER_SECONDS = 2.0
+
+# Agent service requests that make the model do work
+_MODEL_REQUEST_SUFFIXES = ("/runs", "/submit_tool_outputs", "/threads/runs")
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+def retry_after_seconds(headers: Any) -> float | None:
+    """Read the retry delay from Retry-After / retry-after-ms response headers."""
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                continue
+    return None
+
+
+def throttling_retry_after(error: BaseException) -> float | None:
+    """
+    Return the retry delay if an exception (or one it was raised from) is a 429,
+    DEFAULT_RETRY_AFTER_SECONDS if it carries none, or None if it is not throttling.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        response = getattr(error, "response", None)
+        status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        if status == 429 or type(error).__name__ == "RateLimitError":
+            return retry_after_seconds(getattr(response, "headers", None)) or DEFAULT_RETRY_AFTER_SECONDS
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class Lease:
+    """A granted request slot, released with the actual usage once the request finishes."""
+
+    def __init__(self, estimated_tokens: int, wait_seconds: float):
+        self.estimated_tokens = estimated_tokens
+        self.wait_seconds = wait_seconds
+        self.released = False
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter with adaptive concurrency, shared by all model calls in a process.
+
+    Args:
+        rpm: Requests per minute, or None for no request limit
+        tpm: Tokens per minute, or None for no token limit
+        max_concurrency: Upper bound of the adaptive concurrency limit
+        estimated_tokens: Tokens charged up front when a request's size is unknown
+    """
+
+    def __init__(
+        self,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        estimated_tokens: int = DEFAULT_ESTIMATED_TOKENS,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max(1, max_concurrency)
+        self.estimated_tokens = estimated_tokens
+        self.concurrency_limit = self.max_concurrency
+        self.in_flight = 0
+        self._request_tokens = float(rpm or 0)
+        self._model_tokens = float(tpm or 0)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._successes = 0
+        self._unsettled_tokens = 0
+        # Plain lock and polling instead of asyncio primitives, so the limiter
+        # works across event loops (one per run) and threads
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.tokens_used = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(
+            rpm=_env_int("FA_RATE_LIMIT_RPM"),
+            tpm=_env_int("FA_RATE_LIMIT_TPM"),
+            max_concurrency=_env_int("FA_MAX_CONCURRENCY") or DEFAULT_MAX_CONCURRENCY,
+            estimated_tokens=_env_int("FA_RATE_LIMIT_ESTIMATED_TOKENS") or DEFAULT_ESTIMATED_TOKENS,
+        )
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        if self.rpm:
+            self._request_tokens = min(float(self.rpm), self._request_tokens + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._model_tokens = min(float(self.tpm), self._model_tokens + elapsed * self.tpm / 60.0)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= self.concurrency_limit:
+                return 0.05
+            if self.rpm and self._request_tokens < 1:
+                return (1 - self._request_tokens) * 60.0 / self.rpm
+            # A request larger than the whole bucket waits for a full bucket
+            needed = min(tokens, self.tpm) if self.tpm else 0
+            if self.tpm and self._model_tokens < needed:
+                return (needed - self._model_tokens) * 60.0 / self.tpm
+            if self.rpm:
+                self._request_tokens -= 1
+            if self.tpm:
+                self._model_tokens -= tokens
+            self.in_flight += 1
+            self.requests += 1
+            return 0.0
+
+    async def acquire(self, estimated_tokens: int | None = None) -> Lease:
+        """Wait until the request may be sent and return its lease."""
+        tokens = self.estimated_tokens if estimated_tokens is None else max(0, int(estimated_tokens))
+        started = time.monotonic()
+        while True:
+            delay = self._try_acquire(tokens)
+            if delay <= 0:
+                break
+            await asyncio.sleep(min(max(delay, 0.01), 1.0))
+        waited = time.monotonic() - started
+        with self._lock:
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return Lease(tokens, waited)
+
+    def release(self, lease: Lease, actual_tokens: int | None = None, retry_after: float | None = None) -> None:
+        """
+        Release a lease.
+
+        Args:
+            lease: The lease returned by acquire
+            actual_tokens: Tokens the request used; None leaves the estimate to be settled later
+            retry_after: Set when the request was throttled (429), the delay before sending more
+        """
+        if lease.released:
+            return
+        lease.released = True
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if actual_tokens is None:
+                self._unsettled_tokens += lease.estimated_tokens
+            else:
+                self._charge(actual_tokens - lease.estimated_tokens)
+                self.tokens_used += actual_tokens
+            if retry_after is not None:
+                self._throttled(retry_after)
+            else:
+                self._successes += 1
+                if self._successes >= self.concurrency_limit and self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+                    self._successes = 0
+
+    def settle_usage(self, actual_tokens: int) -> None:
+        """Charge usage reported after the fact (e.g. by an agent message) against the unsettled estimates."""
+        with self._lock:
+            self._charge(actual_tokens - self._unsettled_tokens)
+            self._unsettled_tokens = 0
+            self.tokens_used += actual_tokens
+
+    def record_throttle(self, retry_after: float | None = None) -> None:
+        """Register a 429 seen outside a lease (e.g. a retried request)."""
+        with self._lock:
+            self._throttled(retry_after or DEFAULT_RETRY_AFTER_SECONDS)
+
+    def _charge(self, tokens: int) -> None:
+        if self.tpm:
+            self._model_tokens = min(float(self.tpm), self._model_tokens - tokens)
+
+    def _throttled(self, retry_after: float) -> None:
+        self.throttled += 1
+        self._successes = 0
+        self.concurrency_limit = max(1, self.concurrency_limit // 2)
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        print(f"🚦 Throttled (429): concurrency limit {self.concurrency_limit}, pausing {retry_after:.1f}s")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "tokens_used": self.tokens_used,
+                "concurrency_limit": self.concurrency_limit,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "queue_wait_seconds_total": round(self.wait_seconds_total, 3),
+                "queue_wait_ms_mean": round(self.wait_seconds_total / self.requests * 1000, 1) if self.requests else 0.0,
+                "queue_wait_ms_max": round(self.wait_seconds_max * 1000, 1),
+            }
+
+
+_rate_limiter: RateLimiter | None = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide rate limiter, created from the environment on first use."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter.from_env()
+        return _rate_limiter
+
+
+class AgentRateLimitPolicy(AsyncHTTPPolicy):
+    """
+    Azure pipeline policy that puts agent service requests under the rate limiter.
+
+    Pass it to the agents client, e.g.
+    `AzureAIAgent.create_client(credential=creds, custom_hook_policy=AgentRateLimitPolicy())`.
+    Requests that start model work acquire the limiter; 429 responses on any
+    request shrink the concurrency limit.
+    """
+
+    def __init__(self, limiter: RateLimiter | None = None):
+        super().__init__()
+        self.limiter = limiter or get_rate_limiter()
+
+    @staticmethod
+    def is_model_request(request: Any) -> bool:
+        http_request = request.http_request
+        path = http_request.url.split("?", 1)[0].rstrip("/")
+        return http_request.method == "POST" and path.endswith(_MODEL_REQUEST_SUFFIXES)
+
+    async def send(self, request: Any) -> Any:
+        lease = await self.limiter.acquire() if self.is_model_request(request) else None
+        try:
+            response = await self.next.send(request)
+        except BaseException:
+            if lease is not None:
+                self.limiter.release(lease)
+            raise
+        http_response = response.http_response
+        retry_after = None
+        if http_response.status_code == 429:
+            retry_after = retry_after_seconds(http_response.headers) or DEFAULT_RETRY_AFTER_SECONDS
+        if lease is not None:
+            self.limiter.release(lease, retry_after=retry_after)
+        elif retry_after is not None:
+            self.limiter.record_throttle(retry_after)
+        return response
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Incremental report regeneration.
+
+Every finished run records the inputs each report section was built from in
+`<run dir>/section_inputs.json`, as fingerprints:
+- `metric:<name>`: a metric's values for the run's company, from the
+  analyzer data (financial_data.json). The formula analysis depends on the
+  metrics its formulas use, the YoY analysis on all of the company's metrics
+- `section:<key>`: the content of an upstream section (e.g. the root causes
+  depend on the YoY analysis, the formatted report on every analysis section)
+
+When the data changes (a new fiscal year, a corrected metric), the
+regenerate command compares the recorded fingerprints with the current data.
+Sections whose inputs changed are stale, and so is every section downstream
+of a stale one. The other sections are copied into a new run whose
+checkpoint marks them completed, and the workflow resumes from there, so the
+agents only recompute and re-narrate the stale sections.
+
+Run from the repository root:
+    python -m workflow.regenerate 20250101_1200 --dry-run
+    python -m workflow.regenerate 20250101_1200 [--output-dir outputs/...]
+"""
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from workflow.report_writer import SECTION_TITLES
+
+SECTION_INPUTS_FILE_NAME = "section_inputs.json"
+
+# Upstream sections every section is built from
+SECTION_DEPENDENCIES = {
+    "sector": [],
+    "formulas": ["sector"],
+    "formula_analysis": ["formulas"],
+    "yoy_analysis": [],
+    "root_causes": ["yoy_analysis"],
+    "formatted_report": ["sector", "formulas", "formula_analysis", "yoy_analysis", "root_causes"],
+}
+
+
+def fingerprint(value: Any) -> str:
+    """Short, stable fingerprint of a JSON-serializable value."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def default_data_path() -> Path:
+    from tools.peer_benchmark import DEFAULT_PEER_DATA
+
+    return DEFAULT_PEER_DATA
+
+
+def metric_fingerprints(company: str, data_path: str | os.PathLike) -> dict[str, str]:
+    """
+    Fingerprint of every metric of a company in an analyzer output.
+
+    Returns:
+        Metric name to fingerprint; empty if the company is not in the data
+    """
+    from data_provider.metric_store import load_metric_store
+
+    store = load_metric_store(data_path)
+    try:
+        records = store.company_records(company)
+    except KeyError:
+        return {}
+    return {record["Metric"]: fingerprint(record) for record in records}
+
+
+def formula_metrics(formulas_text: str, metrics: list[str]) -> list[str] | None:
+    """
+    The metrics the formulas of a Formula_Provider answer use.
+
+    Returns:
+        The metric names, or None if no formula could be parsed
+    """
+    from tools.formulas import FormulaGraph, parse_formulas
+
+    formulas = parse_formulas(formulas_text)
+    if not formulas:
+        return None
+    graph = FormulaGraph(formulas, metrics)
+    # Formulas built on other formulas use their base metrics too
+    used = {field for name in graph.order for field in graph.base_fields(name)}
+    return sorted(used)
+
+
+def section_inputs(
+    stages: dict[str, list[str]], company: str, data_path: str | os.PathLike | None = None
+) -> dict[str, dict[str, str]]:
+    """
+    The input fingerprints of every section.
+
+    Args:
+        stages: Section outputs by key (as in the checkpoint)
+        company: The run's company
+        data_path: Analyzer output the metrics come from (default: financial_data.json)
+
+    Returns:
+        Section key to {input name: fingerprint}
+    """
+    metrics = metric_fingerprints(company, data_path or default_data_path())
+    inputs: dict[str, dict[str, str]] = {}
+    for key in SECTION_TITLES:
+        section = {f"section:{dependency}": fingerprint(stages.get(dependency)) for dependency in SECTION_DEPENDENCIES[key]}
+        if key == "formula_analysis":
+            used = formula_metrics("\n".join(stages.get("formulas", [])), list(metrics))
+            section.update({f"metric:{name}": metrics[name] for name in (metrics if used is None else used)})
+        elif key == "yoy_analysis":
+            section.update({f"metric:{name}": value for name, value in metrics.items()})
+        inputs[key] = section
+    return inputs
+
+
+def record_section_inputs(
+    output_dir: str, company: str, stages: dict[str, list[str]], data_path: str | os.PathLike | None = None
+) -> str:
+    """Write the input and output fingerprints of a run's sections to section_inputs.json."""
+    data_path = data_path or default_data_path()
+    inputs = section_inputs(stages, company, data_path)
+    path = os.path.join(output_dir, SECTION_INPUTS_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "company": company,
+            "data_path": os.fspath(data_path),
+            "recorded_at": datetime.datetime.now().isoformat(),
+            "sections": {
+                key: {"inputs": inputs[key], "output": fingerprint(stages[key])}
+                for key in SECTION_TITLES if key in stages
+            },
+        }, f, indent=2)
+    return path
+
+
+def _changed(previous: dict[str, str], current: dict[str, str]) -> list[str]:
+    names = sorted(set(previous) | set(current))
+    return [name for name in names if previous.get(name) != current.get(name)]
+
+
+def plan_regeneration(run_dir: str, data_path: str | os.PathLike | None = None) -> dict[str, Any]:
+    """
+    Decide which sections of a run can be reused with the current data.
+
+    Returns:
+        The company, the data compared against, the reused and stale
+        sections, and for every stale section why it is stale
+
+    Raises:
+        FileNotFoundError: If the run has no checkpoint or no recorded section inputs
+    """
+    from workflow.checkpoint import RunCheckpoint
+
+    checkpoint = RunCheckpoint.load(run_dir)
+    recorded_path = os.path.join(run_dir, SECTION_INPUTS_FILE_NAME)
+    if not os.path.exists(recorded_path):
+        raise FileNotFoundError(f"Run '{run_dir}' has no {SECTION_INPUTS_FILE_NAME}, it cannot be regenerated incrementally")
+    with open(recorded_path, "r", encoding="utf-8") as f:
+        recorded = json.load(f)
+    company = recorded["company"]
+    data_path = data_path or recorded.get("data_path") or default_data_path()
+    current = section_inputs(checkpoint.stages, company, data_path)
+
+    reused, stale, reasons = [], [], {}
+    for key in SECTION_TITLES:
+        previous = recorded["sections"].get(key)
+        upstream = [dependency for dependency in SECTION_DEPENDENCIES[key] if dependency in stale]
+        if previous is None or key not in checkpoint.stages:
+            reasons[key] = ["not produced by the previous run"]
+        elif upstream:
+            reasons[key] = [f"section:{dependency} is regenerated" for dependency in upstream]
+        elif changed := _changed(previous["inputs"], current[key]):
+            reasons[key] = changed
+        else:
+            reused.append(key)
+            continue
+        stale.append(key)
+    return {
+        "run": run_dir, "company": company, "data_path": os.fspath(data_path),
+        "reused": reused, "stale": stale, "reasons": reasons,
+    }
+
+
+def prepare_run(run_dir: str, plan: dict[str, Any], output_dir: str) -> str:
+    """
+    Create a new run that starts with the reused sections of an earlier run.
+
+    The checkpoint keeps the reused stages and the task ledger, but neither the
+    chat history nor the final result, so resuming it only produces the stale
+    sections and a new report.
+    """
+    from workflow.checkpoint import RunCheckpoint
+
+    previous = RunCheckpoint.load(run_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = RunCheckpoint(output_dir)
+    checkpoint.company = plan["company"]
+    checkpoint.stages = {key: previous.stages[key] for key in plan["reused"]}
+    checkpoint.task_ledger = previous.task_ledger
+    checkpoint.save()
+    return output_dir
+
+
+def format_plan(plan: dict[str, Any]) -> str:
+    lines = [f"♻️ Regeneration plan for {plan['run']} ({plan['company']})"]
+    for key, title in SECTION_TITLES.items():
+        if key in plan["reused"]:
+            lines.append(f"  ✅ reuse       {title}")
+        else:
+            reasons = plan["reasons"][key]
+            shown = ", ".join(reasons[:5]) + (f" and {len(reasons) - 5} more" if len(reasons) > 5 else "")
+            lines.append(f"  🔁 regenerate  {title}: {shown}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Regenerate only the report sections whose input data changed.")
+    parser.add_argument("run", help="Earlier run (directory or run name under outputs/)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Directory of the regenerated run (default: outputs/<timestamp>_regenerated)")
+    parser.add_argument("--data", default=None,
+                        help="Analyzer output with the current metrics (default: the data the run was recorded with)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print which sections would be regenerated")
+    args = parser.parse_args()
+
+    from workflow.checkpoint import resolve_run_dir
+
+    run_dir = resolve_run_dir(args.run)
+    plan = plan_regeneration(run_dir, args.data)
+    print(format_plan(plan))
+    if args.dry_run:
+        return
+    if not plan["stale"]:
+        print("✅ Every section is up to date, nothing to regenerate")
+        return
+
+    import financial_analysis_workflow
+    from workflow.checkpoint import RunCheckpoint
+
+    output_dir = args.output_dir or os.path.join(
+        "outputs", datetime.datetime.now().strftime("%Y%m%d_%H%M") + "_regenerated"
+    )
+    prepare_run(run_dir, plan, output_dir)
+    print(f"📁 Regenerating {len(plan['stale'])} section(s) in {output_dir}")
+    asyncio.run(financial_analysis_workflow.main(resume=output_dir))
+    # Record against the data the plan was made with, which may not be the default
+    record_section_inputs(output_dir, plan["company"], RunCheckpoint.load(output_dir).stages, plan["data_path"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Incremental report assembly for the financial analysis workflow.
+
+Agent results are sorted into report sections as soon as they arrive. Each
+section is written to `<run dir>/sections/` and the combined
+`financial_analysis_report.md` is rewritten after every update, so the
+report can be read while the run is still in progress.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from semantic_kernel.contents import ChatMessageContent
+
+REPORT_FILE_NAME = "financial_analysis_report.md"
+SECTIONS_DIR_NAME = "sections"
+
+# Prefix of the line printed whenever a section is written (see workflow.events.ConsolePrinter)
+SECTION_READY_PREFIX = "📝 Report section ready: "
+
+# Report sections in the order they appear in the report
+SECTION_TITLES = {
+    "sector": "Company Sector",
+    "formulas": "Sector Formulas",
+    "formula_analysis": "Formula Analysis",
+    "yoy_analysis": "Year-over-Year Analysis",
+    "root_causes": "Root Causes of Metric Changes",
+    "formatted_report": "Formatted Financial Report",
+}
+
+# Sections where a newer result supersedes the previous one instead of adding to it
+SUPERSEDING_SECTIONS = {"sector", "formatted_report"}
+
+NO_RESULT = "No relevant information found"
+
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Write a file so readers never see it half written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _parse_json(content: str) -> Any:
+    """Return the JSON payload of an agent message, or None if it is not JSON."""
+    match = _JSON_FENCE.search(content)
+    text = match.group(1) if match else content
+    try:
+        return json.loads(text.strip())
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def _records_to_table(records: list[dict[str, Any]]) -> str:
+    """Render a list of flat records (e.g. YoY results) as a markdown table."""
+    columns: list[str] = []
+    for record in records:
+        for key in record:
+            if key not in columns:
+                columns.append(key)
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |",
+    ]
+    for record in records:
+        cells = ["" if record.get(c) is None else str(record.get(c)) for c in columns]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def to_markdown(content: str) -> str:
+    """
+    Render an agent result as markdown.
+
+    JSON lists of metric records become tables; anything else is kept as is.
+    """
+    data = _parse_json(content)
+    if isinstance(data, dict):
+        # Unwrap {"company": ..., "financial_metrics": [...]} style payloads
+        lists = [v for v in data.values() if isinstance(v, list)]
+        if len(lists) == 1:
+            data = lists[0]
+    if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
+        return _records_to_table(data)
+    return content.strip()
+
+
+class IncrementalReportWriter:
+    """
+    Write report sections to the run directory as agent results arrive.
+
+    Args:
+        output_dir: Run directory that receives the report and its sections
+        company: Company the report is about
+    """
+
+    def __init__(self, output_dir: str, company: str):
+        self.output_dir = output_dir
+        self.company = company
+        self.sections_dir = os.path.join(output_dir, SECTIONS_DIR_NAME)
+        self.report_path = os.path.join(output_dir, REPORT_FILE_NAME)
+        self.sections: dict[str, list[str]] = {}
+        os.makedirs(self.sections_dir, exist_ok=True)
+
+    def section_for(self, message: ChatMessageContent) -> str | None:
+        """Decide which report section an agent response belongs to."""
+        yoy_started = "yoy_analysis" in self.sections
+        match message.name:
+            case "RAG_Agent":
+                # RAG answers are sector lookups until the YoY process starts, then root causes
+                return "root_causes" if yoy_started else "sector"
+            case "Formula_Provider":
+                return "formulas"
+            case "Calculation_Agent":
+                return "yoy_analysis" if yoy_started else "formula_analysis"
+            case "YoY_Analyst":
+                return "yoy_analysis"
+            case "Report_formating_agent":
+                return "formatted_report"
+        return None
+
+    def add(self, message: ChatMessageContent) -> str | None:
+        """
+        Add an agent response to its section and rewrite the report.
+
+        Returns:
+            The section key that was updated, or None if the message was not used
+        """
+        content = (message.content or "").strip()
+        if not content or content == NO_RESULT:
+            return None
+        key = self.section_for(message)
+        if key is None:
+            return None
+
+        entries = self.sections.setdefault(key, [])
+        rendered = to_markdown(content)
+        if rendered in entries:
+            return None
+        if key in SUPERSEDING_SECTIONS:
+            entries.clear()
+        entries.append(rendered)
+
+        self.write_section(key)
+        self.write_report()
+        return key
+
+    def restore(self, sections: dict[str, list[str]]) -> None:
+        """Restore sections produced by an earlier run (e.g. from a checkpoint)."""
+        for key, entries in sections.items():
+            if key in SECTION_TITLES:
+                self.sections[key] = list(entries)
+                self.write_section(key)
+        if self.sections:
+            self.write_report()
+
+    def write_section(self, key: str) -> str:
+        index = list(SECTION_TITLES).index(key) + 1
+        path = os.path.join(self.sections_dir, f"{index:02d}_{key}.md")
+        body = "\n\n".join(self.sections[key])
+        _write_atomic(path, f"## {SECTION_TITLES[key]}\n\n{body}\n")
+        return path
+
+    def _header(self) -> str:
+        return (
+            f"Financial Analysis Report for {self.company}\n"
+            f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        )
+
+    def write_report(self) -> str:
+        """Rewrite the in-progress report from the sections produced so far."""
+        parts = [self._header(), "### Analysis Results (in progress)\n"]
+        for key, title in SECTION_TITLES.items():
+            if key in self.sections:
+                parts.append(f"\n## {title}\n\n" + "\n\n".join(self.sections[key]) + "\n")
+        _write_atomic(self.report_path, "".join(parts))
+        return self.report_path
+
+    def finalize(self, value: Any) -> str:
+        """Replace the in-progress report with the final orchestration result."""
+        _write_atomic(self.report_path, f"{self._header()}### Analysis Results:\n{value}")
+        return self.report_path
@@ -0,0 +1,143 @@
+"""Append-only run logs with cursor-based reads.
+
+Every log line of a run is appended to `run.log` in its run directory (the
+same file the batch runner writes). A sparse index, `run.log.idx`, stores the
+byte offset of every INDEX_INTERVAL-th line as a fixed-width record, so the
+line with sequence number `n` is found by one seek into the index plus at
+most INDEX_INTERVAL line reads. A reader passes the cursor (the next
+sequence number) it got from its previous read and only receives new lines.
+
+Logs survive restarts and stay readable afterwards. Before the first append
+the index is extended from the log when it falls behind (e.g. after a crash,
+or for a log written without one) and a partly written last line is
+dropped; reads past the end of the index scan on from its last record.
+"""
+
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any
+
+LOG_FILE_NAME = "run.log"
+INDEX_SUFFIX = ".idx"
+INDEX_INTERVAL = 256
+DEFAULT_READ_LIMIT = 1000
+_OFFSET = struct.Struct("<Q")
+
+
+class RunLog:
+    """
+    The log of one run.
+
+    Args:
+        run_dir: The run directory
+        index_interval: Lines per index record
+    """
+
+    def __init__(self, run_dir: str | os.PathLike, index_interval: int = INDEX_INTERVAL):
+        self.path = Path(run_dir) / LOG_FILE_NAME
+        self.index_path = self.path.with_name(LOG_FILE_NAME + INDEX_SUFFIX)
+        self.index_interval = index_interval
+        self.count: int | None = None
+        self._size = 0
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    def _read_offsets(self) -> list[int]:
+        if not self.index_path.exists():
+            return []
+        data = self.index_path.read_bytes()
+        usable = len(data) - len(data) % _OFFSET.size
+        return [offset for (offset,) in _OFFSET.iter_unpack(data[:usable])]
+
+    def _recover(self) -> None:
+        """Find the line count and end of the log, repairing the index and a partly written last line."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch()
+        size = self.path.stat().st_size
+        offsets = [offset for offset in self._read_offsets() if offset < size]
+        # Rescan from the last indexed line, extending the index as lines are found
+        count = (len(offsets) - 1) * self.index_interval if offsets else 0
+        position = offsets[-1] if offsets else 0
+        with open(self.path, "rb") as f:
+            f.seek(position)
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break
+                if count % self.index_interval == 0 and count // self.index_interval == len(offsets):
+                    offsets.append(position)
+                position += len(line)
+                count += 1
+        if position < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(position)
+        self.index_path.write_bytes(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        self.count = count
+        self._size = position
+
+    def append(self, message: str) -> int:
+        """Append one line and return its sequence number."""
+        line = (" ".join(message.splitlines()) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self._recover()
+                self._file = open(self.path, "ab")
+            seq = self.count
+            if seq % self.index_interval == 0:
+                with open(self.index_path, "ab") as index:
+                    index.write(_OFFSET.pack(self._size))
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+            self.count += 1
+            return seq
+
+    def _nearest_record(self, block: int) -> tuple[int, int]:
+        """The index record of a block, or the last one before it when the index does not reach it."""
+        if not self.index_path.exists():
+            return 0, 0
+        with open(self.index_path, "rb") as index:
+            records = index.seek(0, os.SEEK_END) // _OFFSET.size
+            if records == 0:
+                return 0, 0
+            block = min(block, records - 1)
+            index.seek(block * _OFFSET.size)
+            (offset,) = _OFFSET.unpack(index.read(_OFFSET.size))
+        return block, offset
+
+    def read(self, since: int = 0, limit: int = DEFAULT_READ_LIMIT) -> tuple[list[dict[str, Any]], int]:
+        """
+        Read the lines from a cursor on.
+
+        Args:
+            since: Sequence number of the first line to return
+            limit: Maximum number of lines
+
+        Returns:
+            The lines as {"seq", "message"} entries, and the cursor for the next read
+        """
+        since = max(0, since)
+        if not self.path.exists():
+            return [], since
+        block, offset = self._nearest_record(since // self.index_interval)
+
+        entries = []
+        seq = block * self.index_interval
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while len(entries) < limit:
+                line = f.readline()
+                # A line without its newline is still being written
+                if not line.endswith(b"\n"):
+                    break
+                if seq >= since:
+                    entries.append({"seq": seq, "message": line[:-1].decode("utf-8", errors="replace")})
+                seq += 1
+        return entries, since + len(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None